@@ -0,0 +1,295 @@
+"""Generation benchmark on synthetic OpenAPI specs.
+
+Builds specs with the requested number of operations, spread over many tags
+and using chains of ``$ref``-linked models, and times each stage of a full
+``--with-tests`` run separately: parse, clients, fixtures, conftest/settings,
+tests and formatting. Every size runs in a fresh interpreter so that peak RSS
+is measured per size. Results are written as JSON::
+
+    python benchmarks/generation.py --sizes 10,1000,10000 --output bench.json
+    python benchmarks/generation.py --sizes 10,1000 --baseline bench.json
+
+``--baseline`` prints how each stage compares with an earlier results file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SIZES = (10, 1000, 10000)
+OPERATIONS_PER_TAG = 25
+MODEL_DEPTH = 6
+SERVICE = "bench"
+
+STAGES = ("parse", "client", "fixtures", "conftest_settings", "tests", "formatting")
+
+
+def synthetic_spec(
+    operations: int,
+    operations_per_tag: int = OPERATIONS_PER_TAG,
+    model_depth: int = MODEL_DEPTH,
+) -> dict[str, Any]:
+    """OpenAPI document with ``operations`` operations.
+
+    Operations come in ``GET /<tag>/items<n>/{id}`` / ``POST /<tag>/items<n>``
+    pairs. Each pair returns its own model, which heads a chain of
+    ``model_depth`` models linked by ``$ref`` and ending in a shared leaf.
+    """
+    paths: dict[str, Any] = {}
+    schemas: dict[str, Any] = {
+        "Audit": {
+            "type": "object",
+            "properties": {
+                "created_by": {"type": "string"},
+                "created_at": {"type": "string", "format": "date-time"},
+            },
+        }
+    }
+    for index in range(operations):
+        pair, is_post = divmod(index, 2)
+        tag = f"tag{index // operations_per_tag}"
+        model = f"Resource{pair}"
+        if not is_post:
+            _add_model_chain(schemas, model, model_depth)
+        ref = {"$ref": f"#/components/schemas/{model}"}
+        response = {
+            "description": "ok",
+            "content": {"application/json": {"schema": ref}},
+        }
+        if is_post:
+            paths.setdefault(f"/{tag}/items{pair}", {})["post"] = {
+                "tags": [tag],
+                "requestBody": {"content": {"application/json": {"schema": ref}}},
+                "responses": {"201": response},
+            }
+        else:
+            paths.setdefault(f"/{tag}/items{pair}/{{id}}", {})["get"] = {
+                "tags": [tag],
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    },
+                    {"name": "expand", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": response},
+            }
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Benchmark", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def _add_model_chain(schemas: dict[str, Any], head: str, depth: int) -> None:
+    names = [head, *(f"{head}Level{level}" for level in range(1, depth))]
+    for name, child in zip(names, [*names[1:], "Audit"]):
+        schemas[name] = {
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string", "maxLength": 64},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "child": {"$ref": f"#/components/schemas/{child}"},
+            },
+        }
+
+
+def run_size(operations: int, formatter: str) -> dict[str, Any]:
+    """Generate the synthetic spec for one size and time every stage."""
+    from e2efast.generators.formatting import format_paths
+    from e2efast.generators.operations import OperationIndex
+    from e2efast.generators.output import OutputWriter, writing_to
+    from e2efast.generators.templating import TemplateSettings, using_templates
+    from e2efast.pipeline import (
+        CLIENT_GENERATOR,
+        CONFTEST_GENERATOR,
+        FIXTURE_GENERATORS,
+        README_GENERATOR,
+        SETTINGS_GENERATOR,
+        TEST_GENERATORS,
+        load_generator,
+    )
+    from e2efast.spec import build_parser, read_spec
+
+    timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(name: str):
+        started = time.perf_counter()
+        yield
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+    spec = synthetic_spec(operations)
+    with tempfile.TemporaryDirectory() as scratch:
+        project = Path(scratch)
+        os.chdir(project)
+        spec_path = project / "spec.json"
+        spec_path.write_text(json.dumps(spec), encoding="utf-8")
+        writer = OutputWriter()
+        with (
+            writing_to(writer),
+            using_templates(TemplateSettings(bytecode_cache=False)),
+        ):
+            with stage("parse"):
+                parser = build_parser(read_spec(str(spec_path)), SERVICE)
+                operation_index = OperationIndex(parser)
+            with stage("client"):
+                load_generator(CLIENT_GENERATOR)(
+                    openapi_spec=parser, operation_index=operation_index
+                ).generate()
+            with stage("fixtures"):
+                load_generator(FIXTURE_GENERATORS["v2"])(
+                    openapi_spec=parser, operation_index=operation_index
+                ).generate()
+            with stage("conftest_settings"):
+                load_generator(CONFTEST_GENERATOR)(openapi_spec=parser).generate()
+                load_generator(SETTINGS_GENERATOR)(openapi_spec=parser).generate()
+            with stage("tests"):
+                load_generator(TEST_GENERATORS["v2"])(
+                    openapi_spec=parser, operation_index=operation_index
+                ).generate()
+                load_generator(README_GENERATOR)(openapi_spec=parser).generate()
+        with stage("formatting"):
+            format_paths(writer.pending_format(), formatter)
+        python_files = sum(1 for _ in project.rglob("*.py"))
+
+    return {
+        "operations": operations,
+        "tags": len(operation_index.apis),
+        "models": len(spec["components"]["schemas"]),
+        "stages": {name: round(timings.get(name, 0.0), 4) for name in STAGES},
+        "total": round(sum(timings.values()), 4),
+        "files": {
+            "written": writer.stats.written,
+            "formatted": len(writer.pending_format()),
+            "python": python_files,
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = {
+        entry["operations"]: entry
+        for entry in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    }
+    print(f"compared with {baseline_path}:")
+    for entry in results:
+        previous = baseline.get(entry["operations"])
+        if previous is None:
+            continue
+        ratios = ", ".join(
+            f"{name} x{entry['stages'][name] / previous['stages'][name]:.2f}"
+            for name in STAGES
+            if previous["stages"].get(name)
+        )
+        print(f"  {entry['operations']:>6} ops: {ratios}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma-separated operation counts",
+    )
+    parser.add_argument(
+        "--formatter", choices=["ruff", "black", "none"], default="ruff"
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_output.json"))
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--single-output", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        entry = run_size(args.single, args.formatter)
+        args.single_output.write_text(json.dumps(entry), encoding="utf-8")
+        return 0
+
+    env = {**os.environ}
+    env.setdefault("E2EFAST_CACHE_DIR", tempfile.mkdtemp(prefix="e2efast-bench-"))
+    results = []
+    entry_path = Path(env["E2EFAST_CACHE_DIR"]) / "entry.json"
+    for size in (int(value) for value in args.sizes.split(",")):
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--single",
+                str(size),
+                "--single-output",
+                str(entry_path),
+                "--formatter",
+                args.formatter,
+            ],
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        results.append(entry)
+        stages = "  ".join(f"{name}={entry['stages'][name]:.2f}s" for name in STAGES)
+        print(
+            f"{size:>6} ops: {stages}  total={entry['total']:.2f}s  "
+            f"rss={entry['peak_rss_mb']}MB  files={entry['files']['python']}"
+        )
+
+    args.output.write_text(
+        json.dumps(
+            {
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "formatter": args.formatter,
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    print(f"results written to {args.output}")
+    if args.baseline is not None:
+        _compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""CLI startup benchmark.
+
+Times ``e2efast --help``, ``e2efast --version`` and an up-to-date
+``e2efast SERVICE --spec ...`` run in fresh interpreters. Each command is run
+several times and the best time, minus the time a bare interpreter needs to
+start, is compared with the budget; the script exits with status 1 when a
+command is over it::
+
+    python benchmarks/startup.py --runs 10 --budget-ms 100
+
+Timings on shared CI runners are too noisy to gate on, so CI passes
+``--warn-only``: the numbers are printed and a command over budget is flagged
+with a warning annotation, but the exit status stays 0.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Startup", "version": "1.0.0"},
+    "paths": {
+        "/items/{id}": {
+            "get": {
+                "tags": ["items"],
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Item"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Item": {"type": "object", "properties": {"name": {"type": "string"}}}
+        }
+    },
+}
+
+CLI = [sys.executable, "-m", "e2efast.cli.main"]
+GENERATE = ["startup", "--spec", "spec.json", "--with-tests", "--formatter", "none"]
+
+
+def best_of(command: list[str], runs: int, cwd: Path, env: dict[str, str]) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=env, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--warn-only",
+        action="store_true",
+        help="report commands over budget without failing",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        project = Path(scratch)
+        env = {**os.environ, "E2EFAST_CACHE_DIR": str(project / ".cache")}
+        (project / "spec.json").write_text(json.dumps(SPEC), encoding="utf-8")
+        subprocess.run([*CLI, *GENERATE], cwd=project, env=env, check=True)
+
+        baseline = best_of([sys.executable, "-c", "pass"], args.runs, project, env)
+        commands = {
+            "--help": [*CLI, "--help"],
+            "--version": [*CLI, "--version"],
+            "up-to-date run": [*CLI, *GENERATE],
+        }
+        over_budget = False
+        print(f"interpreter startup: {baseline:.1f} ms (subtracted)")
+        for name, command in commands.items():
+            elapsed = best_of(command, args.runs, project, env) - baseline
+            over_budget |= elapsed > args.budget_ms
+            status = "ok" if elapsed <= args.budget_ms else "OVER BUDGET"
+            print(f"{name:>16}: {elapsed:7.1f} ms  {status}")
+            if args.warn_only and elapsed > args.budget_ms:
+                print(
+                    f"::warning title=CLI startup::{name} took {elapsed:.1f} ms "
+                    f"(budget {args.budget_ms:.0f} ms)"
+                )
+    return 1 if over_budget and not args.warn_only else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Programmatic generation into memory.
+
+:func:`generate` renders a service into a :class:`GeneratedTree`, a mapping of
+relative paths to file contents, without writing anything::
+
+    from e2efast.api import generate
+    from e2efast.pipeline import GenerationOptions
+
+    tree = generate("openapi.json", "customers", GenerationOptions(with_tests=True))
+    tree["internal/clients/http/customers/apis/users_api.py"]
+    print(tree.diff(".").unified())
+    tree.flush(".")
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from e2efast import profiling
+from e2efast.cache import SpecCache
+from e2efast.generators.formatting import format_sources
+from e2efast.generators.output import MemoryWriter, OutputWriter, WriteStats, writing_to
+from e2efast.manifest import MANIFEST_PATH, Manifest
+from e2efast.pipeline import GenerationOptions, _run_generators
+from e2efast.spec import SpecSource, build_parser, read_spec
+
+if TYPE_CHECKING:
+    from e2efast.generators.rendering import RenderSettings
+
+SpecInput = str | Path | bytes | Mapping[str, Any] | SpecSource
+
+
+@dataclass(frozen=True)
+class TreeDiff:
+    """How a :class:`GeneratedTree` differs from a directory on disk."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    # Contents before (on disk) and after (generated), for the unified diff.
+    old: dict[str, bytes] = field(default_factory=dict, repr=False)
+    new: dict[str, bytes] = field(default_factory=dict, repr=False)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def unified(self, context: int = 3) -> str:
+        """The changes as one ``git diff``-style unified diff."""
+        chunks = []
+        for path in sorted([*self.added, *self.changed, *self.removed]):
+            old = self.old.get(path)
+            new = self.new.get(path)
+            fromfile = f"a/{path}" if old is not None else "/dev/null"
+            tofile = f"b/{path}" if new is not None else "/dev/null"
+            lines = list(
+                difflib.unified_diff(
+                    _lines(old), _lines(new), fromfile, tofile, n=context
+                )
+            )
+            # An empty file added or removed has no hunks; keep its header.
+            chunks.extend(lines or [f"--- {fromfile}\n", f"+++ {tofile}\n"])
+        return "".join(chunks)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "unchanged": len(self.unchanged),
+        }
+
+
+class GeneratedTree(Mapping[str, bytes]):
+    """Generated files keyed by POSIX path relative to the project root.
+
+    ``removed`` lists files a run in the project would delete. Files that are
+    only generated once (editable wrappers, ``base.py``, ...) and already
+    exist in the project the tree was generated against are not part of it.
+    """
+
+    def __init__(self, files: Mapping[str, bytes], removed: Sequence[str] = ()) -> None:
+        self.files = dict(sorted(files.items()))
+        self.removed = sorted(removed)
+
+    def __getitem__(self, path: str) -> bytes:
+        return self.files[path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def text(self, path: str) -> str:
+        return self.files[path].decode("utf-8")
+
+    def diff(self, root: str | Path = ".") -> TreeDiff:
+        """Compare the tree with the files below ``root``."""
+        root = Path(root)
+        result = TreeDiff()
+        for path, data in self.files.items():
+            current = _read(root / path)
+            if current is None:
+                result.added.append(path)
+            elif current != data:
+                result.changed.append(path)
+                result.old[path] = current
+            else:
+                result.unchanged.append(path)
+                continue
+            result.new[path] = data
+        for path in self.removed:
+            current = _read(root / path)
+            if current is not None:
+                result.removed.append(path)
+                result.old[path] = current
+        return result
+
+    def flush(self, root: str | Path = ".") -> WriteStats:
+        """Write the tree below ``root``; unchanged files are left untouched.
+
+        The contents are already formatted. The generation manifest is not
+        updated, so the next ``e2efast`` run in ``root`` regenerates in full.
+        """
+        root = Path(root)
+        writer = OutputWriter()
+        for path, data in self.files.items():
+            writer.write(root / path, data.decode("utf-8"))
+        for path in self.removed:
+            writer.remove(root / path)
+        return writer.stats
+
+
+def generate(
+    spec: SpecInput,
+    service: str,
+    options: GenerationOptions | None = None,
+    *,
+    root: str | Path | None = None,
+    format_output: bool = True,
+    use_cache: bool = True,
+    spec_cache: SpecCache | None = None,
+    template_dirs: Sequence[str | Path] = (),
+    render_settings: RenderSettings | None = None,
+) -> GeneratedTree:
+    """Generate ``service`` from ``spec`` into memory.
+
+    ``spec`` is a path or URL, raw JSON bytes, an already loaded document or
+    a :class:`SpecSource`. With ``root`` the generators see that project's
+    existing files (read-only) and produce what a run there would; without
+    it the output is that of a run in an empty directory. Formatting uses
+    ``options.formatter`` on the contents, configured from ``root``; files
+    whose render matches what the project's manifest recorded keep their
+    formatted content on disk and are not formatted again.
+    """
+    from e2efast.generators.operations import OperationIndex
+    from e2efast.generators.templating import TemplateSettings, using_templates
+
+    options = options or GenerationOptions()
+    cache = spec_cache
+    if cache is None and use_cache:
+        cache = SpecCache()
+    with profiling.span("read spec"):
+        source = _spec_source(spec, cache)
+    with profiling.span("parse"):
+        parser = build_parser(source, service, cache)
+        operation_index = OperationIndex(parser)
+    profiling.count(profiling.OPERATIONS, len(operation_index.operations))
+
+    previous = None
+    if root is not None:
+        stored = Manifest.load(Path(root) / MANIFEST_PATH).get(service)
+        previous = stored.files if stored else None
+    writer = MemoryWriter(Path(root) if root is not None else None, previous)
+    template_settings = TemplateSettings(
+        override_dirs=tuple(Path(path).resolve() for path in template_dirs),
+        bytecode_cache=use_cache,
+    )
+    with writing_to(writer), using_templates(template_settings):
+        _run_generators(parser, operation_index, options, render_settings)
+
+    files = dict(writer.contents)
+    if format_output:
+        pending = {
+            path: files[path].decode("utf-8") for path in writer.pending_format()
+        }
+        formatted = format_sources(pending, options.formatter, writer.root)
+        files.update((path, text.encode("utf-8")) for path, text in formatted.items())
+    removed = [
+        path
+        for path in writer.removed
+        if path not in files and root is not None and (Path(root) / path).is_file()
+    ]
+    return GeneratedTree(files, removed=removed)
+
+
+def _spec_source(spec: SpecInput, cache: SpecCache | None) -> SpecSource:
+    if isinstance(spec, SpecSource):
+        return spec
+    if isinstance(spec, bytes):
+        return SpecSource(location="<bytes>", content=spec)
+    if isinstance(spec, Mapping):
+        return SpecSource(
+            location="<document>", content=json.dumps(spec).encode("utf-8")
+        )
+    return read_spec(str(spec), cache=cache)
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def _lines(data: bytes | None) -> list[str]:
+    if data is None:
+        return []
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n\\ No newline at end of file\n"
+    return lines
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from e2efast.cache import SpecCache
+from e2efast.generators.formatting import FORMATTERS, format_paths
+from e2efast.generators.test_layout import TEST_LAYOUTS
+from e2efast.generators.utils import set_shared_lock
+from e2efast.manifest import Manifest
+from e2efast.pipeline import (
+    FIXTURE_GENERATORS,
+    GenerationOptions,
+    GenerationReport,
+    generate_service,
+)
+from e2efast.spec import ConditionalFetcher, SpecSource, is_url, settle_fetch
+
+
+class BatchManifestError(ValueError):
+    """Raised when a batch manifest cannot be interpreted."""
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    service: str
+    spec: str
+    options: GenerationOptions
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    service: str
+    error: str | None = None
+    report: GenerationReport | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_OPTION_NAMES = {field.name for field in fields(GenerationOptions)}
+_DEFAULT_OPTIONS = GenerationOptions()
+_OPTION_CHOICES = {
+    "suite_version": tuple(FIXTURE_GENERATORS),
+    "test_layout": TEST_LAYOUTS,
+    "formatter": tuple(FORMATTERS),
+}
+
+
+def load_manifest(path: str | Path) -> list[BatchJob]:
+    """Read a YAML (or JSON) manifest listing services and their specs.
+
+    Example::
+
+        defaults:
+          with_tests: true
+        services:
+          - service: customers
+            spec: ./specs/crm.json
+          - service: billing
+            spec: https://specs.example.test/billing.json
+            suite_version: v1
+    """
+    path = Path(path)
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    if not isinstance(data, dict):
+        raise BatchManifestError(f"{path}: manifest must be a mapping")
+
+    defaults = data.get("defaults") or {}
+    services = data.get("services")
+    if not isinstance(defaults, dict):
+        raise BatchManifestError(f"{path}: 'defaults' must be a mapping")
+    if not isinstance(services, list) or not services:
+        raise BatchManifestError(f"{path}: 'services' must be a non-empty list")
+
+    jobs: list[BatchJob] = []
+    seen: set[str] = set()
+    for position, entry in enumerate(services, start=1):
+        if not isinstance(entry, dict):
+            raise BatchManifestError(f"{path}: services[{position}] must be a mapping")
+        entry = {**defaults, **entry}
+        service = entry.pop("service", None)
+        spec = entry.pop("spec", None)
+        if not service or not spec:
+            raise BatchManifestError(
+                f"{path}: services[{position}] requires 'service' and 'spec'"
+            )
+        if not isinstance(service, str):
+            raise BatchManifestError(
+                f"{path}: services[{position}] 'service' must be a string"
+            )
+        where = f"{path}: service {service!r}"
+        if service in seen:
+            raise BatchManifestError(f"{where} is listed twice")
+        if not isinstance(spec, str):
+            raise BatchManifestError(f"{where}: 'spec' must be a string")
+        options = _build_options(entry, where)
+        seen.add(service)
+        jobs.append(
+            BatchJob(
+                service=service,
+                spec=_resolve_spec(spec, path.parent),
+                options=options,
+            )
+        )
+    return jobs
+
+
+def _build_options(entry: dict[str, Any], where: str) -> GenerationOptions:
+    unknown = set(entry) - _OPTION_NAMES
+    if unknown:
+        raise BatchManifestError(
+            f"{where} has unknown keys: {', '.join(sorted(unknown))}"
+        )
+    for name, value in entry.items():
+        expected = type(getattr(_DEFAULT_OPTIONS, name))
+        if not isinstance(value, expected):
+            raise BatchManifestError(
+                f"{where}: {name!r} must be a {expected.__name__}, got {value!r}"
+            )
+    for name, choices in _OPTION_CHOICES.items():
+        value = entry.get(name)
+        if value is not None and value not in choices:
+            raise BatchManifestError(
+                f"{where} has unsupported {name} {value!r} "
+                f"(expected one of: {', '.join(choices)})"
+            )
+    return GenerationOptions(**entry)
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    workers: int | None = None,
+    *,
+    force: bool = False,
+    use_cache: bool = True,
+    template_dirs: Sequence[str | Path] = (),
+) -> list[BatchResult]:
+    """Generate every job on a process pool, one worker per core by default.
+
+    Remote specs are fetched up front, concurrently, over one pooled client;
+    as in a single-service run, each service keeps a copy of its spec in
+    ``clients/http/schemas`` and falls back to it when the fetch fails.
+    Workers leave the files they wrote unformatted; the parent formats them
+    in one call per formatter after all services are written, and only then
+    are the formatted file hashes stored in the manifest.
+    """
+    if not jobs:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    context = multiprocessing.get_context()
+    lock = context.Lock()
+    results: dict[str, BatchResult] = {}
+    format_targets: dict[str, list[str]] = {}
+    fetched = _prefetch_specs(jobs, use_cache)
+    sources: dict[str, SpecSource] = {}
+    for job in jobs:
+        if job.spec not in fetched:
+            continue
+        try:
+            sources[job.service] = settle_fetch(
+                job.spec, fetched[job.spec], job.service
+            )
+        except Exception as exc:  # noqa: BLE001 - reported per service
+            results[job.service] = BatchResult(
+                service=job.service, error=_describe_error(exc)
+            )
+    pending = [job for job in jobs if job.service not in results]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=set_shared_lock,
+        initargs=(lock,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _run_job,
+                job,
+                force,
+                use_cache,
+                sources.get(job.service),
+                tuple(template_dirs),
+            ): job
+            for job in pending
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                report = future.result()
+            except Exception as exc:  # noqa: BLE001 - reported per service
+                results[job.service] = BatchResult(
+                    service=job.service, error=_describe_error(exc)
+                )
+                continue
+            results[job.service] = BatchResult(service=job.service, report=report)
+            format_targets.setdefault(job.options.formatter, []).extend(
+                report.pending_format
+            )
+
+    for formatter, targets in format_targets.items():
+        format_paths(targets, formatter)
+    manifest = Manifest.load()
+    if manifest.services:
+        manifest.settle()
+        manifest.save()
+    return [results[job.service] for job in jobs]
+
+
+def _prefetch_specs(
+    jobs: list[BatchJob], use_cache: bool
+) -> dict[str, SpecSource | Exception]:
+    urls = [job.spec for job in jobs if is_url(job.spec)]
+    if not urls:
+        return {}
+    with ConditionalFetcher(SpecCache() if use_cache else None) as fetcher:
+        return fetcher.fetch_many(urls)
+
+
+def _run_job(
+    job: BatchJob,
+    force: bool,
+    use_cache: bool,
+    source: SpecSource | None,
+    template_dirs: tuple[str | Path, ...],
+) -> GenerationReport:
+    return generate_service(
+        job.service,
+        job.spec,
+        job.options,
+        force=force,
+        format_output=False,
+        use_cache=use_cache,
+        source=source,
+        template_dirs=template_dirs,
+    )
+
+
+def _describe_error(exc: Exception) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _resolve_spec(spec: str, base_dir: Path) -> str:
+    if is_url(spec):
+        return spec
+    spec_path = Path(spec).expanduser()
+    if not spec_path.is_absolute():
+        spec_path = base_dir / spec_path
+    return str(spec_path)
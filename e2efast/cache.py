@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from e2efast.manifest import tool_version
+
+CACHE_DIR_ENV = "E2EFAST_CACHE_DIR"
+CACHE_SIZE_ENV = "E2EFAST_CACHE_MAX_MB"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 16
+
+_MAGIC = b"E2EF"
+_FORMAT = 1
+
+
+def default_cache_dir() -> Path:
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "e2efast"
+
+
+def default_max_bytes() -> int:
+    try:
+        return int(float(os.environ[CACHE_SIZE_ENV]) * 1024 * 1024)
+    except (KeyError, ValueError):
+        return DEFAULT_MAX_BYTES
+
+
+class SpecCache:
+    """Parsed specs stored under ``~/.cache/e2efast`` and evicted LRU-first.
+
+    Entries are zlib-compressed pickles keyed by the spec content hash, the
+    service name and the versions of the tools that produced them. Reading
+    an entry refreshes its mtime, which is what eviction orders by.
+    """
+
+    def __init__(self, root: Path | None = None, max_bytes: int | None = None):
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.max_bytes = default_max_bytes() if max_bytes is None else max_bytes
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        payload = "\0".join(
+            (str(_FORMAT), tool_version(), sys.version.split()[0], *parts)
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        path = self._entry_path(namespace, key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        import pickle
+        import zlib
+
+        try:
+            if not data.startswith(_MAGIC):
+                raise ValueError("not a cache entry")
+            value = pickle.loads(zlib.decompress(data[len(_MAGIC) :]))
+        except Exception:  # noqa: BLE001 - stale or corrupt entries are misses
+            path.unlink(missing_ok=True)
+            return None
+        _touch(path)
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        import pickle
+        import tempfile
+        import zlib
+
+        data = _MAGIC + zlib.compress(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1
+        )
+        if len(data) > self.max_bytes:
+            return
+        path = self._entry_path(namespace, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for path in self.root.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*.bin"):
+            path.unlink(missing_ok=True)
+
+    def _entry_path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.bin"
+
+
+class MemoryCache(SpecCache):
+    """``SpecCache`` that also keeps the most recently used entries in memory.
+
+    Meant for long-running processes such as ``e2efast serve``: hits skip
+    unpickling, and at most ``max_entries`` values are held, least recently
+    used first out. Entries are written through to disk unless
+    ``persist=False``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        root: Path | None = None,
+        max_bytes: int | None = None,
+        persist: bool = True,
+    ) -> None:
+        super().__init__(root, max_bytes)
+        self.max_entries = max_entries
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        with self._lock:
+            value = self._entries.get((namespace, key))
+            if value is not None:
+                self._entries.move_to_end((namespace, key))
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = super().get(namespace, key) if self.persist else None
+        if value is not None:
+            self._remember(namespace, key, value)
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self._remember(namespace, key, value)
+        if self.persist:
+            super().put(namespace, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.persist:
+            super().clear()
+
+    def _remember(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = value
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
@@ -1,72 +1,557 @@
 from __future__ import annotations
 
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import click
 
-from restcodegen.generator.parser import Parser
+if TYPE_CHECKING:
+    from e2efast.pipeline import GenerationReport
 
-from e2efast.generators.http.client.generator import ClientGenerator
-from e2efast.generators.http.conftest.generator import ConftestGenerator
-from e2efast.generators.http.fixtures.generator import FixtureGenerator
-from e2efast.generators.http.v2fixtures.generator import ServiceFixtureGenerator
-from e2efast.generators.http.tests.generator import TestGenerator
-from e2efast.generators.http.v2tests.generator import ServiceTestGenerator
-from e2efast.generators.http.settings.generator import SettingsGenerator
-from e2efast.generators.readme.generator import ReadmeGenerator
+# Commands import the pipeline when they run, so ``--help`` and
+# ``--version`` only pay for click.
 
 
-FIXTURE_GENERATORS = {
-    "v1": FixtureGenerator,
-    "v2": ServiceFixtureGenerator,
-}
+class DefaultCommandGroup(click.Group):
+    """Group that falls back to ``default_command`` for unknown first arguments.
 
-TEST_GENERATORS = {
-    "v1": TestGenerator,
-    "v2": ServiceTestGenerator,
-}
+    Keeps ``e2efast SERVICE --spec ...`` working next to subcommands such as
+    ``e2efast batch manifest.yaml``. A service named after a subcommand needs
+    the explicit ``e2efast generate SERVICE --spec ...``; using the shorthand
+    for one is reported with that hint.
+    """
 
+    def __init__(self, *args, default_command: str, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
 
-@click.command()
-@click.argument("service", type=str)
-@click.option("--spec", "spec_url", required=True, help="OpenAPI spec URL or path")
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        group_options = {opt for param in self.get_params(ctx) for opt in param.opts}
+        if args and args[0] not in self.commands and args[0] not in group_options:
+            args = [self.default_command, *args]
+        elif (
+            len(args) > 1
+            and args[0] != self.default_command
+            and args[1].partition("=")[0] == "--spec"
+        ):
+            self._check_service_clash(ctx, args)
+        return super().parse_args(ctx, args)
+
+    def _check_service_clash(self, ctx: click.Context, args: list[str]) -> None:
+        # ``e2efast batch --spec ...`` is meant for a service called ``batch``
+        # unless the arguments make sense to the ``batch`` command itself.
+        name, *rest = args
+        try:
+            with self.commands[name].make_context(name, list(rest), parent=ctx):
+                return
+        except click.UsageError:
+            pass
+        command = " ".join([ctx.command_path, self.default_command, *args])
+        raise click.UsageError(
+            f"{name!r} is an e2efast command; to generate a service named "
+            f"{name!r}, run: {command}",
+            ctx,
+        )
+
+
+@click.group(cls=DefaultCommandGroup, default_command="generate")
+@click.version_option(package_name="e2efast", message="%(prog)s %(version)s")
+def main() -> None:
+    """Generate clients, fixtures, and tests from OpenAPI specs."""
+
+
+# Arguments and options of every command that generates a single service.
+_SERVICE_OPTIONS = [
+    click.argument("service", type=str),
+    click.option("--spec", "spec_url", required=True, help="OpenAPI spec URL or path"),
+    click.option(
+        "--with-fixtures",
+        "with_fixtures",
+        is_flag=True,
+        help="Generate fixtures alongside clients",
+    ),
+    click.option(
+        "--with-tests",
+        "with_tests",
+        is_flag=True,
+        help="Generate tests (implies fixtures)",
+    ),
+    click.option(
+        "--suite-version",
+        "suite_version",
+        type=click.Choice(["v1", "v2"]),
+        default="v2",
+        show_default=True,
+    ),
+    click.option(
+        "--test-layout",
+        "test_layout",
+        type=click.Choice(["per-operation", "per-tag", "per-service"]),
+        default="per-operation",
+        show_default=True,
+        help="One test module per operation, per tag or for the whole service",
+    ),
+    click.option(
+        "--async",
+        "async_mode",
+        is_flag=True,
+        help="Generate async clients, async session fixtures and asyncio tests",
+    ),
+    click.option(
+        "--formatter",
+        type=click.Choice(["ruff", "black", "none"]),
+        default="ruff",
+        show_default=True,
+        help="How written files are formatted: ruff subprocess or in-process black",
+    ),
+    click.option(
+        "--render-workers",
+        "render_workers",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="Workers rendering and writing per-operation test files",
+    ),
+    click.option(
+        "--render-executor",
+        "render_executor",
+        type=click.Choice(["thread", "process"]),
+        default="thread",
+        show_default=True,
+        help="Pool type used when --render-workers is above 1",
+    ),
+]
+
+
+def _service_options(command):
+    for option in reversed(_SERVICE_OPTIONS):
+        command = option(command)
+    return command
+
+
+# Options shared by the commands that read specs and render templates.
+_no_cache_option = click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    help="Do not read or write the spec and template caches in ~/.cache/e2efast",
+)
+_templates_option = click.option(
+    "--templates",
+    "template_dirs",
+    multiple=True,
+    envvar="E2EFAST_TEMPLATE_DIRS",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory with template overrides, e.g. <dir>/v2tests/service_test.jinja2",
+)
+
+
+@main.command("generate")
+@_service_options
 @click.option(
-    "--with-fixtures",
-    "with_fixtures",
+    "--force",
     is_flag=True,
-    help="Generate fixtures alongside clients",
+    help="Regenerate everything even if the manifest says outputs are up to date",
 )
 @click.option(
-    "--with-tests",
-    "with_tests",
+    "--prune",
     is_flag=True,
-    help="Generate tests (implies fixtures)",
+    help="Delete files earlier runs generated that this run no longer produces "
+    "(editable files you changed are kept)",
 )
+@_no_cache_option
+@_templates_option
 @click.option(
-    "--suite-version",
-    "suite_version",
-    type=click.Choice(["v1", "v2"]),
-    default="v2",
-    show_default=True,
+    "--profile",
+    is_flag=True,
+    help="Print a per-stage timing tree with file and formatter counts",
+)
+@click.option(
+    "--profile-json",
+    "profile_json",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the timing tree as JSON to this file (implies --profile)",
+)
+@click.option(
+    "--profile-pstats",
+    "profile_pstats",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Record the run with cProfile and dump pstats to this file",
 )
-def main(
+@click.option(
+    "--no-daemon",
+    "no_daemon",
+    is_flag=True,
+    help="Generate in this process even if `e2efast serve` is running",
+)
+@click.option(
+    "--dry-run",
+    "dry_run",
+    is_flag=True,
+    help="Render in memory and print a JSON summary of added, changed and "
+    "removed files without writing anything",
+)
+@click.option(
+    "--diff",
+    "show_diff",
+    is_flag=True,
+    help="Print a unified diff of what would change (implies --dry-run)",
+)
+def generate(
     service: str,
     spec_url: str,
     with_fixtures: bool,
     with_tests: bool,
     suite_version: str,
+    test_layout: str,
+    async_mode: bool,
+    formatter: str,
+    render_workers: int,
+    render_executor: str,
+    force: bool,
+    prune: bool,
+    no_cache: bool,
+    template_dirs: tuple[Path, ...],
+    profile: bool,
+    profile_json: Path | None,
+    profile_pstats: Path | None,
+    no_daemon: bool,
+    dry_run: bool,
+    show_diff: bool,
 ) -> None:
     """Generate clients, fixtures, and tests for SERVICE from SPEC."""
-    parser = Parser.from_source(spec_url, package_name=service)
-    ClientGenerator(openapi_spec=parser, async_mode=False).generate()
-    generate_fixtures = with_fixtures or with_tests
-    if generate_fixtures:
-        fixture_generator = FIXTURE_GENERATORS[suite_version]
-        fixture_generator(openapi_spec=parser).generate()
-        ConftestGenerator(openapi_spec=parser).generate()
-        SettingsGenerator(openapi_spec=parser).generate()
-    if with_tests:
-        test_generator = TEST_GENERATORS[suite_version]
-        test_generator(openapi_spec=parser, async_mode=False).generate()
-        ReadmeGenerator(openapi_spec=parser).generate()
+    from e2efast.generators.rendering import RenderSettings
+    from e2efast.pipeline import GenerationOptions, GenerationReport
+
+    options = GenerationOptions(
+        with_fixtures=with_fixtures,
+        with_tests=with_tests,
+        suite_version=suite_version,
+        test_layout=test_layout,
+        async_mode=async_mode,
+        formatter=formatter,
+    )
+    render_settings = RenderSettings(workers=render_workers, executor=render_executor)
+    profiled = profile or profile_json is not None or profile_pstats is not None
+    dry_run = dry_run or show_diff
+    if not no_daemon and not profiled:
+        from e2efast.daemon import (
+            DaemonError,
+            diff_request,
+            generate_request,
+            send_request,
+        )
+
+        if dry_run:
+            request = diff_request(
+                service,
+                spec_url,
+                options,
+                unified=show_diff,
+                use_cache=not no_cache,
+                render_settings=render_settings,
+                template_dirs=template_dirs,
+            )
+        else:
+            request = generate_request(
+                service,
+                spec_url,
+                options,
+                force=force,
+                prune=prune,
+                use_cache=not no_cache,
+                render_settings=render_settings,
+                template_dirs=template_dirs,
+            )
+        try:
+            response = send_request(request)
+        except (DaemonError, OSError) as exc:
+            response = {"ok": False, "error": str(exc)}
+        if response is not None and not response["ok"]:
+            # A daemon serving another project (or failing for any other
+            # reason) is skipped just like one that is not running.
+            click.echo(f"daemon: {response['error']}; generating in-process", err=True)
+            response = None
+        if response is not None:
+            if dry_run:
+                _echo_diff(response["diff"], response.get("unified"))
+            else:
+                click.echo(_describe(GenerationReport.from_dict(response["report"])))
+            return
+
+    from e2efast.pipeline import generate_service
+    from e2efast.profiling import Profiler, profiling
+    from e2efast.spec import SpecNotFoundError
+
+    profiler = Profiler(service, cprofile=profile_pstats is not None)
+    try:
+        with profiling(profiler):
+            if dry_run:
+                from e2efast.api import generate as generate_tree
+
+                diff = generate_tree(
+                    spec_url,
+                    service,
+                    options,
+                    root=Path.cwd(),
+                    use_cache=not no_cache,
+                    render_settings=render_settings,
+                    template_dirs=template_dirs,
+                ).diff(Path.cwd())
+            else:
+                report = generate_service(
+                    service,
+                    spec_url,
+                    options,
+                    force=force,
+                    prune=prune,
+                    use_cache=not no_cache,
+                    render_settings=render_settings,
+                    template_dirs=template_dirs,
+                )
+    except SpecNotFoundError as exc:
+        raise click.ClickException(str(exc)) from exc
+    if dry_run:
+        _echo_diff(diff.to_dict(), diff.unified() if show_diff else None)
+    else:
+        click.echo(_describe(report))
+    if profiled:
+        click.echo(profiler.report(), err=True)
+    if profile_json:
+        profiler.write_json(profile_json)
+    if profile_pstats:
+        profiler.dump_pstats(profile_pstats)
+
+
+@main.command("watch")
+@_service_options
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=0.5,
+    show_default=True,
+    help="Seconds between checks of the spec and template overrides",
+)
+@_no_cache_option
+@_templates_option
+def watch(
+    service: str,
+    spec_url: str,
+    with_fixtures: bool,
+    with_tests: bool,
+    suite_version: str,
+    test_layout: str,
+    async_mode: bool,
+    formatter: str,
+    render_workers: int,
+    render_executor: str,
+    interval: float,
+    no_cache: bool,
+    template_dirs: tuple[Path, ...],
+) -> None:
+    """Regenerate SERVICE whenever SPEC or the template overrides change."""
+    from e2efast.generators.rendering import RenderSettings
+    from e2efast.pipeline import GenerationOptions
+    from e2efast.watch import Watcher, WatchResult
+
+    watcher = Watcher(
+        service,
+        spec_url,
+        GenerationOptions(
+            with_fixtures=with_fixtures,
+            with_tests=with_tests,
+            suite_version=suite_version,
+            test_layout=test_layout,
+            async_mode=async_mode,
+            formatter=formatter,
+        ),
+        interval=interval,
+        use_cache=not no_cache,
+        template_dirs=template_dirs,
+        render_settings=RenderSettings(
+            workers=render_workers, executor=render_executor
+        ),
+    )
+
+    def report(result: WatchResult) -> None:
+        if result.recovered:
+            click.echo(f"{service}: spec is readable again")
+        if result.report is not None:
+            click.echo(_describe(result.report))
+        elif result.error is not None:
+            click.echo(f"{service}: failed: {result.error}", err=True)
+
+    click.echo(f"Watching {spec_url} for {service} (Ctrl+C to stop)")
+    try:
+        watcher.run(report)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+@main.command("serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Unix socket to listen on  [default: .e2efast/daemon.sock]",
+)
+@click.option(
+    "--max-specs",
+    "max_specs",
+    type=click.IntRange(min=1),
+    default=16,
+    show_default=True,
+    help="Parsed specs kept in memory before the least recently used is dropped",
+)
+@click.option("--stop", is_flag=True, help="Stop the daemon listening on --socket")
+@click.option("--status", is_flag=True, help="Show the state of the running daemon")
+def serve(socket_path: Path | None, max_specs: int, stop: bool, status: bool) -> None:
+    """Keep specs and templates warm and serve `e2efast generate` requests.
+
+    While the daemon runs, `e2efast SERVICE --spec ...` in this directory is
+    forwarded to it instead of generating in a fresh process.
+    """
+    from e2efast.daemon import DEFAULT_SOCKET, DaemonError, send_request, serve
+
+    socket_path = socket_path or DEFAULT_SOCKET
+    if stop or status:
+        response = send_request(
+            {"command": "shutdown" if stop else "status"}, socket_path
+        )
+        if response is None:
+            raise click.ClickException(f"no daemon is listening on {socket_path}")
+        if status:
+            for key, value in response.items():
+                if key != "ok":
+                    click.echo(f"{key}: {value}")
+        return
+
+    click.echo(f"Serving {Path.cwd()} on {socket_path} (Ctrl+C to stop)")
+    try:
+        serve(socket_path, max_specs)
+    except DaemonError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@main.command("impact")
+@click.argument("service", type=str)
+@click.option("--spec", "spec_url", required=True, help="New OpenAPI spec URL or path")
+@click.option(
+    "--base-spec",
+    "base_spec",
+    default=None,
+    help="Old spec to compare with  [default: the one recorded in the manifest]",
+)
+@click.option(
+    "--output",
+    "output",
+    type=click.Choice(["json", "files", "node-ids"]),
+    default="json",
+    show_default=True,
+    help="Full JSON report, affected test files, or pytest node IDs one per line",
+)
+@_no_cache_option
+def impact(
+    service: str,
+    spec_url: str,
+    base_spec: str | None,
+    output: str,
+    no_cache: bool,
+) -> None:
+    """List operations, models and generated tests SPEC changes for SERVICE.
+
+    Typical CI use: pytest $(e2efast impact SERVICE --spec new.json --output node-ids)
+    """
+    from e2efast.impact import ImpactError, analyze_impact
+    from e2efast.spec import SpecNotFoundError
+
+    try:
+        report = analyze_impact(
+            service, spec_url, base_spec=base_spec, use_cache=not no_cache
+        )
+    except (ImpactError, SpecNotFoundError) as exc:
+        raise click.ClickException(str(exc)) from exc
+    if output == "json":
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        for line in report.test_files if output == "files" else report.node_ids:
+            click.echo(line)
+
+
+@main.command("batch")
+@click.argument(
+    "manifest", type=click.Path(exists=True, dir_okay=False, path_type=Path)
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes  [default: one per CPU core]",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Regenerate everything even if the manifest says outputs are up to date",
+)
+@_no_cache_option
+@_templates_option
+def batch(
+    manifest: Path,
+    workers: int | None,
+    force: bool,
+    no_cache: bool,
+    template_dirs: tuple[Path, ...],
+) -> None:
+    """Generate every service listed in MANIFEST in parallel."""
+    from e2efast.batch import BatchManifestError, load_manifest, run_batch
+
+    try:
+        jobs = load_manifest(manifest)
+    except BatchManifestError as exc:
+        raise click.BadParameter(str(exc), param_hint="MANIFEST") from exc
+
+    results = run_batch(
+        jobs,
+        workers=workers,
+        force=force,
+        use_cache=not no_cache,
+        template_dirs=template_dirs,
+    )
+    failed = [result for result in results if not result.ok]
+    for result in results:
+        if result.report is not None:
+            click.echo(_describe(result.report))
+        else:
+            click.echo(f"{result.service}: failed: {result.error}")
+    if failed:
+        sys.exit(1)
+
+
+def _echo_diff(summary: dict, unified: str | None) -> None:
+    if unified is None:
+        click.echo(json.dumps(summary, indent=2))
+    elif unified:
+        click.echo(unified, nl=False)
+
+
+def _describe(report: GenerationReport) -> str:
+    if report.up_to_date:
+        return f"{report.service}: up to date"
+    files = report.files
+    counts = (
+        f"{files.written} written, {files.unchanged} unchanged, {files.skipped} skipped"
+    )
+    if report.pruned or report.kept_edited:
+        counts += f", {len(report.pruned)} pruned"
+    if report.kept_edited:
+        counts += f", {len(report.kept_edited)} edited kept"
+    if report.regenerated_apis is not None:
+        apis = ", ".join(report.regenerated_apis) or "no APIs"
+        return f"{report.service}: regenerated {apis} ({counts})"
+    return f"{report.service}: generated ({counts})"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SOCKET = Path(".e2efast") / "daemon.sock"
+DEFAULT_MAX_SPECS = 16
+
+
+class DaemonError(RuntimeError):
+    """Raised when the generation daemon cannot be started or answers an error."""
+
+
+def send_request(
+    request: dict[str, Any], socket_path: Path = DEFAULT_SOCKET
+) -> dict[str, Any] | None:
+    """Send one request to the daemon; ``None`` when no daemon is listening."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := client.recv(65536):
+            chunks.append(chunk)
+    finally:
+        client.close()
+    if not chunks:
+        raise DaemonError("daemon closed the connection without answering")
+    return json.loads(b"".join(chunks))
+
+
+def generate_request(
+    service: str,
+    spec_url: str,
+    options: Any,
+    *,
+    force: bool = False,
+    prune: bool = False,
+    use_cache: bool = True,
+    render_settings: Any = None,
+    template_dirs: tuple[Path, ...] = (),
+) -> dict[str, Any]:
+    """Request payload equivalent to a :func:`generate_service` call."""
+    from dataclasses import asdict
+
+    return {
+        "command": "generate",
+        "cwd": os.getcwd(),
+        "service": service,
+        "spec": spec_url,
+        "options": asdict(options),
+        "force": force,
+        "prune": prune,
+        "use_cache": use_cache,
+        "render_settings": asdict(render_settings) if render_settings else None,
+        "template_dirs": [str(Path(path).resolve()) for path in template_dirs],
+    }
+
+
+def diff_request(
+    service: str,
+    spec_url: str,
+    options: Any,
+    *,
+    unified: bool = False,
+    use_cache: bool = True,
+    render_settings: Any = None,
+    template_dirs: tuple[Path, ...] = (),
+) -> dict[str, Any]:
+    """Request payload for a dry run compared against the project on disk."""
+    return {
+        **generate_request(
+            service,
+            spec_url,
+            options,
+            use_cache=use_cache,
+            render_settings=render_settings,
+            template_dirs=template_dirs,
+        ),
+        "command": "diff",
+        "unified": unified,
+    }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: GenerationServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+            response = self.server.dispatch(request)
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class GenerationServer(socketserver.UnixStreamServer):
+    """Serves generation requests for the project in the current directory.
+
+    Parsed specs are kept in a :class:`MemoryCache` (least recently used out
+    beyond ``max_specs``), compiled templates in the shared Jinja environment
+    and the manifest is only re-read when it changes on disk. Requests are
+    handled one at a time: generation writes relative to the working
+    directory and uses process-wide output and template state.
+    """
+
+    def __init__(
+        self, socket_path: Path = DEFAULT_SOCKET, max_specs: int = DEFAULT_MAX_SPECS
+    ) -> None:
+        from e2efast.cache import MemoryCache
+
+        self.socket_path = Path(socket_path)
+        self.root = os.getcwd()
+        self.cache = MemoryCache(max_entries=max_specs)
+        self.started = time.time()
+        self.requests = 0
+        self._fetcher: Any = None
+        _claim_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _RequestHandler)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        self.requests += 1
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "root": self.root}
+        if command == "status":
+            return {"ok": True, **self.status()}
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if command == "generate":
+            return {"ok": True, "report": self.generate(request).to_dict()}
+        if command == "diff":
+            diff = self.diff(request)
+            response = {"ok": True, "diff": diff.to_dict()}
+            if request.get("unified"):
+                response["unified"] = diff.unified()
+            return response
+        raise DaemonError(f"unknown command {command!r}")
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "root": self.root,
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "cached_specs": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+    def generate(self, request: dict[str, Any]) -> Any:
+        from e2efast.pipeline import GenerationOptions, generate_service
+
+        self._check_root(request)
+        use_cache = request.get("use_cache", True)
+        return generate_service(
+            request["service"],
+            request["spec"],
+            GenerationOptions(**request.get("options", {})),
+            force=request.get("force", False),
+            prune=request.get("prune", False),
+            use_cache=use_cache,
+            spec_cache=self.cache if use_cache else None,
+            source=self._fetch(request["spec"]),
+            render_settings=self._render_settings(request),
+            template_dirs=request.get("template_dirs", ()),
+        )
+
+    def diff(self, request: dict[str, Any]) -> Any:
+        from e2efast.api import generate
+        from e2efast.pipeline import GenerationOptions
+
+        self._check_root(request)
+        use_cache = request.get("use_cache", True)
+        tree = generate(
+            self._fetch(request["spec"]) or request["spec"],
+            request["service"],
+            GenerationOptions(**request.get("options", {})),
+            root=self.root,
+            use_cache=use_cache,
+            spec_cache=self.cache if use_cache else None,
+            render_settings=self._render_settings(request),
+            template_dirs=request.get("template_dirs", ()),
+        )
+        return tree.diff(self.root)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._fetcher is not None:
+            self._fetcher.close()
+        self.socket_path.unlink(missing_ok=True)
+
+    def _fetch(self, spec_url: str) -> Any:
+        from e2efast.spec import ConditionalFetcher, is_url
+
+        if not is_url(spec_url):
+            return None
+        if self._fetcher is None:
+            self._fetcher = ConditionalFetcher(self.cache)
+        return self._fetcher.fetch(spec_url)
+
+    @staticmethod
+    def _render_settings(request: dict[str, Any]) -> Any:
+        from e2efast.generators.rendering import RenderSettings
+
+        render_settings = request.get("render_settings")
+        return RenderSettings(**render_settings) if render_settings else None
+
+    def _check_root(self, request: dict[str, Any]) -> None:
+        cwd = request.get("cwd")
+        if cwd is not None and os.path.realpath(cwd) != os.path.realpath(self.root):
+            raise DaemonError(f"daemon serves {self.root}, not {cwd}")
+
+
+def serve(
+    socket_path: Path = DEFAULT_SOCKET, max_specs: int = DEFAULT_MAX_SPECS
+) -> None:
+    """Run the daemon until it receives ``shutdown`` or is interrupted."""
+    with GenerationServer(socket_path, max_specs) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _claim_socket(socket_path: Path) -> None:
+    if socket_path.exists():
+        try:
+            alive = send_request({"command": "ping"}, socket_path) is not None
+        except (OSError, DaemonError, ValueError):
+            alive = False
+        if alive:
+            raise DaemonError(f"a daemon is already listening on {socket_path}")
+        socket_path.unlink()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
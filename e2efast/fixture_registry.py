@@ -1,9 +1,249 @@
-_PLUGINS: set[str] = set()
+"""Registry of generated fixture modules and the pytest plugin loading them.
+
+The generated ``tests/conftest.py`` enables this module as a pytest plugin
+(``pytest_plugins = get_fixtures()``). Rather than importing the fixtures of
+every service, and with them every client and model package, up front, the
+plugin imports a service's fixture module while pytest collects a test that
+needs it: one below a directory named after the service
+(``tests/http/<service>``) or one asking for a fixture the module defines.
+``pytest tests/http/customers`` therefore loads the customers fixtures alone.
+
+Fixture modules are looked up in the packages listed in the
+``e2efast_fixture_packages`` ini option (``framework.fixtures.http`` by
+default) without importing them.
+
+PYTEST_DONT_REWRITE: conftest imports ``get_fixtures`` from here before pytest
+loads the module as a plugin, too late to rewrite its (absent) asserts.
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib.util
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import pytest
+
+FIXTURE_PACKAGES_INI = "e2efast_fixture_packages"
+DEFAULT_FIXTURE_PACKAGES = ["framework.fixtures.http"]
+ASYNC_PLUGIN = "pytest_asyncio"
+
+# Insertion ordered, so ``get_fixtures`` is the same on every run.
+_PLUGINS: dict[str, None] = {}
 
 
 def register_fixture(fixture: str) -> None:
-    _PLUGINS.add(fixture)
+    _PLUGINS.setdefault(fixture)
 
 
 def get_fixtures() -> list[str]:
-    return list(_PLUGINS)
+    """This plugin followed by the fixture modules imported so far."""
+    return [__name__, *_PLUGINS]
+
+
+@dataclass(frozen=True)
+class FixtureModule:
+    """A generated fixture module, found without importing it."""
+
+    name: str
+    services: frozenset[str]
+    fixtures: frozenset[str]
+
+
+def find_fixture_modules(packages: list[str]) -> list[FixtureModule]:
+    """The fixture modules of ``packages``, in package then file name order.
+
+    A module serves the service it is named after: ``customers.py`` (v1
+    suites) and ``customers_service.py`` (v2) both serve ``customers``.
+    """
+    modules: list[FixtureModule] = []
+    for package in packages:
+        directory = _package_dir(package)
+        if directory is None:
+            continue
+        for path in sorted(directory.glob("*.py")):
+            if path.stem in {"__init__", "base"}:
+                continue
+            services = {path.stem, path.stem.removesuffix("_service")}
+            modules.append(
+                FixtureModule(
+                    name=f"{package}.{path.stem}",
+                    services=frozenset(services),
+                    fixtures=frozenset(_defined_fixtures(path)),
+                )
+            )
+    return modules
+
+
+def requested_fixtures(path: Path) -> set[str]:
+    """Fixture names a test or conftest module may ask for.
+
+    Every argument of a function defined in the module counts, as does every
+    name passed to ``usefixtures``; names that are no fixture are harmless.
+    """
+    tree = _parse(path)
+    if tree is None:
+        return set()
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            names.update(
+                argument.arg
+                for argument in (
+                    *arguments.posonlyargs,
+                    *arguments.args,
+                    *arguments.kwonlyargs,
+                )
+            )
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "usefixtures"
+        ):
+            names.update(
+                arg.value
+                for arg in node.args
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str)
+            )
+    return names
+
+
+class FixtureLoader:
+    """Imports the fixture modules of the tests pytest collects."""
+
+    def __init__(self, config: pytest.Config) -> None:
+        self.config = config
+        self._modules: list[FixtureModule] | None = None
+        self._loaded: set[str] = set()
+
+    @property
+    def modules(self) -> list[FixtureModule]:
+        if self._modules is None:
+            packages = self.config.getini(FIXTURE_PACKAGES_INI)
+            self._modules = find_fixture_modules(packages)
+        return self._modules
+
+    @property
+    def loaded(self) -> list[str]:
+        return [module.name for module in self.modules if module.name in self._loaded]
+
+    def needed_by(self, path: Path) -> list[FixtureModule]:
+        """Modules of the service ``path`` lives in and of the fixtures it uses."""
+        needed: list[FixtureModule] = []
+        service = self._service_of(path)
+        if service is not None:
+            needed = [module for module in self.modules if service in module.services]
+
+        provided = {name for module in needed for name in module.fixtures}
+        for name in sorted(requested_fixtures(path) - provided):
+            needed.extend(
+                module
+                for module in self.modules
+                if name in module.fixtures and module not in needed
+            )
+        return needed
+
+    def load(self, modules: list[FixtureModule]) -> None:
+        for module in modules:
+            if module.name in self._loaded:
+                continue
+            self._loaded.add(module.name)
+            try:
+                self.config.pluginmanager.import_plugin(module.name)
+            except ImportError as exc:
+                if _missing_module(exc) != ASYNC_PLUGIN:
+                    raise
+                import pytest
+
+                # Reported as this message alone, not as an import traceback.
+                raise pytest.Collector.CollectError(
+                    f"{module.name} was generated with --async and needs "
+                    "pytest-asyncio>=0.24: pip install 'e2efast[async]'"
+                ) from exc
+
+    def pytest_plugin_registered(self, plugin: Any) -> None:
+        # Fixtures of a conftest may depend on service fixtures too.
+        file = getattr(plugin, "__file__", None)
+        if file is not None and Path(file).name == "conftest.py":
+            self.load(self.needed_by(Path(file)))
+
+    def pytest_collect_file(self, file_path: Path) -> None:
+        patterns = self.config.getini("python_files")
+        if file_path.suffix == ".py" and any(
+            fnmatch(file_path.name, pattern) for pattern in patterns
+        ):
+            self.load(self.needed_by(file_path))
+
+    def _service_of(self, path: Path) -> str | None:
+        try:
+            parts = path.parent.relative_to(self.config.rootpath).parts
+        except ValueError:
+            parts = path.parent.parts
+        services = {service for module in self.modules for service in module.services}
+        return next((part for part in parts if part in services), None)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addini(
+        FIXTURE_PACKAGES_INI,
+        "Packages holding the e2efast fixture modules loaded on demand.",
+        type="linelist",
+        default=DEFAULT_FIXTURE_PACKAGES,
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.pluginmanager.register(FixtureLoader(config), "e2efast-fixture-loader")
+
+
+def _package_dir(package: str) -> Path | None:
+    # Only the top-level package is looked up: importing ``package`` itself
+    # would run its ``__init__``, which is what the plugin tries to avoid.
+    top, _, rest = package.partition(".")
+    try:
+        spec = importlib.util.find_spec(top)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    for location in spec.submodule_search_locations:
+        directory = Path(location, *rest.split(".")) if rest else Path(location)
+        if directory.is_dir():
+            return directory
+    return None
+
+
+def _defined_fixtures(path: Path) -> set[str]:
+    tree = _parse(path)
+    if tree is None:
+        return set()
+    return {
+        node.name
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and any(
+            "fixture" in ast.unparse(decorator) for decorator in node.decorator_list
+        )
+    }
+
+
+def _missing_module(exc: BaseException) -> str | None:
+    # pytest re-raises a failed plugin import as a plain ImportError.
+    cause: BaseException | None = exc
+    while cause is not None:
+        if isinstance(cause, ModuleNotFoundError):
+            return cause.name
+        cause = cause.__cause__
+    return None
+
+
+def _parse(path: Path) -> ast.Module | None:
+    try:
+        return ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return None
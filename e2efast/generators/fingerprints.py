@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+
+def digest(data: Any) -> str:
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpecFingerprinter:
+    """Content hashes for operations and components of a normalized spec.
+
+    An operation fingerprint covers the raw operation and every component it
+    reaches through ``$ref`` (transitively), so editing a nested model changes
+    the fingerprint of each operation that uses it.
+    """
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        self.spec = spec
+        self._component_hashes: dict[str, str] = {}
+        self._direct_refs: dict[str, set[str]] = {}
+
+    def operation(self, path: str, method: str, raw_operation: dict) -> str:
+        refs = self.ref_closure(raw_operation)
+        return digest(
+            {
+                "path": path,
+                "method": method,
+                "operation": raw_operation,
+                "refs": {ref: self.component_hash(ref) for ref in sorted(refs)},
+            }
+        )
+
+    def models(self) -> str:
+        return digest(self.spec.get("components", {}))
+
+    def schemas(self) -> dict[str, str]:
+        schemas = self.spec.get("components", {}).get("schemas", {})
+        return {
+            name: self.component_hash(f"#/components/schemas/{name}")
+            for name in sorted(schemas)
+        }
+
+    def ref_closure(self, node: Any) -> set[str]:
+        seen: set[str] = set()
+        pending = list(_collect_refs(node))
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            pending.extend(self._refs_of(ref) - seen)
+        return seen
+
+    def component_hash(self, ref: str) -> str:
+        value = self._component_hashes.get(ref)
+        if value is None:
+            value = digest(self.resolve(ref))
+            self._component_hashes[ref] = value
+        return value
+
+    def resolve(self, ref: str) -> Any:
+        if not ref.startswith("#/"):
+            return None
+        node: Any = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _refs_of(self, ref: str) -> set[str]:
+        refs = self._direct_refs.get(ref)
+        if refs is None:
+            refs = _collect_refs(self.resolve(ref))
+            self._direct_refs[ref] = refs
+        return refs
+
+
+def _collect_refs(node: Any) -> set[str]:
+    refs: set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str):
+                refs.add(ref)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
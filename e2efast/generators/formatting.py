@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+
+from e2efast import profiling
+from e2efast.generators.output import atomic_write
+
+DEFAULT_FORMATTER = "ruff"
+
+
+def format_with_ruff(paths: list[str], *options: str) -> None:
+    from restcodegen.generator.utils import run_command
+
+    run_command(["ruff", "format", *options, *paths])
+    run_command(["ruff", "check", *options, *paths, "--fix"])
+
+
+def format_with_black(paths: list[str]) -> None:
+    """Format in-process with isort + black, without spawning a subprocess."""
+    format_source = _black_formatter(Path.cwd())
+    for path in _python_files(paths):
+        source = path.read_text(encoding="utf-8")
+        formatted = format_source(source)
+        if formatted != source:
+            atomic_write(path, formatted.encode("utf-8"))
+
+
+def format_noop(paths: list[str]) -> None:
+    return None
+
+
+FORMATTERS = {
+    "ruff": format_with_ruff,
+    "black": format_with_black,
+    "none": format_noop,
+}
+
+
+def format_paths(paths: Iterable[str], formatter: str = DEFAULT_FORMATTER) -> None:
+    """Format ``paths`` (files or directories) in a single formatter run."""
+    targets = list(dict.fromkeys(paths))
+    if not targets:
+        return
+    with profiling.span(f"format ({formatter})"):
+        profiling.count(profiling.FORMATTER_CALLS)
+        profiling.count(profiling.FILES_FORMATTED, len(targets))
+        FORMATTERS[formatter](targets)
+
+
+def format_sources(
+    sources: Mapping[str, str],
+    formatter: str = DEFAULT_FORMATTER,
+    root: Path | None = None,
+) -> dict[str, str]:
+    """Format Python sources keyed by relative path, without touching ``root``.
+
+    The result matches formatting the same files inside ``root`` (whose
+    formatter configuration is used): black runs on the strings, ruff reads
+    each one on stdin under its path in ``root``.
+    """
+    root = Path(root).resolve() if root is not None else Path.cwd()
+    targets = {path: text for path, text in sources.items() if path.endswith(".py")}
+    if not targets or formatter == "none":
+        return dict(sources)
+    with profiling.span(f"format ({formatter})"):
+        profiling.count(profiling.FORMATTER_CALLS)
+        profiling.count(profiling.FILES_FORMATTED, len(targets))
+        if formatter == "black":
+            format_source = _black_formatter(root)
+            formatted = {path: format_source(text) for path, text in targets.items()}
+        else:
+            formatted = _format_with_ruff_stdin(targets, root)
+    return {**sources, **formatted}
+
+
+def _format_with_ruff_stdin(sources: dict[str, str], root: Path) -> dict[str, str]:
+    # Each source goes through ruff on stdin under its real path in ``root``:
+    # ruff picks the configuration that file would get and sorts imports of
+    # the project's own packages as first-party, as it does on disk.
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    def format_source(item: tuple[str, str]) -> tuple[str, str]:
+        path, text = item
+        filename = str(root / path)
+        text = _ruff_stdin(["format", "--stdin-filename", filename], text, root)
+        text = _ruff_stdin(
+            ["check", "--fix", "--exit-zero", "--stdin-filename", filename],
+            text,
+            root,
+        )
+        return path, text
+
+    workers = min(len(sources), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(format_source, sources.items()))
+
+
+def _ruff_stdin(arguments: list[str], text: str, root: Path) -> str:
+    import subprocess
+
+    result = subprocess.run(
+        ["ruff", *arguments, "--no-cache", "-"],
+        input=text,
+        capture_output=True,
+        text=True,
+        cwd=root,
+        check=False,
+    )
+    # Sources ruff cannot parse are left as they are, as on disk.
+    return result.stdout if result.returncode == 0 else text
+
+
+def _black_formatter(root: Path) -> Callable[[str], str]:
+    try:
+        import black
+        import isort
+    except ImportError as exc:  # pragma: no cover - both ship with restcodegen
+        raise RuntimeError(
+            "The 'black' formatter requires the black and isort packages"
+        ) from exc
+
+    mode = _black_mode(black, root)
+    isort_config = isort.Config(profile="black", line_length=mode.line_length)
+
+    def format_source(source: str) -> str:
+        formatted = isort.code(source, config=isort_config)
+        try:
+            return black.format_str(formatted, mode=mode)
+        except black.InvalidInput:
+            return source
+
+    return format_source
+
+
+def _python_files(paths: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.py")) if path.is_dir() else [path])
+    return files
+
+
+def _black_mode(black, root: Path):
+    config_path = black.find_pyproject_toml((str(root),))
+    config = black.parse_pyproject_toml(config_path) if config_path else {}
+    return black.Mode(
+        line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+        string_normalization=not config.get("skip_string_normalization", False),
+        magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+    )
@@ -1,20 +1,165 @@
+import json
+from functools import cached_property
 from pathlib import Path
-from shutil import rmtree
+from tempfile import TemporaryDirectory
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
-from restcodegen.generator.codegen import RESTClientGenerator
+from datamodel_code_generator import DataModelType, generate
+from markupsafe import Markup
+from restcodegen.generator.log import LOGGER
 from restcodegen.generator.parser import Parser
-from restcodegen.generator.utils import (
-    create_and_write_file,
-    name_to_snake,
+from restcodegen.generator.utils import name_to_snake, snake_to_camel
+
+from e2efast import profiling
+from e2efast.generators.model_modules import split_models
+from e2efast.generators.operations import OperationIndex
+from e2efast.generators.templating import (
+    TemplateGenerator,
+    TemplateNamespace,
+    current_template_settings,
+)
+from e2efast.generators.utils import (
+    file_exists,
     format_file,
+    skip_file,
+    write_file,
 )
+from e2efast.utils import get_version, load_template, render_header
+
+
+class InternalClientGenerator(TemplateGenerator):
+    """Internal API clients and models, rendered from restcodegen's templates.
+
+    Only the templates come from restcodegen; its ``RESTClientGenerator``
+    builds a private Jinja environment and resolves its version by scanning
+    every installed distribution, so the rendering is done here instead.
+    """
+
+    # ``RESTClientGenerator`` defaults to ``clients/http``; creating that
+    # package next to ours is what left stray ``clients/`` directories.
+    BASE_PATH = Path("") / "internal" / "clients" / "http"
+
+    def __init__(
+        self,
+        openapi_spec: Parser,
+        operation_index: OperationIndex | None = None,
+        templates_dir: str | None = None,
+        async_mode: bool = False,
+        base_path: str | Path | None = None,
+    ) -> None:
+        super().__init__(templates_dir=templates_dir)
+        self.openapi_spec = openapi_spec
+        self.async_mode = async_mode
+        self.base_path = Path(base_path) if base_path is not None else self.BASE_PATH
+        self.operation_index = operation_index or OperationIndex(openapi_spec)
+        self._lazy_init_env = TemplateNamespace(
+            Path(__file__).parent / "templates", current_template_settings()
+        )
+
+    @cached_property
+    def base_import(self) -> str:
+        base = self.base_path
+        if base.is_absolute():
+            try:
+                base = base.relative_to(Path.cwd())
+            except ValueError:
+                pass
+        return ".".join(base.parts)
+
+    def generate(self) -> None:
+        self._gen_clients()
+        self._gen_init_apis()
+        self._gen_models()
 
-from e2efast.utils import get_version, render_header
+    def _gen_init_apis(self) -> None:
+        LOGGER.info("Generate __init__.py for apis")
+        exports = [
+            (f"apis.{name_to_snake(api_name)}_api", [self._api_class_name(api_name)])
+            for api_name in self.operation_index.apis
+        ]
+        file_name = f"{name_to_snake(self.openapi_spec.service_name)}/__init__.py"
+        file_path = self.base_path / file_name
+        write_file(file_path=file_path, text=self._lazy_init(exports))
+        write_file(
+            file_path=file_path.parent.parent / "__init__.py", text="# coding: utf-8"
+        )
+
+    def _gen_models(self) -> None:
+        if not self.operation_index.models_dirty:
+            return
+        LOGGER.info(f"Generate models for service: {self.openapi_spec.service_name}")
+        file_path = (
+            self.base_path
+            / name_to_snake(self.openapi_spec.service_name)
+            / "models"
+            / "api_models.py"
+        )
+        # datamodel-code-generator always writes its output, so render into a
+        # scratch file and let ``write_file`` decide whether anything changed.
+        with TemporaryDirectory() as scratch_dir, profiling.span("models"):
+            scratch_path = Path(scratch_dir) / file_path.name
+            generate(
+                json.dumps(self.openapi_spec.openapi_spec),
+                output=scratch_path,
+                snake_case_field=True,
+                output_model_type=DataModelType.PydanticV2BaseModel,
+                reuse_model=False,
+                field_constraints=True,
+                custom_file_header_path=self.templates_dir / "header.jinja2",
+                capitalise_enum_members=True,
+                encoding="utf-8",
+            )
+            rendered_code = scratch_path.read_text(encoding="utf-8")
+        with profiling.span("split models"):
+            modules = split_models(rendered_code)
+        for module in modules:
+            write_file(file_path.parent / f"{module.name}.py", module.source)
+        # The package and the old ``api_models`` module both resolve model
+        # names lazily, importing only the modules of the models in use.
+        index = self._lazy_init([(module.name, module.models) for module in modules])
+        write_file(file_path=file_path, text=index)
+        write_file(file_path=file_path.parent / "__init__.py", text=index)
+
+    def _lazy_init(self, exports: list[tuple[str, list[str]]]) -> str:
+        """A package ``__init__`` importing each exported name on first use."""
+        header = self.env.get_template("header.jinja2").render(
+            service_name=self.openapi_spec.service_name, version=self.version
+        )
+        template = self._lazy_init_env.get_template("lazy_init.jinja2")
+        return template.render(header=Markup(header), exports=exports) + "\n"
+
+    @staticmethod
+    def _api_class_name(api_name: str) -> str:
+        return f"{snake_to_camel(name_to_snake(api_name))}Api"
+
+    def _gen_clients(self) -> None:
+        service_module = name_to_snake(self.openapi_spec.service_name)
+        template = self.env.get_template("api_client.jinja2")
+        for tag in self.operation_index.apis:
+            if not self.operation_index.is_dirty(tag):
+                continue
+            LOGGER.info(f"Generate REST client for tag: {tag}")
+            operation_contexts = [
+                self.operation_index.context(operation)
+                for operation in self.operation_index.handlers(tag)
+            ]
+            rendered_code = template.render(
+                async_mode=self.async_mode,
+                models=sorted(self.operation_index.models(tag)),
+                operations=operation_contexts,
+                api_name=tag,
+                service_name=self.openapi_spec.service_name,
+                version=self.version,
+                base_import=self.base_import,
+            )
+            file_name = f"{name_to_snake(tag)}_api.py"
+            file_path = self.base_path / service_module / "apis" / file_name
+            write_file(file_path=file_path, text=rendered_code)
+            write_file(
+                file_path=file_path.parent / "__init__.py", text="# coding: utf-8"
+            )
 
 
-class ClientGenerator(BaseTemplateGenerator):
+class ClientGenerator(TemplateGenerator):
     BASE_PATH = Path("") / "internal" / "clients" / "http"
     CHILD_CLIENTS_PATH = Path("") / "framework" / "clients" / "http"
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
@@ -26,6 +171,7 @@ class ClientGenerator(BaseTemplateGenerator):
         async_mode: bool = False,
         base_path: str | Path | None = None,
         child_base_path: str | Path | None = None,
+        operation_index: OperationIndex | None = None,
     ) -> None:
         if templates_dir is None:
             templates_dir = Path(__file__).parent / "templates"
@@ -37,14 +183,15 @@ class ClientGenerator(BaseTemplateGenerator):
             self.base_path = Path(self.BASE_PATH)
 
         self.openapi_spec = openapi_spec
+        self.operation_index = operation_index or OperationIndex(openapi_spec)
         self._service_name = name_to_snake(openapi_spec.service_name)
         self._tool_version = get_version()
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
-        self.rest_generator = RESTClientGenerator(
+        self._header_template = load_template(header_template_path)
+        self.async_mode = async_mode
+        self.rest_generator = InternalClientGenerator(
             openapi_spec=openapi_spec,
+            operation_index=self.operation_index,
             # TODO: сделать прием шаблонов для RESTClientGenerator
             templates_dir=None,
             async_mode=async_mode,
@@ -53,23 +200,18 @@ class ClientGenerator(BaseTemplateGenerator):
         super().__init__(templates_dir=str(templates_dir))
 
     def generate(self) -> None:
-        self.rest_generator.generate()
-        self._cleanup_legacy_clients()
-        self._gen_child_clients()
+        with profiling.span("internal clients"):
+            self.rest_generator.generate()
+        with profiling.span("wrapper clients"):
+            self._gen_child_clients()
         self._create_init_files()
         format_file(str(self.child_base_path))
 
     def _create_init_files(self):
-        create_and_write_file(self.child_base_path / "__init__.py", " ")
-        create_and_write_file(self.child_base_path.parent / "__init__.py", " ")
-        create_and_write_file(self.child_base_path.parent.parent / "__init__.py", " ")
-        create_and_write_file(self.base_path.parent.parent / "__init__.py", " ")
-
-    def _cleanup_legacy_clients(self) -> None:
-        # TODO: это костылина
-        legacy_root = Path("clients")
-        if legacy_root.exists():
-            rmtree(legacy_root)
+        write_file(self.child_base_path / "__init__.py", " ")
+        write_file(self.child_base_path.parent / "__init__.py", " ")
+        write_file(self.child_base_path.parent.parent / "__init__.py", " ")
+        write_file(self.base_path.parent.parent / "__init__.py", " ")
 
     def _gen_child_clients(self) -> None:
         service_module = name_to_snake(self.openapi_spec.service_name)
@@ -79,8 +221,8 @@ class ClientGenerator(BaseTemplateGenerator):
             else self.child_base_path / service_module
         )
 
-        create_and_write_file(self.child_base_path / "__init__.py", "# coding: utf-8\n")
-        create_and_write_file(child_service_path / "__init__.py", "# coding: utf-8\n")
+        # ``child_base_path / "__init__.py"`` is written by ``_create_init_files``.
+        write_file(child_service_path / "__init__.py", "# coding: utf-8\n")
 
         template = self.env.get_template("client.jinja2")
         header = render_header(
@@ -89,14 +231,17 @@ class ClientGenerator(BaseTemplateGenerator):
             service_name=self.openapi_spec.service_name,
             can_edit=True,
         )
-        for api_name in self.openapi_spec.apis:
+        for api_name in self.operation_index.apis:
+            file_path = child_service_path / f"{name_to_snake(api_name)}_client.py"
+            if file_exists(file_path):
+                skip_file(file_path)
+                continue
             rendered_code = template.render(
                 api_name=api_name,
                 service_name=self.openapi_spec.service_name,
-                base_import=self.rest_generator._base_import,
+                base_import=self.rest_generator.base_import,
                 header=header,
+                async_mode=self.async_mode,
+                models=sorted(self.operation_index.models(api_name)),
             )
-            file_path = child_service_path / f"{name_to_snake(api_name)}_client.py"
-            if file_path.exists():
-                continue
-            create_and_write_file(file_path, rendered_code)
+            write_file(file_path, rendered_code)
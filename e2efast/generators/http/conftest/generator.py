@@ -2,15 +2,20 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
-from restcodegen.generator.utils import create_and_write_file, name_to_snake
+from restcodegen.generator.utils import name_to_snake
 
-from e2efast.utils import get_version, render_header
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.utils import (
+    file_exists,
+    shared_files_lock,
+    skip_file,
+    write_file,
+)
+from e2efast.utils import get_version, load_template, render_header
 
 
-class ConftestGenerator(BaseTemplateGenerator):
+class ConftestGenerator(TemplateGenerator):
     BASE_PATH = Path(".")
     OUTPUT_PATH = Path("tests") / "conftest.py"
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
@@ -34,24 +39,24 @@ class ConftestGenerator(BaseTemplateGenerator):
         self._tool_version = get_version()
 
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
+        self._header_template = load_template(header_template_path)
 
         super().__init__(templates_dir=str(templates_dir))
 
     def generate(self) -> None:
         output_path = self.base_path / self.OUTPUT_PATH
-        if output_path.exists():
-            return
+        with shared_files_lock():
+            if file_exists(output_path):
+                skip_file(output_path)
+                return
 
-        template = self.env.get_template("conftest.jinja2")
-        rendered = template.render(
-            header=self._render_header(editable=True),
-            service_name=self._service_module,
-        )
+            template = self.env.get_template("conftest.jinja2")
+            rendered = template.render(
+                header=self._render_header(editable=True),
+                service_name=self._service_module,
+            )
 
-        create_and_write_file(output_path, rendered)
+            write_file(output_path, rendered)
 
     def _render_header(self, *, editable: bool) -> str:
         return render_header(
@@ -3,15 +3,22 @@ from __future__ import annotations
 import ast
 from pathlib import Path
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
-from restcodegen.generator.utils import create_and_write_file, name_to_snake
+from restcodegen.generator.utils import name_to_snake
 
-from e2efast.utils import get_version, render_header
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.utils import (
+    file_exists,
+    keep_file,
+    make_dirs,
+    read_file,
+    shared_files_lock,
+    write_file,
+)
+from e2efast.utils import get_version, load_template, render_header
 
 
-class SettingsGenerator(BaseTemplateGenerator):
+class SettingsGenerator(TemplateGenerator):
     BASE_PATH = Path("framework") / "settings"
     OUTPUT_PATH = Path("base_settings.py")
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
@@ -32,15 +39,13 @@ class SettingsGenerator(BaseTemplateGenerator):
         self._tool_version = get_version()
 
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
+        self._header_template = load_template(header_template_path)
 
         super().__init__(templates_dir=str(templates_dir))
 
     def generate(self) -> None:
         output_path = self.base_path / self.OUTPUT_PATH
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        make_dirs(output_path.parent)
 
         template = self.env.get_template("settings.jinja2")
         rendered = template.render(
@@ -49,11 +54,13 @@ class SettingsGenerator(BaseTemplateGenerator):
             service_env_var=self._service_env_var,
         )
 
-        if not output_path.exists():
-            create_and_write_file(output_path, rendered)
-            return
+        with shared_files_lock():
+            if not file_exists(output_path):
+                write_file(output_path, rendered)
+                return
 
-        self._append_field_if_missing(output_path)
+            self._append_field_if_missing(output_path)
+            keep_file(output_path)
 
     @property
     def _service_env_var(self) -> str:
@@ -68,7 +75,7 @@ class SettingsGenerator(BaseTemplateGenerator):
         )
 
     def _append_field_if_missing(self, output_path: Path) -> None:
-        existing_content = output_path.read_text(encoding="utf-8")
+        existing_content = read_file(output_path)
 
         try:
             module = ast.parse(existing_content, type_comments=True)
@@ -123,4 +130,4 @@ class SettingsGenerator(BaseTemplateGenerator):
         updated_content = "".join(
             lines[:insert_index] + [field_block] + lines[insert_index:]
         )
-        output_path.write_text(updated_content, encoding="utf-8")
+        write_file(output_path, updated_content)
@@ -1,22 +1,41 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
 from restcodegen.generator.utils import (
-    create_and_write_file,
     name_to_snake,
     snake_to_camel,
-    format_file,
 )
 
 from e2efast.generators.http.client.generator import ClientGenerator
-from e2efast.utils import get_version, render_header
+from e2efast.generators.operations import OperationIndex
+from e2efast.generators.rendering import RenderJob, RenderPipeline, RenderSettings
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.test_layout import (
+    DEFAULT_TEST_LAYOUT,
+    PER_OPERATION,
+    PlannedTest,
+    call_arguments,
+    merge_test_module,
+    operation_models,
+    plan_tests,
+)
+from e2efast.generators.utils import (
+    file_exists,
+    format_file,
+    import_path,
+    keep_file,
+    read_file,
+    skip_file,
+    write_file,
+)
+from e2efast.utils import get_version, load_template, render_header
 
 
-class TestGenerator(BaseTemplateGenerator):
+class TestGenerator(TemplateGenerator):
     BASE_PATH = Path("") / "tests" / "http"
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
 
@@ -28,6 +47,9 @@ class TestGenerator(BaseTemplateGenerator):
         base_client_import: str | None = None,
         child_client_import: str | None = None,
         async_mode: bool = False,
+        operation_index: OperationIndex | None = None,
+        render_settings: RenderSettings | None = None,
+        test_layout: str = DEFAULT_TEST_LAYOUT,
     ) -> None:
         if templates_dir is None:
             templates_dir = Path(__file__).parent / "templates"
@@ -36,21 +58,22 @@ class TestGenerator(BaseTemplateGenerator):
             base_path = Path(self.BASE_PATH)
 
         self.openapi_spec = openapi_spec
+        self.operation_index = operation_index or OperationIndex(openapi_spec)
+        self.render_settings = render_settings
         self.async_mode = async_mode
+        self.test_layout = test_layout
         self._service_module = name_to_snake(openapi_spec.service_name)
         self.base_path = Path(base_path)
-        self.base_client_import = (
-            base_client_import or self._default_base_client_import()
+        self.base_client_import = base_client_import or import_path(
+            ClientGenerator.BASE_PATH
         )
-        self.child_client_import = (
-            child_client_import or self._default_child_client_import()
+        self.child_client_import = child_client_import or import_path(
+            ClientGenerator.CHILD_CLIENTS_PATH
         )
         self.models_import = self._build_models_import()
         self._tool_version = get_version()
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
+        self._header_template = load_template(header_template_path)
 
         super().__init__(templates_dir=str(templates_dir))
 
@@ -72,80 +95,98 @@ class TestGenerator(BaseTemplateGenerator):
         self._ensure_init_file(self.base_path / "__init__.py")
         self._ensure_init_file(service_dir / "__init__.py")
 
-        template = self.env.get_template("test.jinja2")
+        RenderPipeline(self.env, self.render_settings).run(self._test_jobs(service_dir))
+
+    def _test_jobs(self, service_dir: Path) -> Iterator[RenderJob]:
+        header = self._render_header(service_name=self._service_module, editable=True)
 
-        for api_name, operations in self._operations_by_api().items():
-            if not operations:
+        for module in plan_tests(self.operation_index, service_dir, self.test_layout):
+            if not any(self.operation_index.is_dirty(api) for api in module.apis):
                 continue
-            api_dir = (
-                service_dir
-                if api_name is None
-                else service_dir / name_to_snake(api_name)
-            )
-            self._ensure_init_file(api_dir / "__init__.py")
+            self._ensure_init_file(module.path.parent / "__init__.py")
 
-            seen_methods: set[str] = set()
-            for operation in operations:
-                context = self.openapi_spec.get_operation_context(operation)
-                method_name = self._operation_method_name(context)
-                if method_name in seen_methods:
+            if self.test_layout == PER_OPERATION:
+                if file_exists(module.path):
+                    skip_file(module.path)
                     continue
-                seen_methods.add(method_name)
-
-                request_body_var = (
-                    name_to_snake(context.request_body_model)
-                    if context.request_body_model
-                    else None
+                context = self._test_context(module.tests[0], header)
+                yield RenderJob(
+                    path=module.path,
+                    template="test.jinja2",
+                    context=dict(context, test=context),
                 )
+                continue
 
-                models_to_import = self._collect_models(context)
-
-                rendered_code = template.render(
-                    header=self._render_header(
-                        service_name=self._service_module,
-                        editable=True,
-                    ),
-                    async_mode=self.async_mode,
-                    client_fixture=self._client_fixture_name(api_name),
-                    method_name=method_name,
-                    parameters=context.parameters,
-                    request_body_model=context.request_body_model,
-                    request_body_var=request_body_var,
-                    call_arguments=self._call_arguments(context, request_body_var),
-                    base_client_import=self.base_client_import,
-                    child_client_import=self.child_client_import,
-                    service_module=self._service_module,
-                    api_module=self._api_module_name(api_name),
-                    api_class=self._api_class_name(api_name),
-                    api_client_class=self._api_client_class_name(api_name),
-                    models_import=self.models_import,
-                    models_to_import=models_to_import,
-                )
-
-                file_path = api_dir / f"test_{method_name}.py"
-                if file_path.exists():
-                    continue
-                create_and_write_file(file_path, rendered_code)
-
-    def _operations_by_api(self) -> dict[str | None, list]:
-        api_map: dict[str | None, list] = {}
-        apis = list(self.openapi_spec.apis)
-        if apis:
-            for api_name in apis:
-                api_map[api_name] = list(self.openapi_spec.handlers_by_tag(api_name))
+            tests = [self._test_context(test, header) for test in module.tests]
+            imports = self._module_imports(tests)
+            if file_exists(module.path):
+                self._merge_module(module.path, imports, tests)
+                continue
+            yield RenderJob(
+                path=module.path,
+                template="test_module.jinja2",
+                context={"header": header, "imports": imports, "tests": tests},
+            )
 
-        if not api_map:
-            api_map[None] = list(self.openapi_spec.operations)
+    def _test_context(self, test: PlannedTest, header: str) -> dict[str, Any]:
+        context = self.operation_index.context(test.operation)
+        request_body_var = (
+            name_to_snake(context.request_body_model)
+            if context.request_body_model
+            else None
+        )
+        return {
+            "header": header,
+            "async_mode": self.async_mode,
+            "client_fixture": self._client_fixture_name(test.api_name),
+            "method_name": test.method_name,
+            "function_name": test.function,
+            "parameters": context.parameters,
+            "request_body_model": context.request_body_model,
+            "request_body_var": request_body_var,
+            "call_arguments": call_arguments(context, request_body_var),
+            "base_client_import": self.base_client_import,
+            "child_client_import": self.child_client_import,
+            "service_module": self._service_module,
+            "api_module": self._api_module_name(test.api_name),
+            "api_class": self._api_class_name(test.api_name),
+            "api_client_class": self._api_client_class_name(test.api_name),
+            "models_import": self.models_import,
+            "models_to_import": operation_models(context),
+        }
+
+    def _module_imports(self, tests: list[dict[str, Any]]) -> dict[str, list[str]]:
+        imports: dict[str, list[str]] = {}
+        for test in tests:
+            module = ".".join(
+                [
+                    self.child_client_import,
+                    self._service_module,
+                    f"{test['api_module']}_client",
+                ]
+            )
+            names = imports.setdefault(module, [])
+            if test["api_client_class"] not in names:
+                names.append(test["api_client_class"])
+        models = sorted({model for test in tests for model in test["models_to_import"]})
+        if models:
+            imports[self.models_import] = models
+        return imports
+
+    def _merge_module(
+        self, path: Path, imports: dict[str, list[str]], tests: list[dict[str, Any]]
+    ) -> None:
+        template = self.env.get_template("test_function.jinja2")
+        functions = {
+            test["function_name"]: template.render(test=test) for test in tests
+        }
+        merged = merge_test_module(
+            read_file(path), {"": ["pytest"], **imports}, functions
+        )
+        if merged is None:
+            skip_file(path)
         else:
-            all_known_ids = {id(op) for ops in api_map.values() for op in ops}
-            extra_ops = [
-                operation
-                for operation in self.openapi_spec.operations
-                if id(operation) not in all_known_ids
-            ]
-            if extra_ops:
-                api_map.setdefault(None, []).extend(extra_ops)
-        return api_map
+            write_file(path, merged)
 
     @staticmethod
     def _client_fixture_name(api_name: str | None) -> str:
@@ -153,64 +194,15 @@ class TestGenerator(BaseTemplateGenerator):
             return "default_client"
         return f"{name_to_snake(api_name)}_client"
 
-    @staticmethod
-    def _operation_method_name(context) -> str:
-        path_snake = name_to_snake(context.path)
-        return f"{context.method}_{path_snake}".strip("_")
-
-    @staticmethod
-    def _call_arguments(context, request_body_var: str | None) -> list[str]:
-        arguments: list[str] = []
-        if request_body_var:
-            arguments.append(f"{request_body_var}={request_body_var}")
-
-        for param in context.parameters.get("path", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-        for param in context.parameters.get("query", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-        for param in context.parameters.get("header", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-
-        return arguments
-
     def _build_models_import(self) -> str:
-        return ".".join(
-            [self.base_client_import, self._service_module, "models", "api_models"]
-        )
-
-    @staticmethod
-    def _collect_models(context) -> list[str]:
-        models: set[str] = set()
-        if context.request_body_model:
-            models.add(context.request_body_model)
-        if context.success_response and context.success_response not in {
-            "Response",
-            "None",
-        }:
-            models.add(context.success_response)
-        return sorted(models)
+        return f"{self.base_client_import}.{self._service_module}.models"
 
     @staticmethod
     def _ensure_init_file(path: Path) -> None:
-        if path.exists():
+        if file_exists(path):
+            keep_file(path)
             return
-        create_and_write_file(path, "# coding: utf-8\n")
-
-    @staticmethod
-    def _default_base_client_import() -> str:
-        parts = [
-            part for part in ClientGenerator.BASE_PATH.parts if part not in {"", "."}
-        ]
-        return ".".join(parts)
-
-    @staticmethod
-    def _default_child_client_import() -> str:
-        parts = [
-            part
-            for part in ClientGenerator.CHILD_CLIENTS_PATH.parts
-            if part not in {"", "."}
-        ]
-        return ".".join(parts)
+        write_file(path, "# coding: utf-8\n")
 
     @staticmethod
     def _api_module_name(api_name: str | None) -> str:
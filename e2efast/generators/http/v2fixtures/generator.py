@@ -3,22 +3,28 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
 from restcodegen.generator.utils import (
-    create_and_write_file,
     name_to_snake,
     snake_to_camel,
-    format_file,
 )
 
 from e2efast.generators.http.client.generator import ClientGenerator
-from e2efast.generators.utils import ensure_import_line
-from e2efast.utils import get_version, render_header
+from e2efast.generators.operations import OperationIndex
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.utils import (
+    drop_import_line,
+    file_exists,
+    format_file,
+    import_path,
+    shared_files_lock,
+    skip_file,
+    write_file,
+)
+from e2efast.utils import get_version, load_template, render_header
 
 
-class ServiceFixtureGenerator(BaseTemplateGenerator):
+class ServiceFixtureGenerator(TemplateGenerator):
     BASE_PATH = Path("") / "framework" / "fixtures" / "http"
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
 
@@ -29,6 +35,8 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
         base_path: str | Path | None = None,
         base_client_import: str | None = None,
         child_client_import: str | None = None,
+        operation_index: OperationIndex | None = None,
+        async_mode: bool = False,
     ) -> None:
         if templates_dir is None:
             templates_dir = Path(__file__).parent / "templates"
@@ -37,19 +45,19 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
             base_path = Path(self.BASE_PATH)
 
         self.openapi_spec = openapi_spec
+        self.operation_index = operation_index or OperationIndex(openapi_spec)
+        self.async_mode = async_mode
         self._service_module = name_to_snake(openapi_spec.service_name)
         self.base_path = Path(base_path)
-        self.base_client_import = (
-            base_client_import or self._default_base_client_import()
+        self.base_client_import = base_client_import or import_path(
+            ClientGenerator.BASE_PATH
         )
-        self.child_client_import = (
-            child_client_import or self._default_child_client_import()
+        self.child_client_import = child_client_import or import_path(
+            ClientGenerator.CHILD_CLIENTS_PATH
         )
         self._tool_version = get_version()
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
+        self._header_template = load_template(header_template_path)
         super().__init__(templates_dir=str(templates_dir))
 
     def generate(self) -> None:
@@ -58,11 +66,16 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
         format_file(str(self._output_path()))
 
     def _gen_base_fixture(self) -> None:
-        template = self.env.get_template("base.jinja2")
-        rendered = template.render(
-            header=self._render_header(service_name="fixtures.base", editable=True)
-        )
-        create_and_write_file(self.base_path / "base.py", rendered)
+        output_path = self.base_path / "base.py"
+        with shared_files_lock():
+            if file_exists(output_path):
+                skip_file(output_path)
+                return
+            template = self.env.get_template("base.jinja2")
+            rendered = template.render(
+                header=self._render_header(service_name="fixtures.base", editable=True)
+            )
+            write_file(output_path, rendered)
 
     def _gen_service_fixture(self) -> None:
         template = self.env.get_template("fixture.jinja2")
@@ -71,11 +84,13 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
         if not clients:
             return
 
-        ensure_import_line(
+        # The e2efast.fixture_registry plugin imports fixture modules on demand,
+        # so the packages must not import every service (as they used to).
+        drop_import_line(
             self.base_path / "__init__.py",
             f"from . import {self._service_module}_service  # noqa: F401",
         )
-        ensure_import_line(
+        drop_import_line(
             self.base_path.parent / "__init__.py",
             "from .http import *  # noqa: F401",
         )
@@ -90,16 +105,18 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
             base_fixture_module=self._service_module,
             child_client_import=self.child_client_import,
             clients=clients,
+            async_mode=self.async_mode,
         )
 
-        create_and_write_file(self._output_path(), rendered)
+        write_file(self._output_path(), rendered)
 
     def _collect_clients(self) -> list[dict[str, Any]]:
         clients: list[dict[str, Any]] = []
         seen_modules: set[str] = set()
 
         for api_name, operations in sorted(
-            self._operations_by_api().items(), key=lambda item: (item[0] or "")
+            self.operation_index.operations_by_api().items(),
+            key=lambda item: item[0] or "",
         ):
             if not operations and api_name is not None:
                 continue
@@ -119,26 +136,6 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
 
         return clients
 
-    def _operations_by_api(self) -> dict[str | None, list]:
-        api_map: dict[str | None, list] = {}
-        apis = list(self.openapi_spec.apis)
-        if apis:
-            for api_name in apis:
-                api_map[api_name] = list(self.openapi_spec.handlers_by_tag(api_name))
-
-        if not api_map:
-            api_map[None] = list(self.openapi_spec.operations)
-        else:
-            all_known_ids = {id(op) for ops in api_map.values() for op in ops}
-            extra_ops = [
-                operation
-                for operation in self.openapi_spec.operations
-                if id(operation) not in all_known_ids
-            ]
-            if extra_ops:
-                api_map.setdefault(None, []).extend(extra_ops)
-        return api_map
-
     def _output_path(self) -> Path:
         base = self.base_path
         if base.suffix == ".py":
@@ -152,13 +149,6 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
     def _service_fixture_name(self) -> str:
         return f"{self._service_module}_service"
 
-    @staticmethod
-    def _default_base_client_import() -> str:
-        parts = [
-            part for part in ClientGenerator.BASE_PATH.parts if part not in {"", "."}
-        ]
-        return ".".join(parts)
-
     def _render_header(self, *, service_name: str, editable: bool) -> str:
         return render_header(
             self._header_template,
@@ -167,15 +157,6 @@ class ServiceFixtureGenerator(BaseTemplateGenerator):
             can_edit=editable,
         )
 
-    @staticmethod
-    def _default_child_client_import() -> str:
-        parts = [
-            part
-            for part in ClientGenerator.CHILD_CLIENTS_PATH.parts
-            if part not in {"", "."}
-        ]
-        return ".".join(parts)
-
     @staticmethod
     def _api_module_name(api_name: str | None) -> str:
         if api_name is None:
@@ -1,22 +1,42 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
-from jinja2 import Template
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
 from restcodegen.generator.utils import (
-    create_and_write_file,
     name_to_snake,
     snake_to_camel,
-    format_file,
 )
 
 from e2efast.generators.http.client.generator import ClientGenerator
-from e2efast.utils import get_version, render_header
+from e2efast.generators.http.v2fixtures.generator import ServiceFixtureGenerator
+from e2efast.generators.operations import OperationIndex
+from e2efast.generators.rendering import RenderJob, RenderPipeline, RenderSettings
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.test_layout import (
+    DEFAULT_TEST_LAYOUT,
+    PER_OPERATION,
+    PlannedTest,
+    call_arguments,
+    merge_test_module,
+    operation_models,
+    plan_tests,
+)
+from e2efast.generators.utils import (
+    file_exists,
+    format_file,
+    import_path,
+    keep_file,
+    read_file,
+    skip_file,
+    write_file,
+)
+from e2efast.utils import get_version, load_template, render_header
 
 
-class ServiceTestGenerator(BaseTemplateGenerator):
+class ServiceTestGenerator(TemplateGenerator):
     BASE_PATH = Path("") / "tests" / "http"
     BASE_TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "base_templates"
 
@@ -29,6 +49,9 @@ class ServiceTestGenerator(BaseTemplateGenerator):
         child_client_import: str | None = None,
         fixtures_import: str | None = None,
         async_mode: bool = False,
+        operation_index: OperationIndex | None = None,
+        render_settings: RenderSettings | None = None,
+        test_layout: str = DEFAULT_TEST_LAYOUT,
     ) -> None:
         if templates_dir is None:
             templates_dir = Path(__file__).parent / "templates"
@@ -37,22 +60,25 @@ class ServiceTestGenerator(BaseTemplateGenerator):
             base_path = Path(self.BASE_PATH)
 
         self.openapi_spec = openapi_spec
+        self.operation_index = operation_index or OperationIndex(openapi_spec)
+        self.render_settings = render_settings
         self.async_mode = async_mode
+        self.test_layout = test_layout
         self._service_module = name_to_snake(openapi_spec.service_name)
         self.base_path = Path(base_path)
-        self.base_client_import = (
-            base_client_import or self._default_base_client_import()
+        self.base_client_import = base_client_import or import_path(
+            ClientGenerator.BASE_PATH
+        )
+        self.child_client_import = child_client_import or import_path(
+            ClientGenerator.CHILD_CLIENTS_PATH
         )
-        self.child_client_import = (
-            child_client_import or self._default_child_client_import()
+        self.fixtures_import = fixtures_import or import_path(
+            ServiceFixtureGenerator.BASE_PATH
         )
-        self.fixtures_import = fixtures_import or self._default_fixtures_import()
         self.models_import = self._build_models_import()
         self._tool_version = get_version()
         header_template_path = self.BASE_TEMPLATES_DIR / "header.jinja2"
-        self._header_template = Template(
-            header_template_path.read_text(encoding="utf-8")
-        )
+        self._header_template = load_template(header_template_path)
 
         super().__init__(templates_dir=str(templates_dir))
 
@@ -74,101 +100,90 @@ class ServiceTestGenerator(BaseTemplateGenerator):
         self._ensure_init_file(self.base_path / "__init__.py")
         self._ensure_init_file(service_dir / "__init__.py")
 
-        template = self.env.get_template("service_test.jinja2")
-        service_fixture = f"{self._service_module}_service"
+        RenderPipeline(self.env, self.render_settings).run(self._test_jobs(service_dir))
 
-        for api_name, operations in self._operations_by_api().items():
-            if not operations:
-                continue
+    def _test_jobs(self, service_dir: Path) -> Iterator[RenderJob]:
+        header = self._render_header(service_name=self._service_module, editable=True)
 
-            api_dir = (
-                service_dir
-                if api_name is None
-                else service_dir / name_to_snake(api_name)
-            )
-            self._ensure_init_file(api_dir / "__init__.py")
+        for module in plan_tests(self.operation_index, service_dir, self.test_layout):
+            if not any(self.operation_index.is_dirty(api) for api in module.apis):
+                continue
+            self._ensure_init_file(module.path.parent / "__init__.py")
 
-            seen_methods: set[str] = set()
-            for operation in operations:
-                context = self.openapi_spec.get_operation_context(operation)
-                method_name = self._operation_method_name(context)
-                if method_name in seen_methods:
+            if self.test_layout == PER_OPERATION:
+                if file_exists(module.path):
+                    skip_file(module.path)
                     continue
-                seen_methods.add(method_name)
-
-                request_body_var = (
-                    name_to_snake(context.request_body_model)
-                    if context.request_body_model
-                    else None
-                )
-
-                models_to_import = self._collect_models(context)
-
-                rendered_code = template.render(
-                    header=self._render_header(
-                        service_name=self._service_module,
-                        editable=True,
-                    ),
-                    async_mode=self.async_mode,
-                    service_fixture=service_fixture,
-                    service_module=self._service_module,
-                    service_class=self._service_class_name(),
-                    api_accessor=self._api_accessor_name(api_name),
-                    method_name=method_name,
-                    parameters=context.parameters,
-                    request_body_model=context.request_body_model,
-                    request_body_var=request_body_var,
-                    call_arguments=self._call_arguments(context, request_body_var),
-                    parameter_declarations=self._parameter_declarations(context),
-                    fixtures_import=self.fixtures_import,
-                    models_import=self.models_import,
-                    models_to_import=models_to_import,
+                context = self._test_context(module.tests[0], header)
+                yield RenderJob(
+                    path=module.path,
+                    template="service_test.jinja2",
+                    context=dict(context, test=context),
                 )
+                continue
 
-                file_path = api_dir / f"test_{method_name}.py"
-                if file_path.exists():
-                    continue
-                create_and_write_file(file_path, rendered_code)
-
-    def _operations_by_api(self) -> dict[str | None, list]:
-        api_map: dict[str | None, list] = {}
-        apis = list(self.openapi_spec.apis)
-        if apis:
-            for api_name in apis:
-                api_map[api_name] = list(self.openapi_spec.handlers_by_tag(api_name))
+            tests = [self._test_context(test, header) for test in module.tests]
+            imports = self._module_imports(tests)
+            if file_exists(module.path):
+                self._merge_module(module.path, imports, tests)
+                continue
+            yield RenderJob(
+                path=module.path,
+                template="service_test_module.jinja2",
+                context={"header": header, "imports": imports, "tests": tests},
+            )
 
-        if not api_map:
-            api_map[None] = list(self.openapi_spec.operations)
-        else:
-            all_known_ids = {id(op) for ops in api_map.values() for op in ops}
-            extra_ops = [
-                operation
-                for operation in self.openapi_spec.operations
-                if id(operation) not in all_known_ids
+    def _test_context(self, test: PlannedTest, header: str) -> dict[str, Any]:
+        context = self.operation_index.context(test.operation)
+        request_body_var = (
+            name_to_snake(context.request_body_model)
+            if context.request_body_model
+            else None
+        )
+        return {
+            "header": header,
+            "async_mode": self.async_mode,
+            "service_fixture": f"{self._service_module}_service",
+            "service_module": self._service_module,
+            "service_class": self._service_class_name(),
+            "api_accessor": self._api_accessor_name(test.api_name),
+            "method_name": test.method_name,
+            "function_name": test.function,
+            "parameters": context.parameters,
+            "request_body_model": context.request_body_model,
+            "request_body_var": request_body_var,
+            "call_arguments": call_arguments(context, request_body_var),
+            "parameter_declarations": self._parameter_declarations(context),
+            "fixtures_import": self.fixtures_import,
+            "models_import": self.models_import,
+            "models_to_import": operation_models(context),
+        }
+
+    def _module_imports(self, tests: list[dict[str, Any]]) -> dict[str, list[str]]:
+        imports = {
+            f"{self.fixtures_import}.{self._service_module}_service": [
+                self._service_class_name()
             ]
-            if extra_ops:
-                api_map.setdefault(None, []).extend(extra_ops)
-        return api_map
-
-    @staticmethod
-    def _operation_method_name(context) -> str:
-        path_snake = name_to_snake(context.path)
-        return f"{context.method}_{path_snake}".strip("_")
-
-    @staticmethod
-    def _call_arguments(context, request_body_var: str | None) -> list[str]:
-        arguments: list[str] = []
-        if request_body_var:
-            arguments.append(f"{request_body_var}={request_body_var}")
-
-        for param in context.parameters.get("path", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-        for param in context.parameters.get("query", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-        for param in context.parameters.get("header", []):
-            arguments.append(f"{param['python_name']}={param['python_name']}")
-
-        return arguments
+        }
+        models = sorted({model for test in tests for model in test["models_to_import"]})
+        if models:
+            imports[self.models_import] = models
+        return imports
+
+    def _merge_module(
+        self, path: Path, imports: dict[str, list[str]], tests: list[dict[str, Any]]
+    ) -> None:
+        template = self.env.get_template("service_test_function.jinja2")
+        functions = {
+            test["function_name"]: template.render(test=test) for test in tests
+        }
+        merged = merge_test_module(
+            read_file(path), {"": ["pytest"], **imports}, functions
+        )
+        if merged is None:
+            skip_file(path)
+        else:
+            write_file(path, merged)
 
     @staticmethod
     def _parameter_declarations(context) -> list[dict[str, str]]:
@@ -185,34 +200,14 @@ class ServiceTestGenerator(BaseTemplateGenerator):
         return declarations
 
     def _build_models_import(self) -> str:
-        return ".".join(
-            [self.base_client_import, self._service_module, "models", "api_models"]
-        )
-
-    @staticmethod
-    def _collect_models(context) -> list[str]:
-        models: set[str] = set()
-        if context.request_body_model:
-            models.add(context.request_body_model)
-        if context.success_response and context.success_response not in {
-            "Response",
-            "None",
-        }:
-            models.add(context.success_response)
-        return sorted(models)
+        return f"{self.base_client_import}.{self._service_module}.models"
 
     @staticmethod
     def _ensure_init_file(path: Path) -> None:
-        if path.exists():
+        if file_exists(path):
+            keep_file(path)
             return
-        create_and_write_file(path, "# coding: utf-8\n")
-
-    @staticmethod
-    def _default_base_client_import() -> str:
-        parts = [
-            part for part in ClientGenerator.BASE_PATH.parts if part not in {"", "."}
-        ]
-        return ".".join(parts)
+        write_file(path, "# coding: utf-8\n")
 
     def _render_header(self, *, service_name: str, editable: bool) -> str:
         return render_header(
@@ -222,23 +217,6 @@ class ServiceTestGenerator(BaseTemplateGenerator):
             can_edit=editable,
         )
 
-    @staticmethod
-    def _default_child_client_import() -> str:
-        parts = [
-            part
-            for part in ClientGenerator.CHILD_CLIENTS_PATH.parts
-            if part not in {"", "."}
-        ]
-        return ".".join(parts)
-
-    def _default_fixtures_import(self) -> str:
-        parts = [
-            part
-            for part in (Path("framework") / "fixtures" / "http").parts
-            if part not in {"", "."}
-        ]
-        return ".".join(parts)
-
     def _service_class_name(self) -> str:
         return f"{snake_to_camel(self._service_module)}Service"
 
@@ -0,0 +1,284 @@
+"""Splitting the single ``api_models.py`` written by datamodel-code-generator.
+
+Importing one name from a module that defines thousands of Pydantic models
+builds all of them, so the models of a service are written one module per
+model instead (models referring to each other in a cycle share a module) and
+the ``models`` package resolves names lazily, importing only what is used.
+"""
+
+from __future__ import annotations
+
+import ast
+import keyword
+from dataclasses import dataclass, field
+
+# ``models/api_models.py`` stays the lazy alias of the package it always was.
+RESERVED_MODULES = {"api_models"}
+FALLBACK_MODULE = "_api_models"
+
+
+@dataclass
+class ModelModule:
+    """One module of the split models package and the models it defines."""
+
+    name: str
+    models: list[str]
+    source: str
+
+
+@dataclass
+class _Unit:
+    names: list[str]
+    statements: list[ast.stmt]
+    # ``Model.model_rebuild()`` and the like, run once the module is complete.
+    trailing: list[ast.stmt] = field(default_factory=list)
+    depends_on: set[int] = field(default_factory=set)
+
+
+def split_models(source: str) -> list[ModelModule]:
+    """``source`` as one module per model.
+
+    Every module starts with the header of ``source`` and the imports of
+    ``source`` it needs, then imports the models it refers to from their
+    sibling modules. Sources this does not understand (statements other than
+    imports, model definitions and method calls on models) come back as a
+    single ``_api_models`` module.
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    body = tree.body
+    first = next(
+        (
+            index
+            for index, node in enumerate(body)
+            if not isinstance(node, (ast.Import, ast.ImportFrom))
+            and not (index == 0 and _is_docstring(node))
+        ),
+        len(body),
+    )
+    imports = [
+        node for node in body[:first] if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    code = [*imports, *body[first:]]
+    header_end = _start(code[0]) if code else len(lines) + 1
+    header = "".join(lines[: header_end - 1]).strip("\n")
+
+    units = _units(body[first:])
+    if units is None:
+        names = [name for node in body[first:] for name in _defined_names(node) or []]
+        return [ModelModule(FALLBACK_MODULE, names, source)]
+
+    components = _components(units)
+    modules: list[ModelModule] = []
+    module_of: dict[int, str] = {}
+    used = set(RESERVED_MODULES)
+    for component in components:
+        name = _module_name(units[component[0]].names[0], used)
+        for index in component:
+            module_of[index] = name
+        modules.append(ModelModule(name, [], ""))
+
+    for module, component in zip(modules, components):
+        siblings: dict[str, list[str]] = {}
+        for index in component:
+            module.models.extend(units[index].names)
+            for dependency in sorted(units[index].depends_on):
+                if module_of[dependency] != module.name:
+                    siblings.setdefault(module_of[dependency], []).extend(
+                        units[dependency].names
+                    )
+        referenced = {
+            name
+            for index in component
+            for node in (*units[index].statements, *units[index].trailing)
+            for name in _referenced_names(node)
+        }
+        text = f"{header}\n\n" if header else ""
+        text += _used_imports(imports, lines, referenced)
+        if siblings:
+            text += "\n" + "".join(
+                f"from .{target} import {', '.join(sorted(set(names)))}\n"
+                for target, names in sorted(siblings.items())
+            )
+        statements = [
+            _segment(lines, statement)
+            for index in component
+            for statement in units[index].statements
+        ]
+        trailing = [
+            _segment(lines, statement)
+            for index in component
+            for statement in units[index].trailing
+        ]
+        if trailing:
+            statements.append("\n".join(trailing))
+        module.source = text.rstrip("\n") + "\n\n\n" + "\n\n\n".join(statements) + "\n"
+    return modules
+
+
+def _used_imports(
+    imports: list[ast.Import | ast.ImportFrom], lines: list[str], referenced: set[str]
+) -> str:
+    # Each module keeps only the imports of ``source`` it uses, so neither
+    # linters nor readers trip over a dozen unused ones per model.
+    kept: list[str] = []
+    for node in imports:
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            kept.append(_segment(lines, node) + "\n")
+            continue
+        aliases = [
+            alias
+            for alias in node.names
+            if alias.name == "*"
+            or (alias.asname or alias.name).split(".")[0] in referenced
+        ]
+        if len(aliases) == len(node.names):
+            kept.append(_segment(lines, node))
+        elif aliases:
+            kept.append(ast.unparse(type(node)(**{**vars(node), "names": aliases})))
+    return "".join(line + "\n" for line in kept)
+
+
+def _units(body: list[ast.stmt]) -> list[_Unit] | None:
+    units: list[_Unit] = []
+    unit_of: dict[str, int] = {}
+    for node in body:
+        names = _defined_names(node)
+        if names:
+            for name in names:
+                unit_of[name] = len(units)
+            units.append(_Unit(names, [node]))
+            continue
+        target = _call_target(node)
+        if target is None or target not in unit_of:
+            return None
+        units[unit_of[target]].trailing.append(node)
+
+    for index, unit in enumerate(units):
+        for node in (*unit.statements, *unit.trailing):
+            for name in _referenced_names(node):
+                dependency = unit_of.get(name)
+                if dependency is not None and dependency != index:
+                    unit.depends_on.add(dependency)
+    return units
+
+
+def _components(units: list[_Unit]) -> list[list[int]]:
+    """Strongly connected components of the units, in source order.
+
+    Iterative Tarjan, so long reference chains do not hit the recursion
+    limit; each component lists its units in source order.
+    """
+    index_of: dict[int, int] = {}
+    lowlink: dict[int, int] = {}
+    stack: list[int] = []
+    on_stack: set[int] = set()
+    components: list[list[int]] = []
+    counter = 0
+
+    for root in range(len(units)):
+        if root in index_of:
+            continue
+        work = [(root, iter(sorted(units[root].depends_on)))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index_of:
+                    index_of[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(units[successor].depends_on))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return sorted(components)
+
+
+def _module_name(model: str, used: set[str]) -> str:
+    from restcodegen.generator.utils import name_to_snake
+
+    base = name_to_snake(model) or "model"
+    if keyword.iskeyword(base) or not base.isidentifier() or base.startswith("_"):
+        base = f"{base.strip('_') or 'model'}_model"
+    name, suffix = base, 2
+    while name in used:
+        name = f"{base}_{suffix}"
+        suffix += 1
+    used.add(name)
+    return name
+
+
+def _defined_names(node: ast.stmt) -> list[str] | None:
+    if isinstance(node, ast.ClassDef):
+        return [node.name]
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return [node.target.id]
+    if isinstance(node, ast.Assign) and all(
+        isinstance(target, ast.Name) for target in node.targets
+    ):
+        return [target.id for target in node.targets]  # type: ignore[attr-defined]
+    return None
+
+
+def _call_target(node: ast.stmt) -> str | None:
+    if (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Call)
+        and isinstance(node.value.func, ast.Attribute)
+        and isinstance(node.value.func.value, ast.Name)
+    ):
+        return node.value.func.value.id
+    return None
+
+
+def _referenced_names(node: ast.AST) -> set[str]:
+    names: set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif (
+            isinstance(child, ast.Constant)
+            and isinstance(child.value, str)
+            and child.value.isidentifier()
+        ):
+            # Quoted forward references: ``list['Node']``.
+            names.add(child.value)
+    return names
+
+
+def _is_docstring(node: ast.stmt) -> bool:
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Constant)
+        and isinstance(node.value.value, str)
+    )
+
+
+def _start(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(decorator.lineno for decorator in decorators)])
+
+
+def _segment(lines: list[str], node: ast.stmt) -> str:
+    # Whole lines, so trailing noqa comments come along.
+    end = node.end_lineno or node.lineno
+    return "".join(lines[_start(node) - 1 : end]).rstrip("\n")
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from restcodegen.generator.parser import OperationContext, ParsedOperation, Parser
+from restcodegen.generator.utils import name_to_snake
+
+from e2efast.generators.fingerprints import SpecFingerprinter, digest
+
+
+class OperationIndex:
+    """Tag → operations lookup built once per parsed spec and shared by generators."""
+
+    def __init__(self, openapi_spec: Parser) -> None:
+        self.openapi_spec = openapi_spec
+        self._operations = openapi_spec.operations
+        self._apis = sorted(openapi_spec.apis)
+        self._by_api = self._build_api_map()
+        self._contexts: dict[int, OperationContext] = {}
+        self._method_names: dict[int, str] = {}
+        self._models: dict[str | None, set[str]] = {}
+        self._fingerprints: dict[int, str] = {}
+        self._fingerprinter: SpecFingerprinter | None = None
+        # What must be re-rendered this run; ``None`` means every API.
+        self.dirty_apis: set[str | None] | None = None
+        self.models_dirty = True
+
+    @property
+    def apis(self) -> list[str]:
+        return list(self._apis)
+
+    @property
+    def operations(self) -> list[ParsedOperation]:
+        return list(self._operations)
+
+    @property
+    def untagged(self) -> list[ParsedOperation]:
+        if not self._apis:
+            return []
+        return list(self._by_api.get(None, []))
+
+    def operations_by_api(self) -> dict[str | None, list[ParsedOperation]]:
+        return {api_name: list(ops) for api_name, ops in self._by_api.items()}
+
+    def handlers(self, api_name: str | None) -> list[ParsedOperation]:
+        return list(self._by_api.get(api_name, []))
+
+    def context(self, operation: ParsedOperation) -> OperationContext:
+        key = id(operation)
+        context = self._contexts.get(key)
+        if context is None:
+            context = self.openapi_spec.get_operation_context(operation)
+            self._contexts[key] = context
+        return context
+
+    def method_name(self, operation: ParsedOperation) -> str:
+        key = id(operation)
+        method_name = self._method_names.get(key)
+        if method_name is None:
+            context = self.context(operation)
+            path_snake = name_to_snake(context.path)
+            method_name = f"{context.method}_{path_snake}".strip("_")
+            self._method_names[key] = method_name
+        return method_name
+
+    def models(self, api_name: str | None) -> set[str]:
+        """Same result as ``Parser.models_by_tag`` without rescanning the spec."""
+        models = self._models.get(api_name)
+        if models is None:
+            models = set()
+            for operation in self._by_api.get(api_name, []):
+                context = self.context(operation)
+                if context.request_body_model:
+                    models.add(context.request_body_model)
+                models.update(context.responses.values())
+                for params in context.parameters.values():
+                    for param in params:
+                        if Parser._is_complex_type(param["type"]):
+                            models.add(param["type"])
+            self._models[api_name] = models
+        return set(models)
+
+    def is_dirty(self, api_name: str | None) -> bool:
+        return self.dirty_apis is None or api_name in self.dirty_apis
+
+    @property
+    def fingerprinter(self) -> SpecFingerprinter:
+        if self._fingerprinter is None:
+            self._fingerprinter = SpecFingerprinter(self.openapi_spec.openapi_spec)
+        return self._fingerprinter
+
+    @staticmethod
+    def operation_key(operation: ParsedOperation) -> str:
+        return f"{operation.method.upper()} {operation.path}"
+
+    def fingerprint(self, operation: ParsedOperation) -> str:
+        key = id(operation)
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            fingerprint = self.fingerprinter.operation(
+                operation.path, operation.method, operation.raw_operation
+            )
+            self._fingerprints[key] = fingerprint
+        return fingerprint
+
+    def operation_fingerprints(self) -> dict[str, str]:
+        return {
+            self.operation_key(operation): self.fingerprint(operation)
+            for operation in self._operations
+        }
+
+    def api_fingerprints(self) -> dict[str | None, str]:
+        return {
+            api_name: digest(
+                [
+                    [self.operation_key(operation), self.fingerprint(operation)]
+                    for operation in operations
+                ]
+            )
+            for api_name, operations in self._by_api.items()
+        }
+
+    def _build_api_map(self) -> dict[str | None, list[ParsedOperation]]:
+        if not self._apis:
+            return {None: list(self._operations)}
+
+        api_map: dict[str | None, list[ParsedOperation]] = {
+            api_name: [] for api_name in self._apis
+        }
+        untagged: list[ParsedOperation] = []
+        for operation in self._operations:
+            matched = False
+            for tag in dict.fromkeys(operation.operation.tags or []):
+                if tag in api_map:
+                    api_map[tag].append(operation)
+                    matched = True
+            if not matched:
+                untagged.append(operation)
+
+        if untagged:
+            api_map[None] = untagged
+        return api_map
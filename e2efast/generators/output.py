@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from e2efast import profiling
+
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+SKIPPED = "skipped"
+
+
+@dataclass
+class FileRecord:
+    """Hash of the rendered text and of the file on disk after formatting."""
+
+    rendered: str
+    disk: str = ""
+
+
+@dataclass
+class WriteStats:
+    written: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+
+
+class OutputWriter:
+    """Single write path for generated files.
+
+    A file is rewritten only when its content changes. Because generated code
+    is formatted after it is written, the text on disk usually differs from
+    the rendered text; ``previous`` maps paths to the hashes recorded on the
+    last run so that a re-render of the same text over an untouched,
+    formatted file is recognised as unchanged.
+    """
+
+    def __init__(self, previous: Mapping[str, FileRecord] | None = None) -> None:
+        self.previous = dict(previous or {})
+        self.files: dict[str, FileRecord] = {}
+        self._outcomes: dict[str, str] = {}
+        self._kept: set[str] = set()
+        self._format_roots: list[Path] = []
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> WriteStats:
+        outcomes = list(self._outcomes.values())
+        return WriteStats(
+            written=outcomes.count(WRITTEN),
+            unchanged=outcomes.count(UNCHANGED),
+            skipped=outcomes.count(SKIPPED),
+        )
+
+    def write(self, path: Path, text: str) -> bool:
+        key = path.as_posix()
+        data = text.encode("utf-8")
+        rendered = content_hash(data)
+        current = _read_bytes(path)
+        changed = current is None or (
+            current != data and not self._is_formatted_copy(key, rendered, current)
+        )
+        if changed:
+            atomic_write(path, data)
+            profiling.count(profiling.FILES_WRITTEN)
+            profiling.count(profiling.BYTES_WRITTEN, len(data))
+        with self._lock:
+            self.files[key] = FileRecord(rendered=rendered)
+            self._set_outcome(key, WRITTEN if changed else UNCHANGED)
+        return changed
+
+    @property
+    def produced(self) -> set[str]:
+        """Paths this run owns: written, unchanged, skipped or kept."""
+        return set(self._outcomes) | self._kept
+
+    @property
+    def written(self) -> list[str]:
+        return [path for path, outcome in self._outcomes.items() if outcome == WRITTEN]
+
+    @property
+    def skipped(self) -> list[str]:
+        return [path for path, outcome in self._outcomes.items() if outcome == SKIPPED]
+
+    def format_under(self, root: Path) -> None:
+        """Mark written Python files below ``root`` for the end-of-run format."""
+        if root not in self._format_roots:
+            self._format_roots.append(root)
+
+    def pending_format(self) -> list[str]:
+        return [
+            path
+            for path in self.written
+            if path.endswith(".py")
+            and any(Path(path).is_relative_to(root) for root in self._format_roots)
+        ]
+
+    def skip(self, path: Path) -> None:
+        """Record a file left alone because it is only generated once."""
+        with self._lock:
+            self._outcomes.setdefault(path.as_posix(), SKIPPED)
+
+    def keep(self, path: Path) -> None:
+        """Record a file this run owns but had no reason to rewrite."""
+        with self._lock:
+            self._kept.add(path.as_posix())
+
+    # Generators also inspect and tidy the output tree; these go through the
+    # writer too, so that :class:`MemoryWriter` can answer them without disk.
+
+    def exists(self, path: Path) -> bool:
+        return path.is_file()
+
+    def read_text(self, path: Path) -> str:
+        return path.read_text(encoding="utf-8")
+
+    def make_dirs(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+
+    def touch(self, path: Path) -> None:
+        """Create an empty file if it is missing, without recording it."""
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    def remove(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+
+    def remove_tree(self, path: Path) -> None:
+        import shutil
+
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _is_formatted_copy(self, key: str, rendered: str, current: bytes) -> bool:
+        record = self.previous.get(key)
+        return (
+            record is not None
+            and record.rendered == rendered
+            and record.disk == content_hash(current)
+        )
+
+    def _set_outcome(self, key: str, outcome: str) -> None:
+        if self._outcomes.get(key) != WRITTEN:
+            self._outcomes[key] = outcome
+
+
+class MemoryWriter(OutputWriter):
+    """Collects generated files in memory instead of writing them.
+
+    ``root`` is an optional project directory whose existing files the
+    generators see, read-only: editable files that exist there are skipped
+    and shared files are extended, exactly as a run in that directory would.
+    Nothing below ``root`` is ever modified. As with :class:`OutputWriter`,
+    ``previous`` recognises a re-render of the text behind an untouched,
+    formatted file; that file keeps its current content and needs no format.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        previous: Mapping[str, FileRecord] | None = None,
+    ) -> None:
+        super().__init__(previous)
+        self.root = Path(root) if root is not None else None
+        self.contents: dict[str, bytes] = {}
+        self.removed: set[str] = set()
+
+    def write(self, path: Path, text: str) -> bool:
+        key = path.as_posix()
+        data = text.encode("utf-8")
+        current = self._current(key)
+        changed = current != data
+        if (
+            changed
+            and current is not None
+            and self._is_formatted_copy(key, content_hash(data), current)
+        ):
+            data, changed = current, False
+        with self._lock:
+            self.contents[key] = data
+            self.removed.discard(key)
+            self.files[key] = FileRecord(rendered=content_hash(data))
+            self._set_outcome(key, WRITTEN if changed else UNCHANGED)
+        return changed
+
+    def exists(self, path: Path) -> bool:
+        return self._current(path.as_posix()) is not None
+
+    def read_text(self, path: Path) -> str:
+        data = self._current(path.as_posix())
+        if data is None:
+            raise FileNotFoundError(path)
+        return data.decode("utf-8")
+
+    def make_dirs(self, path: Path) -> None:
+        return None
+
+    def touch(self, path: Path) -> None:
+        key = path.as_posix()
+        if self._current(key) is None:
+            with self._lock:
+                self.contents[key] = b""
+                self.removed.discard(key)
+
+    def remove(self, path: Path) -> None:
+        key = path.as_posix()
+        with self._lock:
+            self.contents.pop(key, None)
+            self.removed.add(key)
+
+    def remove_tree(self, path: Path) -> None:
+        prefix = path.as_posix().rstrip("/") + "/"
+        with self._lock:
+            for key in [key for key in self.contents if key.startswith(prefix)]:
+                del self.contents[key]
+                self.removed.add(key)
+        if self.root is not None and (self.root / path).is_dir():
+            for file_path in (self.root / path).rglob("*"):
+                if file_path.is_file():
+                    self.remove(file_path.relative_to(self.root))
+
+    def _current(self, key: str) -> bytes | None:
+        if key in self.contents:
+            return self.contents[key]
+        if key in self.removed or self.root is None:
+            return None
+        return _read_bytes(self.root / key)
+
+
+_active_writer: OutputWriter | None = None
+
+
+@contextmanager
+def writing_to(writer: OutputWriter) -> Iterator[OutputWriter]:
+    global _active_writer
+    previous = _active_writer
+    _active_writer = writer
+    try:
+        yield writer
+    finally:
+        _active_writer = previous
+
+
+def active_writer() -> OutputWriter | None:
+    return _active_writer
+
+
+def current_writer() -> OutputWriter:
+    return _active_writer if _active_writer is not None else OutputWriter()
+
+
+def content_hash(text: str | bytes) -> str:
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    data = _read_bytes(path)
+    return "" if data is None else content_hash(data)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    import tempfile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~_umask()
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_bytes(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
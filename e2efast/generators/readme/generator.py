@@ -2,12 +2,20 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from restcodegen.generator.base import BaseTemplateGenerator
 from restcodegen.generator.parser import Parser
-from restcodegen.generator.utils import create_and_write_file, name_to_snake
+from restcodegen.generator.utils import name_to_snake
 
+from e2efast.generators.templating import TemplateGenerator
+from e2efast.generators.utils import (
+    file_exists,
+    remove_file,
+    shared_files_lock,
+    skip_file,
+    write_file,
+)
 
-class ReadmeGenerator(BaseTemplateGenerator):
+
+class ReadmeGenerator(TemplateGenerator):
     BASE_PATH = Path(".")
     OUTPUT_PATH = Path("README.md")
 
@@ -32,22 +40,24 @@ class ReadmeGenerator(BaseTemplateGenerator):
 
         # TODO: Костылина, надо разобраться и убрать, когда будет понятно какой из генераторов генерит __init__ в корне
         core_init_path = self.BASE_PATH / "__init__.py"
-        if core_init_path.exists():
-            core_init_path.unlink()
+        if file_exists(core_init_path):
+            remove_file(core_init_path)
         parent_init_path = self.BASE_PATH.parent / "__init__.py"
-        if parent_init_path.exists() and parent_init_path != core_init_path:
-            parent_init_path.unlink()
+        if file_exists(parent_init_path) and parent_init_path != core_init_path:
+            remove_file(parent_init_path)
 
     def generate(self) -> None:
         output_path = self.base_path / self.OUTPUT_PATH
-        if output_path.exists():
-            return
-
-        template = self.env.get_template("readme.md.jinja2")
-        rendered = template.render(
-            service_name=self._service_name,
-            service_module=self._service_module,
-            service_env_var=f"{self._service_module.upper()}_BASE_URL",
-        )
-
-        create_and_write_file(output_path, rendered)
+        with shared_files_lock():
+            if file_exists(output_path):
+                skip_file(output_path)
+                return
+
+            template = self.env.get_template("readme.md.jinja2")
+            rendered = template.render(
+                service_name=self._service_name,
+                service_module=self._service_module,
+                service_env_var=f"{self._service_module.upper()}_BASE_URL",
+            )
+
+            write_file(output_path, rendered)
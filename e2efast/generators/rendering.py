@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from e2efast import profiling
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from e2efast.generators.templating import TemplateNamespace
+
+# The CLI imports ``RenderSettings`` on every run, so the worker pools and the
+# write path are imported where they are used.
+
+RENDER_EXECUTORS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """How per-operation files are rendered: worker count and pool type."""
+
+    workers: int = 1
+    executor: str = "thread"
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    path: Path
+    template: str
+    context: dict[str, Any]
+
+
+class RenderPipeline:
+    """Renders a stream of jobs on a worker pool and writes the results.
+
+    Jobs are consumed lazily with a bounded number in flight. Thread workers
+    render and write; process workers only render, and the results are
+    written by the caller in job order, so the output never depends on the
+    number of workers.
+    """
+
+    def __init__(
+        self,
+        templates: TemplateNamespace,
+        settings: RenderSettings | None = None,
+    ) -> None:
+        self.templates = templates
+        self.settings = settings or RenderSettings()
+
+    def run(self, jobs: Iterable[RenderJob]) -> None:
+        with profiling.span("render"):
+            self._run(jobs)
+
+    def _run(self, jobs: Iterable[RenderJob]) -> None:
+        workers = max(1, self.settings.workers)
+        if workers == 1:
+            for job in jobs:
+                self._render_and_write(job)
+            return
+
+        from e2efast.generators.utils import write_file
+
+        if self.settings.executor == "process":
+            # Imported here: multiprocessing is costly to import on startup.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = _ordered_map(
+                    executor,
+                    _render_in_worker,
+                    ((self.templates, job) for job in jobs),
+                    window=workers * 4,
+                )
+                for path, text in rendered:
+                    write_file(path, text)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in _ordered_map(
+                executor, self._render_and_write, jobs, window=workers * 4
+            ):
+                pass
+
+    def _render_and_write(self, job: RenderJob) -> None:
+        from e2efast.generators.utils import write_file
+
+        text = self.templates.get_template(job.template).render(**job.context)
+        write_file(job.path, text)
+
+
+def _render_in_worker(item: tuple[TemplateNamespace, RenderJob]) -> tuple[Path, str]:
+    templates, job = item
+    return job.path, templates.get_template(job.template).render(**job.context)
+
+
+def _ordered_map(
+    executor: Executor,
+    function: Callable[[Any], Any],
+    items: Iterable[Any],
+    *,
+    window: int,
+) -> Iterator[Any]:
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
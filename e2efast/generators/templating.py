@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+from jinja2 import (
+    BaseLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    PrefixLoader,
+    Template,
+)
+from restcodegen.generator import TEMPLATES
+from restcodegen.generator.base import BaseGenerator, BaseTemplateGenerator
+from restcodegen.generator.utils import (
+    name_to_snake,
+    rename_python_builtins,
+    snake_to_camel,
+)
+
+from e2efast.cache import default_cache_dir
+from e2efast.generators.output import MemoryWriter, current_writer
+from e2efast.utils import package_version
+
+GENERATORS_DIR = Path(__file__).resolve().parent
+RESTCODEGEN_NAMESPACE = "restcodegen"
+BYTECODE_CACHE_DIR = "jinja"
+
+
+@dataclass(frozen=True)
+class TemplateSettings:
+    """User template override dirs and whether compiled templates are cached.
+
+    An override dir mirrors the generator namespaces, e.g.
+    ``<dir>/v2tests/service_test.jinja2`` or ``<dir>/restcodegen/api_client.jinja2``.
+    """
+
+    override_dirs: tuple[Path, ...] = ()
+    bytecode_cache: bool = True
+
+
+_active_settings = TemplateSettings()
+
+
+@contextmanager
+def using_templates(settings: TemplateSettings) -> Iterator[TemplateSettings]:
+    global _active_settings
+    previous = _active_settings
+    _active_settings = settings
+    try:
+        yield settings
+    finally:
+        _active_settings = previous
+
+
+def current_template_settings() -> TemplateSettings:
+    return _active_settings
+
+
+@dataclass(frozen=True)
+class TemplateNamespace:
+    """One generator's templates, looked up in the shared environment.
+
+    Picklable, so render workers in other processes resolve the same
+    templates (including overrides) through their own shared environment.
+    """
+
+    templates_dir: Path
+    settings: TemplateSettings = TemplateSettings()
+
+    @property
+    def name(self) -> str:
+        return template_namespace(self.templates_dir)
+
+    def get_template(self, name: str) -> Template:
+        env = shared_environment(self.settings)
+        loader: PrefixLoader = env.loader  # type: ignore[assignment]
+        if self.name not in loader.mapping:
+            search_path = [
+                *(override / self.name for override in self.settings.override_dirs),
+                self.templates_dir,
+            ]
+            loader.mapping[self.name] = FileSystemLoader(search_path)
+        return env.get_template(f"{self.name}:{name}")
+
+
+class TemplateGenerator(BaseTemplateGenerator):
+    """``BaseTemplateGenerator`` whose ``env`` is a view of the shared environment."""
+
+    def __init__(self, templates_dir: str | None = None) -> None:
+        # ``BaseGenerator.__init__``, but through the active writer.
+        writer = current_writer()
+        writer.make_dirs(self.BASE_PATH)
+        writer.touch(self.BASE_PATH / "__init__.py")
+        writer.touch(self.BASE_PATH.parent / "__init__.py")
+        self._on_disk = not isinstance(writer, MemoryWriter)
+        self.templates_dir = (
+            Path(templates_dir) if templates_dir is not None else TEMPLATES
+        )
+        self.version = package_version("restcodegen")
+        self.env = TemplateNamespace(self.templates_dir, current_template_settings())
+
+    def __del__(self) -> None:
+        # The inherited cleanup removes a generated package left empty; it
+        # must not touch the working directory when rendering into memory.
+        if getattr(self, "_on_disk", False):
+            BaseGenerator.__del__(self)
+
+
+def template_namespace(templates_dir: Path) -> str:
+    templates_dir = Path(templates_dir).resolve()
+    if templates_dir == Path(TEMPLATES).resolve():
+        return RESTCODEGEN_NAMESPACE
+    if (
+        templates_dir.is_relative_to(GENERATORS_DIR)
+        and templates_dir.name == "templates"
+    ):
+        return templates_dir.parent.name
+    digest = hashlib.sha256(str(templates_dir).encode("utf-8")).hexdigest()[:12]
+    return f"custom-{digest}"
+
+
+class _NamespaceLoader(PrefixLoader):
+    # ``PrefixLoader.load`` names templates without their prefix; the generic
+    # ``load`` keeps ``namespace:name`` so includes can be resolved below.
+    load = BaseLoader.load
+
+
+class _SharedEnvironment(Environment):
+    def join_path(self, template: str, parent: str) -> str:
+        # ``{% include "header.jinja2" %}`` resolves in the including
+        # template's namespace, as it did with one environment per generator.
+        if ":" not in template and ":" in parent:
+            return f"{parent.split(':', 1)[0]}:{template}"
+        return template
+
+
+@cache
+def shared_environment(settings: TemplateSettings) -> Environment:
+    env = _SharedEnvironment(
+        loader=_NamespaceLoader({}, delimiter=":"),
+        autoescape=True,
+        bytecode_cache=_bytecode_cache() if settings.bytecode_cache else None,
+    )
+    env.filters["to_snake_case"] = name_to_snake
+    env.filters["to_camel_case"] = snake_to_camel
+    env.filters["rename_python_builtins"] = rename_python_builtins
+    return env
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    directory = default_cache_dir() / BYTECODE_CACHE_DIR
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(directory))
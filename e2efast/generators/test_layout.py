@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from restcodegen.generator.parser import OperationContext, ParsedOperation
+
+    from e2efast.generators.operations import OperationIndex
+
+PER_OPERATION = "per-operation"
+PER_TAG = "per-tag"
+PER_SERVICE = "per-service"
+TEST_LAYOUTS = (PER_OPERATION, PER_TAG, PER_SERVICE)
+DEFAULT_TEST_LAYOUT = PER_OPERATION
+
+
+@dataclass(frozen=True)
+class PlannedTest:
+    """One generated test function: the operation it covers and its name."""
+
+    api_name: str | None
+    operation: ParsedOperation
+    method_name: str
+    function: str
+
+
+@dataclass
+class PlannedModule:
+    path: Path
+    tests: list[PlannedTest] = field(default_factory=list)
+
+    @property
+    def apis(self) -> set[str | None]:
+        return {test.api_name for test in self.tests}
+
+
+def plan_tests(
+    operation_index: OperationIndex, service_dir: Path, layout: str
+) -> list[PlannedModule]:
+    """Group the generated tests of a service into modules.
+
+    ``per-operation`` puts every test in its own module inside a package per
+    tag (untagged operations directly in the service package), ``per-tag``
+    gives each tag one ``test_<tag>.py`` and ``per-service`` puts the whole
+    service in ``test_<service>.py``. Operations sharing a method name within
+    a tag get one test; across tags in a service module the later ones are
+    prefixed with their tag.
+    """
+    from restcodegen.generator.utils import name_to_snake
+
+    if layout not in TEST_LAYOUTS:
+        raise ValueError(f"unknown test layout {layout!r}")
+
+    modules: dict[Path, PlannedModule] = {}
+    for api_name, operations in operation_index.operations_by_api().items():
+        if not operations:
+            continue
+        accessor = "default" if api_name is None else name_to_snake(api_name)
+        seen_methods: set[str] = set()
+        for operation in operations:
+            method_name = operation_index.method_name(operation)
+            if method_name in seen_methods:
+                continue
+            seen_methods.add(method_name)
+
+            if layout == PER_OPERATION:
+                api_dir = service_dir if api_name is None else service_dir / accessor
+                path = api_dir / f"test_{method_name}.py"
+            elif layout == PER_TAG:
+                path = service_dir / f"test_{accessor}.py"
+            else:
+                path = service_dir / f"test_{service_dir.name}.py"
+            module = modules.setdefault(path, PlannedModule(path))
+
+            function = f"test_{method_name}"
+            if function in {test.function for test in module.tests}:
+                function = f"test_{accessor}_{method_name}"
+            module.tests.append(PlannedTest(api_name, operation, method_name, function))
+    return list(modules.values())
+
+
+def call_arguments(
+    context: OperationContext, request_body_var: str | None
+) -> list[str]:
+    """Keyword arguments a generated test passes to the API method."""
+    arguments: list[str] = []
+    if request_body_var:
+        arguments.append(f"{request_body_var}={request_body_var}")
+    for location in ("path", "query", "header"):
+        arguments.extend(
+            f"{param['python_name']}={param['python_name']}"
+            for param in context.parameters.get(location, [])
+        )
+    return arguments
+
+
+def operation_models(context: OperationContext) -> list[str]:
+    """Models a generated test imports: its request body and response."""
+    models: set[str] = set()
+    if context.request_body_model:
+        models.add(context.request_body_model)
+    if context.success_response and context.success_response not in {
+        "Response",
+        "None",
+    }:
+        models.add(context.success_response)
+    return sorted(models)
+
+
+def merge_test_module(
+    existing: str, imports: dict[str, list[str]], functions: dict[str, str]
+) -> str | None:
+    """Add the missing ``functions`` and ``imports`` to an existing module.
+
+    Test functions already defined in ``existing`` are never touched, whatever
+    the user did to them; only the ones it lacks are appended, with the
+    imports they need placed after the module's last top-level import.
+    Returns ``None`` when nothing is missing or the module does not parse.
+    """
+    try:
+        tree = ast.parse(existing)
+    except SyntaxError:
+        return None
+
+    defined = {
+        node.name
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    missing = [text for name, text in functions.items() if name not in defined]
+    if not missing:
+        return None
+
+    bound: set[str] = set()
+    last_import = 0
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update(
+                (alias.asname or alias.name).split(".")[0] for alias in node.names
+            )
+            last_import = node.end_lineno or node.lineno
+    import_lines = []
+    for module, names in imports.items():
+        needed = [name for name in names if name not in bound]
+        if not needed:
+            continue
+        if module:
+            import_lines.append(f"from {module} import {', '.join(needed)}")
+        else:
+            import_lines.extend(f"import {name}" for name in needed)
+
+    lines = existing.splitlines()
+    if import_lines:
+        if last_import == 0:
+            # No imports yet: keep the header comments and docstring on top.
+            last_import = _preamble_end(tree, lines)
+        lines[last_import:last_import] = import_lines
+    text = "\n".join(lines).rstrip("\n")
+    return text + "\n\n\n" + "\n\n\n".join(body.strip("\n") for body in missing) + "\n"
+
+
+def _preamble_end(tree: ast.Module, lines: list[str]) -> int:
+    if tree.body and isinstance(tree.body[0], ast.Expr):
+        value = tree.body[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return tree.body[0].end_lineno or 0
+    end = 0
+    for index, line in enumerate(lines):
+        if line.strip() and not line.lstrip().startswith("#"):
+            break
+        end = index + 1
+    return end
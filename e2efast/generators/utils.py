@@ -1,23 +1,109 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 
+from e2efast import profiling
+from e2efast.generators.formatting import format_paths
+from e2efast.generators.output import active_writer, current_writer
 
-def ensure_import_line(path: Path, line: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+# Set in batch worker processes so that edits to files shared by all services
+# (package ``__init__`` files, base settings, conftest) are serialized.
+_shared_lock: Any | None = None
 
-    if not path.exists():
-        path.write_text(f"{line}\n", encoding="utf-8")
-        return
 
-    existing_text = path.read_text(encoding="utf-8")
-    existing_lines = [_.strip() for _ in existing_text.splitlines()]
-    if line.strip() in existing_lines:
+def set_shared_lock(lock: Any | None) -> None:
+    global _shared_lock
+    _shared_lock = lock
+
+
+@contextmanager
+def shared_files_lock() -> Iterator[None]:
+    if _shared_lock is None:
+        yield
         return
+    with _shared_lock:
+        yield
+
+
+def import_path(path: Path) -> str:
+    """``path`` as a dotted import path, e.g. ``internal.clients.http``."""
+    return ".".join(part for part in path.parts if part not in {"", "."})
+
+
+def format_file(output_dir: str) -> None:
+    """Format what this run wrote below ``output_dir``.
+
+    Inside a pipeline run the files are formatted together once the run is
+    finished; standalone generators format the directory right away.
+    """
+    writer = active_writer()
+    if writer is None:
+        format_paths([output_dir])
+    else:
+        writer.format_under(Path(output_dir))
+
 
-    if existing_text.strip() == "":
-        new_text = f"{line}\n"
+def write_file(file_path: Path, text: str | None = None) -> None:
+    if text:
+        profiling.count(profiling.FILES_RENDERED)
+        current_writer().write(file_path, text)
     else:
-        sep = "" if existing_text.endswith("\n") else "\n"
-        new_text = f"{existing_text}{sep}{line}\n"
-    path.write_text(new_text, encoding="utf-8")
+        current_writer().make_dirs(file_path.parent)
+
+
+def skip_file(file_path: Path) -> None:
+    current_writer().skip(file_path)
+
+
+def keep_file(file_path: Path) -> None:
+    current_writer().keep(file_path)
+
+
+def file_exists(file_path: Path) -> bool:
+    return current_writer().exists(file_path)
+
+
+def read_file(file_path: Path) -> str:
+    return current_writer().read_text(file_path)
+
+
+def make_dirs(path: Path) -> None:
+    current_writer().make_dirs(path)
+
+
+def touch_file(file_path: Path) -> None:
+    current_writer().touch(file_path)
+
+
+def remove_file(file_path: Path) -> None:
+    current_writer().remove(file_path)
+
+
+def remove_tree(path: Path) -> None:
+    current_writer().remove_tree(path)
+
+
+def drop_import_line(path: Path, line: str) -> None:
+    """Make sure the package ``__init__`` at ``path`` exists without ``line``.
+
+    Removes an import older e2efast versions added to a shared package,
+    leaving whatever else the file contains alone.
+    """
+    with shared_files_lock():
+        writer = current_writer()
+        writer.make_dirs(path.parent)
+
+        if not writer.exists(path):
+            writer.write(path, "")
+            return
+
+        existing_lines = writer.read_text(path).splitlines()
+        kept = [_ for _ in existing_lines if _.strip() != line.strip()]
+        if len(kept) == len(existing_lines):
+            writer.keep(path)
+            return
+        text = "\n".join(kept).strip("\n")
+        writer.write(path, f"{text}\n" if text else "")
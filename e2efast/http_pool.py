@@ -0,0 +1,381 @@
+"""Connection pools shared by the generated service fixtures.
+
+Generated ``framework/fixtures/http/base.py`` creates one :class:`ClientPool`
+and every session client fixture takes its client from it, so services
+talking to the same host reuse one set of keep-alive connections instead of
+opening a pool per fixture::
+
+    client_pool = ClientPool(
+        PoolSettings(max_connections=200, http2=True),
+        client_class=ClientClass,
+        async_client_class=AsyncClientClass,
+    )
+
+    client = client_pool.client("https://crm.example.com")
+    ...
+    client_pool.release(client)  # closes the pool once its last client is released
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, fields, replace
+from types import ModuleType
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+POOL_SHARING = ("host", "all", "none")
+ENV_PREFIX = "E2EFAST_POOL_"
+# ``httpx.Client`` options that configure its transport. A client given a
+# ``transport`` ignores them, so pooled transports are built with them instead.
+TRANSPORT_OPTIONS = ("verify", "cert", "trust_env", "proxy", "http1")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Limits of each connection pool and which clients share one.
+
+    ``share`` is ``"host"`` (clients of one scheme, host and port share a
+    pool), ``"all"`` (a single pool, ``max_connections`` in total) or
+    ``"none"`` (a pool per client). ``http2`` needs the ``h2`` package
+    (``pip install httpx[http2]``).
+    """
+
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 30.0
+    http2: bool = False
+    share: str = "host"
+
+    def __post_init__(self) -> None:
+        if self.share not in POOL_SHARING:
+            raise ValueError(
+                f"share must be one of {', '.join(POOL_SHARING)}, not {self.share!r}"
+            )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def with_env(self, environ: dict[str, str] | None = None) -> PoolSettings:
+        """These settings overridden by ``E2EFAST_POOL_<FIELD>`` variables.
+
+        Lets CI tune the pool (``E2EFAST_POOL_MAX_CONNECTIONS=400``,
+        ``E2EFAST_POOL_HTTP2=1``) without editing ``base.py``; ``none``
+        clears a limit.
+        """
+        environ = os.environ if environ is None else environ
+        changes: dict[str, Any] = {}
+        for item in fields(self):
+            raw = environ.get(ENV_PREFIX + item.name.upper())
+            if raw is None:
+                continue
+            if item.name == "http2":
+                changes[item.name] = raw.strip().lower() in {"1", "true", "yes", "on"}
+            elif item.name == "share":
+                changes[item.name] = raw.strip()
+            elif raw.strip().lower() == "none":
+                changes[item.name] = None
+            elif item.name == "keepalive_expiry":
+                changes[item.name] = float(raw)
+            else:
+                changes[item.name] = int(raw)
+        return replace(self, **changes)
+
+
+@dataclass
+class PoolStats:
+    """Usage of one pool: its clients, connections and requests sent."""
+
+    key: str
+    clients: int
+    connections: int
+    idle_connections: int
+    active_connections: int
+    requests: int
+    http2: bool
+    asynchronous: bool
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    requests = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return super().handle_request(request)
+
+
+class _AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await super().handle_async_request(request)
+
+
+class _Lease(httpx.BaseTransport):
+    """A client's handle on a pooled transport; closing it keeps the pool open."""
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self.pooled = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.pooled.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncLease(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.pooled = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pooled.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+@dataclass
+class _Pool:
+    transport: _CountingTransport | _AsyncCountingTransport
+    clients: int = 0
+
+
+class ClientPool:
+    """Hands out httpx clients whose connections are pooled per host.
+
+    Clients are built with ``client_class`` / ``async_client_class`` (the
+    ``ClientClass`` partials in ``base.py``, so timeouts and other options
+    stay configurable there) around a transport shared according to
+    ``settings.share``. Transport options of the partials or of a call
+    (``verify``, ``cert``, ``trust_env``, ``proxy``, ``http1``) are applied
+    to the pooled transports, and with ``trust_env`` so are the proxies of
+    the ``HTTP(S)_PROXY`` / ``NO_PROXY`` environment variables. A transport
+    is closed when the last client using it is released, and whatever is
+    still open when the interpreter exits.
+    """
+
+    def __init__(
+        self,
+        settings: PoolSettings | None = None,
+        *,
+        client_class: Callable[..., httpx.Client] = httpx.Client,
+        async_client_class: Callable[..., httpx.AsyncClient] = httpx.AsyncClient,
+    ) -> None:
+        self.settings = settings or PoolSettings()
+        self.client_class = client_class
+        self.async_client_class = async_client_class
+        self._lock = threading.Lock()
+        self._pools: dict[str, _Pool] = {}
+        self._async_pools: dict[str, _Pool] = {}
+        self._owners: dict[int, str] = {}
+        self._unshared = 0
+        atexit.register(self.close)
+
+    def client(self, base_url: str | None = None, **kwargs: Any) -> httpx.Client:
+        """A client for ``base_url``; hand it back with :meth:`release`."""
+        options = _transport_options(self.client_class, kwargs)
+        with self._lock:
+            key, pool = self._checkout(self._pools, base_url, options, async_=False)
+        client = self.client_class(
+            base_url=base_url or "",
+            transport=_Lease(pool.transport),
+            **_client_options(options, kwargs),
+        )
+        with self._lock:
+            self._owners[id(client)] = key
+        return client
+
+    def async_client(
+        self, base_url: str | None = None, **kwargs: Any
+    ) -> httpx.AsyncClient:
+        """An async client for ``base_url``; hand it back with :meth:`arelease`."""
+        options = _transport_options(self.async_client_class, kwargs)
+        with self._lock:
+            key, pool = self._checkout(
+                self._async_pools, base_url, options, async_=True
+            )
+        client = self.async_client_class(
+            base_url=base_url or "",
+            transport=_AsyncLease(pool.transport),
+            **_client_options(options, kwargs),
+        )
+        with self._lock:
+            self._owners[id(client)] = key
+        return client
+
+    def release(self, client: httpx.Client) -> None:
+        """Close a client, and its pool if no other client uses it."""
+        client.close()
+        transport = self._checkin(self._pools, client)
+        if transport is not None:
+            transport.close()
+
+    async def arelease(self, client: httpx.AsyncClient) -> None:
+        await client.aclose()
+        transport = self._checkin(self._async_pools, client)
+        if transport is not None:
+            await transport.aclose()
+
+    def stats(self) -> list[PoolStats]:
+        """Current usage of every open pool, sync pools first."""
+        with self._lock:
+            pools = [
+                *((key, pool, False) for key, pool in sorted(self._pools.items())),
+                *((key, pool, True) for key, pool in sorted(self._async_pools.items())),
+            ]
+        return [
+            _stats(key, pool, http2=self.settings.http2, asynchronous=asynchronous)
+            for key, pool, asynchronous in pools
+        ]
+
+    def close(self) -> None:
+        """Close every sync pool; async pools are dropped with their loop."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._async_pools.clear()
+            self._owners.clear()
+        for pool in pools:
+            pool.transport.close()
+
+    def _checkout(
+        self,
+        pools: dict[str, _Pool],
+        base_url: str | None,
+        options: dict[str, Any],
+        *,
+        async_: bool,
+    ) -> tuple[str, _Pool]:
+        options = dict(options)
+        if options.get("proxy") is None and options.get("trust_env", True):
+            options["proxy"] = _environment_proxy(base_url)
+        key = self._key(base_url)
+        if any(value is not None for value in options.values()):
+            # Clients with other TLS or proxy options get a pool of their own.
+            key += " " + ",".join(
+                f"{name}={value!r}"
+                for name, value in sorted(options.items())
+                if value is not None
+            )
+        pool = pools.get(key)
+        if pool is None:
+            transport_class = _AsyncCountingTransport if async_ else _CountingTransport
+            pool = pools[key] = _Pool(
+                transport_class(
+                    limits=self.settings.limits,
+                    http2=self.settings.http2,
+                    **{
+                        name: value
+                        for name, value in options.items()
+                        if value is not None
+                    },
+                )
+            )
+        pool.clients += 1
+        return key, pool
+
+    def _checkin(self, pools: dict[str, _Pool], client: Any) -> Any:
+        with self._lock:
+            key = self._owners.pop(id(client), None)
+            pool = pools.get(key) if key is not None else None
+            if pool is None:
+                return None
+            pool.clients -= 1
+            if pool.clients > 0:
+                return None
+            del pools[key]
+            return pool.transport
+
+    def _key(self, base_url: str | None) -> str:
+        if self.settings.share == "all":
+            return "*"
+        if self.settings.share == "none":
+            self._unshared += 1
+            return f"client-{self._unshared}"
+        parts = urlsplit(base_url or "")
+        if not parts.hostname:
+            return "*"
+        port = parts.port or {"http": 80, "https": 443}.get(parts.scheme)
+        return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+_FALLBACK_POOLS: dict[str, ClientPool] = {}
+_FALLBACK_LOCK = threading.Lock()
+
+
+def shared_pool(base: ModuleType) -> ClientPool:
+    """The ``client_pool`` of a generated ``base.py`` module.
+
+    ``base.py`` is generated once and then owned by the project, so one
+    written by an older e2efast has no pool; it gets one built from the
+    ``ClientClass`` / ``AsyncClientClass`` it defines, with the default
+    settings and ``E2EFAST_POOL_*`` overrides.
+    """
+    pool = getattr(base, "client_pool", None)
+    if pool is not None:
+        return pool
+    with _FALLBACK_LOCK:
+        pool = _FALLBACK_POOLS.get(base.__name__)
+        if pool is None:
+            pool = _FALLBACK_POOLS[base.__name__] = ClientPool(
+                PoolSettings().with_env(),
+                client_class=getattr(base, "ClientClass", httpx.Client),
+                async_client_class=getattr(base, "AsyncClientClass", httpx.AsyncClient),
+            )
+    return pool
+
+
+def _transport_options(
+    client_class: Callable[..., Any], kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    # The ``functools.partial`` keywords of ``ClientClass``, then the call's.
+    options = {**getattr(client_class, "keywords", {}), **kwargs}
+    return {name: options[name] for name in TRANSPORT_OPTIONS if name in options}
+
+
+def _client_options(options: dict[str, Any], kwargs: dict[str, Any]) -> dict[str, Any]:
+    # A client given a proxy mounts a transport of its own for it, bypassing
+    # the pool; the pooled transport already goes through the proxy.
+    if "proxy" in options:
+        return {**kwargs, "proxy": None}
+    return kwargs
+
+
+def _environment_proxy(base_url: str | None) -> str | None:
+    import urllib.request
+
+    parts = urlsplit(base_url or "")
+    if not parts.hostname:
+        return None
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get(parts.scheme) or proxies.get("all")
+    if proxy is None or urllib.request.proxy_bypass(parts.hostname):
+        return None
+    return proxy
+
+
+def _stats(key: str, pool: _Pool, *, http2: bool, asynchronous: bool) -> PoolStats:
+    connections = list(getattr(pool.transport._pool, "connections", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return PoolStats(
+        key=key,
+        clients=pool.clients,
+        connections=len(connections),
+        idle_connections=idle,
+        active_connections=len(connections) - idle,
+        requests=pool.transport.requests,
+        http2=http2,
+        asynchronous=asynchronous,
+    )
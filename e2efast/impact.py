@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from e2efast.cache import SpecCache
+from e2efast.generators.test_layout import DEFAULT_TEST_LAYOUT
+from e2efast.manifest import Manifest
+from e2efast.spec import PARSED_NAMESPACE, SpecSource, build_parser, read_spec
+
+if TYPE_CHECKING:
+    from restcodegen.generator.parser import Parser
+
+    from e2efast.generators.operations import OperationIndex
+
+TESTS_PATH = Path("tests") / "http"
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+
+class ImpactError(RuntimeError):
+    """Raised when there is no earlier spec to compare the new one with."""
+
+
+@dataclass(frozen=True)
+class SpecSnapshot:
+    """Fingerprints of one spec version: per operation and per schema."""
+
+    operations: dict[str, str]
+    # ``None`` for manifests written before schema hashes were recorded.
+    schemas: dict[str, str] | None
+
+
+@dataclass
+class ImpactReport:
+    """Operations and models a spec change touches, and the tests covering them."""
+
+    service: str
+    # Where the old side came from: "base spec", "cache" or "manifest".
+    baseline: str
+    added_operations: list[str] = field(default_factory=list)
+    changed_operations: list[str] = field(default_factory=list)
+    removed_operations: list[str] = field(default_factory=list)
+    changed_models: list[str] = field(default_factory=list)
+    # Changed models plus every model reaching one of them through ``$ref``.
+    affected_models: list[str] = field(default_factory=list)
+    test_files: list[str] = field(default_factory=list)
+    node_ids: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def analyze_impact(
+    service: str,
+    spec_url: str,
+    *,
+    base_spec: str | None = None,
+    use_cache: bool = True,
+    source: SpecSource | None = None,
+) -> ImpactReport:
+    """Compare ``spec_url`` with the spec the service was last generated from.
+
+    The old side is ``base_spec`` when given; otherwise the parsed spec the
+    cache holds for the digest recorded in the manifest, and failing that the
+    fingerprints stored in the manifest itself. Operation fingerprints cover
+    every schema an operation reaches through ``$ref``, so a change deep in a
+    model chain marks each operation using it.
+    """
+    from e2efast.generators.operations import OperationIndex
+
+    cache = SpecCache() if use_cache else None
+    source = source or read_spec(spec_url, cache=cache, service=service)
+    parser = build_parser(source, service, cache)
+    operation_index = OperationIndex(parser)
+    current = snapshot(operation_index)
+
+    baseline, previous = _baseline(service, base_spec, cache)
+    added = sorted(current.operations.keys() - previous.operations.keys())
+    removed = sorted(previous.operations.keys() - current.operations.keys())
+    changed = sorted(
+        key
+        for key in current.operations.keys() & previous.operations.keys()
+        if current.operations[key] != previous.operations[key]
+    )
+    changed_models = []
+    if previous.schemas is not None:
+        changed_models = sorted(
+            name
+            for name in current.schemas.keys() | previous.schemas.keys()
+            if current.schemas.get(name) != previous.schemas.get(name)
+        )
+
+    affected = set(added) | set(changed)
+    targets = [
+        (path, function)
+        for key, path, function in generated_tests(
+            operation_index, parser, layout=_test_layout(service)
+        )
+        if key in affected
+    ]
+    return ImpactReport(
+        service=service,
+        baseline=baseline,
+        added_operations=added,
+        changed_operations=changed,
+        removed_operations=removed,
+        changed_models=changed_models,
+        affected_models=_dependent_models(operation_index, changed_models),
+        test_files=sorted({path for path, _ in targets}),
+        node_ids=sorted(dict.fromkeys(f"{path}::{name}" for path, name in targets)),
+    )
+
+
+def snapshot(operation_index: OperationIndex) -> SpecSnapshot:
+    return SpecSnapshot(
+        operations=operation_index.operation_fingerprints(),
+        schemas=operation_index.fingerprinter.schemas(),
+    )
+
+
+def generated_tests(
+    operation_index: OperationIndex,
+    parser: Parser,
+    base_path: Path = TESTS_PATH,
+    layout: str = DEFAULT_TEST_LAYOUT,
+) -> Iterator[tuple[str, str, str]]:
+    """``(operation key, test file, test function)`` for every generated test.
+
+    Mirrors the test generators for the given ``--test-layout``.
+    """
+    from restcodegen.generator.utils import name_to_snake
+
+    from e2efast.generators.test_layout import plan_tests
+
+    service_module = name_to_snake(parser.service_name)
+    service_dir = (
+        base_path if base_path.name == service_module else base_path / service_module
+    )
+    for module in plan_tests(operation_index, service_dir, layout):
+        for test in module.tests:
+            yield (
+                operation_index.operation_key(test.operation),
+                module.path.as_posix(),
+                test.function,
+            )
+
+
+def _baseline(
+    service: str, base_spec: str | None, cache: SpecCache | None
+) -> tuple[str, SpecSnapshot]:
+    from restcodegen.generator.parser import Parser
+
+    from e2efast.generators.operations import OperationIndex
+
+    if base_spec is not None:
+        parser = build_parser(read_spec(base_spec, cache=cache), service, cache)
+        return "base spec", snapshot(OperationIndex(parser))
+
+    record = Manifest.load().get(service)
+    if record is None:
+        raise ImpactError(
+            f"{service} has no generation manifest to compare with; "
+            "generate it once or pass a base spec"
+        )
+    if cache is not None:
+        cached = cache.get(PARSED_NAMESPACE, cache.key(record.inputs["spec"], service))
+        if isinstance(cached, Parser):
+            return "cache", snapshot(OperationIndex(cached))
+    return "manifest", SpecSnapshot(
+        operations=dict(record.operations), schemas=dict(record.schemas) or None
+    )
+
+
+def _test_layout(service: str) -> str:
+    """The test layout the service was last generated with."""
+    record = Manifest.load().get(service)
+    if record is None:
+        return DEFAULT_TEST_LAYOUT
+    options = record.inputs.get("options", {})
+    return options.get("test_layout", DEFAULT_TEST_LAYOUT)
+
+
+def _dependent_models(
+    operation_index: OperationIndex, changed_models: list[str]
+) -> list[str]:
+    changed_refs = {SCHEMA_REF_PREFIX + name for name in changed_models}
+    fingerprinter = operation_index.fingerprinter
+    affected = set(changed_models)
+    for name in fingerprinter.schemas():
+        schema = fingerprinter.resolve(SCHEMA_REF_PREFIX + name)
+        if fingerprinter.ref_closure(schema) & changed_refs:
+            affected.add(name)
+    return sorted(affected)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import Any
+
+from e2efast.generators.output import FileRecord, file_hash
+from e2efast.utils import package_version
+
+MANIFEST_PATH = Path(".e2efast") / "manifest.json"
+MANIFEST_FORMAT = 2
+TEMPLATE_DIRS = (Path(__file__).resolve().parent / "generators",)
+
+UNTAGGED_API = "<untagged>"
+
+
+@dataclass
+class ServiceRecord:
+    """What the last run of one service consumed and produced."""
+
+    spec: str
+    inputs: dict[str, Any]
+    apis: dict[str, str] = field(default_factory=dict)
+    operations: dict[str, str] = field(default_factory=dict)
+    models: str = ""
+    # Per-schema hashes, for impact analysis of the next spec change.
+    schemas: dict[str, str] = field(default_factory=dict)
+    files: dict[str, FileRecord] = field(default_factory=dict)
+
+    def missing_files(self, root: Path | None = None) -> list[str]:
+        root = root or Path(".")
+        return [path for path in self.files if not (root / path).is_file()]
+
+    def settle(self) -> None:
+        """Hash generated files as they ended up on disk, after formatting."""
+        for path, record in self.files.items():
+            if not record.disk:
+                record.disk = file_hash(Path(path))
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ServiceRecord:
+        return cls(
+            spec=data["spec"],
+            inputs=dict(data["inputs"]),
+            apis=dict(data.get("apis", {})),
+            operations=dict(data.get("operations", {})),
+            models=data.get("models", ""),
+            schemas=dict(data.get("schemas", {})),
+            files={
+                path: FileRecord(**record)
+                for path, record in data.get("files", {}).items()
+            },
+        )
+
+
+class Manifest:
+    """``.e2efast/manifest.json``: per-service inputs and generated file hashes."""
+
+    def __init__(
+        self,
+        path: Path = MANIFEST_PATH,
+        services: dict[str, ServiceRecord] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.services = services or {}
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH) -> Manifest:
+        path = Path(path)
+        try:
+            stat = path.stat()
+            data = _read_manifest(
+                str(path.resolve()), (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            )
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+            return cls(path)
+        try:
+            services = {
+                name: ServiceRecord.from_dict(record)
+                for name, record in data.get("services", {}).items()
+            }
+        except (KeyError, TypeError, ValueError):
+            return cls(path)
+        return cls(path, services)
+
+    def get(self, service: str) -> ServiceRecord | None:
+        return self.services.get(service)
+
+    def set(self, service: str, record: ServiceRecord) -> None:
+        self.services[service] = record
+
+    def settle(self) -> None:
+        for record in self.services.values():
+            record.settle()
+
+    def save(self) -> None:
+        payload = {
+            "format": MANIFEST_FORMAT,
+            "services": {
+                name: self.services[name].to_dict() for name in sorted(self.services)
+            },
+        }
+        import tempfile
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(payload, tmp_file, indent=2, sort_keys=True)
+                tmp_file.write("\n")
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+@lru_cache(maxsize=4)
+def _read_manifest(path: str, stat_key: tuple[int, int, int]) -> Any:
+    # ``stat_key`` is only part of the cache key: ``save`` replaces the file,
+    # so a changed manifest has a new inode, mtime or size and is re-read.
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def templates_digest(override_dirs: tuple[Path, ...] = ()) -> str:
+    sha = hashlib.sha256()
+    for root in (*TEMPLATE_DIRS, *_restcodegen_templates(), *override_dirs):
+        sha.update(b"\1")
+        for template in sorted(root.rglob("*.jinja2")):
+            sha.update(template.relative_to(root).as_posix().encode("utf-8"))
+            sha.update(b"\0")
+            sha.update(template.read_bytes())
+            sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def _restcodegen_templates() -> list[Path]:
+    # ``restcodegen.generator.TEMPLATES``, located without importing the
+    # package: an up-to-date run never needs restcodegen otherwise.
+    import importlib.util
+
+    spec = importlib.util.find_spec("restcodegen")
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    return [
+        Path(location) / "templates" for location in spec.submodule_search_locations
+    ]
+
+
+@cache
+def tool_version() -> str:
+    return ";".join(
+        f"{distribution}={package_version(distribution)}"
+        for distribution in ("e2efast", "restcodegen")
+    )
+
+
+def api_key(api_name: str | None) -> str:
+    return UNTAGGED_API if api_name is None else api_name
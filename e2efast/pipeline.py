@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import importlib
+import shutil
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from e2efast import profiling
+from e2efast.cache import SpecCache
+from e2efast.generators.formatting import DEFAULT_FORMATTER
+from e2efast.generators.output import (
+    FileRecord,
+    OutputWriter,
+    WriteStats,
+    file_hash,
+    writing_to,
+)
+from e2efast.generators.test_layout import DEFAULT_TEST_LAYOUT
+from e2efast.generators.utils import shared_files_lock
+from e2efast.manifest import (
+    Manifest,
+    ServiceRecord,
+    api_key,
+    templates_digest,
+    tool_version,
+)
+from e2efast.spec import SpecSource, build_parser, read_spec
+
+if TYPE_CHECKING:
+    from restcodegen.generator.parser import Parser
+
+    from e2efast.generators.operations import OperationIndex
+    from e2efast.generators.rendering import RenderSettings
+
+# Generators are referenced as ``module:Class`` and imported only when a run
+# needs them: importing them pulls in restcodegen and jinja2, which is most of
+# the startup cost of an up-to-date run.
+CLIENT_GENERATOR = "e2efast.generators.http.client.generator:ClientGenerator"
+CONFTEST_GENERATOR = "e2efast.generators.http.conftest.generator:ConftestGenerator"
+SETTINGS_GENERATOR = "e2efast.generators.http.settings.generator:SettingsGenerator"
+README_GENERATOR = "e2efast.generators.readme.generator:ReadmeGenerator"
+
+FIXTURE_GENERATORS = {
+    "v1": "e2efast.generators.http.fixtures.generator:FixtureGenerator",
+    "v2": "e2efast.generators.http.v2fixtures.generator:ServiceFixtureGenerator",
+}
+
+TEST_GENERATORS = {
+    "v1": "e2efast.generators.http.tests.generator:TestGenerator",
+    "v2": "e2efast.generators.http.v2tests.generator:ServiceTestGenerator",
+}
+
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    with_fixtures: bool = False
+    with_tests: bool = False
+    suite_version: str = "v2"
+    test_layout: str = DEFAULT_TEST_LAYOUT
+    async_mode: bool = False
+    formatter: str = DEFAULT_FORMATTER
+
+    @property
+    def generate_fixtures(self) -> bool:
+        return self.with_fixtures or self.with_tests
+
+
+@dataclass
+class GenerationReport:
+    service: str
+    up_to_date: bool = False
+    # ``None`` when every API was (re)generated.
+    regenerated_apis: list[str] | None = None
+    files: WriteStats = field(default_factory=WriteStats)
+    # Written files the caller still has to format (``format_output=False``).
+    pending_format: list[str] = field(default_factory=list)
+    # Stale files removed by ``prune`` and edited ones it left in place.
+    pruned: list[str] = field(default_factory=list)
+    kept_edited: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> GenerationReport:
+        return cls(
+            service=data["service"],
+            up_to_date=data.get("up_to_date", False),
+            regenerated_apis=data.get("regenerated_apis"),
+            files=WriteStats(**data.get("files", {})),
+            pending_format=list(data.get("pending_format", [])),
+            pruned=list(data.get("pruned", [])),
+            kept_edited=list(data.get("kept_edited", [])),
+        )
+
+
+def generate_service(
+    service: str,
+    spec_url: str,
+    options: GenerationOptions | None = None,
+    *,
+    force: bool = False,
+    prune: bool = False,
+    format_output: bool = True,
+    use_cache: bool = True,
+    spec_cache: SpecCache | None = None,
+    source: SpecSource | None = None,
+    render_settings: RenderSettings | None = None,
+    template_dirs: Sequence[str | Path] = (),
+) -> GenerationReport:
+    options = options or GenerationOptions()
+    override_dirs = tuple(Path(path).resolve() for path in template_dirs)
+    cache = spec_cache
+    if cache is None and use_cache:
+        cache = SpecCache()
+    with profiling.span("read spec"):
+        source = source or read_spec(spec_url, cache=cache, service=service)
+    with profiling.span("check inputs"):
+        inputs = {
+            "spec": source.digest,
+            "templates": templates_digest(override_dirs),
+            "tool": tool_version(),
+            "options": asdict(options),
+        }
+        manifest = Manifest.load()
+        stored = manifest.get(service)
+    previous = None if force or stored is None or stored.missing_files() else stored
+    if previous is not None and previous.inputs == inputs and not prune:
+        return GenerationReport(service=service, up_to_date=True)
+
+    from e2efast.generators.operations import OperationIndex
+    from e2efast.generators.templating import TemplateSettings, using_templates
+
+    template_settings = TemplateSettings(
+        override_dirs=override_dirs, bytecode_cache=use_cache
+    )
+    with profiling.span("parse"):
+        parser = build_parser(source, service, cache)
+        operation_index = OperationIndex(parser)
+    profiling.count(profiling.OPERATIONS, len(operation_index.operations))
+    with profiling.span("fingerprint"):
+        api_fingerprints = {
+            api_key(api_name): fingerprint
+            for api_name, fingerprint in operation_index.api_fingerprints().items()
+        }
+        models_fingerprint = operation_index.fingerprinter.models()
+    # Pruning needs every file the run owns, so it renders all APIs.
+    if (
+        previous is not None
+        and not prune
+        and _only_spec_changed(previous.inputs, inputs)
+    ):
+        operation_index.dirty_apis = {
+            api_name
+            for api_name in operation_index.operations_by_api()
+            if previous.apis.get(api_key(api_name))
+            != api_fingerprints[api_key(api_name)]
+        }
+        operation_index.models_dirty = previous.models != models_fingerprint
+
+    writer = OutputWriter(previous=stored.files if stored else None)
+    with writing_to(writer), using_templates(template_settings):
+        _run_generators(parser, operation_index, options, render_settings)
+
+    files = {
+        path: file_record
+        for path, file_record in (stored.files if stored else {}).items()
+        if Path(path).is_file()
+    }
+    files.update(writer.files)
+    # Scaffolding generated once (``base.py``, ``tests/conftest.py``, the
+    # README) is skipped by every later service; recording it for those
+    # services too keeps another service's prune from deleting it.
+    for path in writer.skipped:
+        if path not in files and Path(path).is_file():
+            files[path] = _shared_record(manifest, path)
+    pruned: list[str] = []
+    kept_edited: list[str] = []
+    if prune and stored is not None:
+        with profiling.span("prune"), shared_files_lock():
+            shared = {
+                path
+                for name, other in Manifest.load().services.items()
+                if name != service
+                for path in other.files
+            }
+            pruned, kept_edited = _prune_stale(stored.files, writer.produced | shared)
+        for path in pruned:
+            files.pop(path, None)
+    pending_format = writer.pending_format()
+    if format_output:
+        from e2efast.generators.formatting import format_paths
+
+        format_paths(pending_format, options.formatter)
+        pending_format = []
+    record = ServiceRecord(
+        spec=spec_url,
+        inputs=inputs,
+        apis=api_fingerprints,
+        operations=operation_index.operation_fingerprints(),
+        models=models_fingerprint,
+        schemas=operation_index.fingerprinter.schemas(),
+        files=files,
+    )
+    with profiling.span("manifest"), shared_files_lock():
+        if format_output:
+            record.settle()
+        manifest = Manifest.load()
+        manifest.set(service, record)
+        manifest.save()
+
+    regenerated = None
+    if operation_index.dirty_apis is not None:
+        regenerated = sorted(api_key(name) for name in operation_index.dirty_apis)
+    return GenerationReport(
+        service=service,
+        regenerated_apis=regenerated,
+        files=writer.stats,
+        pending_format=pending_format,
+        pruned=pruned,
+        kept_edited=kept_edited,
+    )
+
+
+def _run_generators(
+    parser: Parser,
+    operation_index: OperationIndex,
+    options: GenerationOptions,
+    render_settings: RenderSettings | None = None,
+) -> None:
+    _generate(
+        CLIENT_GENERATOR,
+        openapi_spec=parser,
+        async_mode=options.async_mode,
+        operation_index=operation_index,
+    )
+
+    if options.generate_fixtures:
+        _generate(
+            FIXTURE_GENERATORS[options.suite_version],
+            openapi_spec=parser,
+            operation_index=operation_index,
+            async_mode=options.async_mode,
+        )
+        _generate(CONFTEST_GENERATOR, openapi_spec=parser)
+        _generate(SETTINGS_GENERATOR, openapi_spec=parser)
+
+    if options.with_tests:
+        _generate(
+            TEST_GENERATORS[options.suite_version],
+            openapi_spec=parser,
+            async_mode=options.async_mode,
+            operation_index=operation_index,
+            render_settings=render_settings,
+            test_layout=options.test_layout,
+        )
+        _generate(README_GENERATOR, openapi_spec=parser)
+
+
+def _prune_stale(
+    owned: dict[str, FileRecord], produced: set[str]
+) -> tuple[list[str], list[str]]:
+    """Delete files an earlier run produced and this one no longer does.
+
+    ``produced`` also holds the files other services still record. Files whose
+    content differs from what was generated are kept as edited. A package
+    ``__init__.py`` goes only once nothing else is left beside it; directories
+    left empty are removed too.
+    """
+    pruned: list[str] = []
+    kept_edited: list[str] = []
+    stale = [path for path in owned if path not in produced and Path(path).is_file()]
+    # Modules first, so a package's ``__init__.py`` sees what remains.
+    for path in sorted(stale, key=lambda path: (path.endswith("__init__.py"), path)):
+        file_path = Path(path)
+        if file_path.name == "__init__.py":
+            if _package_contents(file_path.parent) != [file_path]:
+                continue
+        elif file_hash(file_path) != (owned[path].disk or owned[path].rendered):
+            kept_edited.append(path)
+            continue
+        file_path.unlink()
+        pruned.append(path)
+        _remove_empty_dirs(file_path.parent)
+    return sorted(pruned), kept_edited
+
+
+def _shared_record(manifest: Manifest, path: str) -> FileRecord:
+    # The hashes of the service that generated the file, so an edit made since
+    # is still told apart from the generated content.
+    for record in manifest.services.values():
+        if path in record.files:
+            return replace(record.files[path])
+    return FileRecord(rendered="")
+
+
+def _package_contents(directory: Path) -> list[Path]:
+    return [path for path in directory.iterdir() if path.name != "__pycache__"]
+
+
+def _remove_empty_dirs(directory: Path) -> None:
+    while directory != Path(".") and directory.is_dir():
+        if _package_contents(directory):
+            return
+        shutil.rmtree(directory)
+        directory = directory.parent
+
+
+def _only_spec_changed(previous: dict[str, Any], current: dict[str, Any]) -> bool:
+    return {**previous, "spec": None} == {**current, "spec": None}
+
+
+def load_generator(path: str) -> type:
+    """Import a generator class given as ``module:Class``."""
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _generate(generator: str, **kwargs: Any) -> None:
+    with profiling.span(generator.rpartition(":")[2]):
+        _build(generator, **kwargs).generate()
+
+
+def _build(generator: str, **kwargs: Any) -> Any:
+    generator_class = load_generator(generator)
+    # Generator constructors create shared package directories, so in batch
+    # mode they must not race with other workers.
+    with shared_files_lock():
+        return generator_class(**kwargs)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import cProfile
+
+OPERATIONS = "operations"
+FILES_RENDERED = "files rendered"
+FILES_WRITTEN = "files written"
+BYTES_WRITTEN = "bytes written"
+FORMATTER_CALLS = "formatter invocations"
+FILES_FORMATTED = "files formatted"
+
+
+@dataclass
+class Span:
+    """Time spent in one named stage, with its counters and nested stages."""
+
+    name: str
+    seconds: float = 0.0
+    calls: int = 0
+    counters: dict[str, int] = field(default_factory=dict)
+    children: dict[str, Span] = field(default_factory=dict)
+
+    def child(self, name: str) -> Span:
+        span = self.children.get(name)
+        if span is None:
+            span = self.children[name] = Span(name)
+        return span
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "seconds": round(self.seconds, 6),
+            "calls": self.calls,
+            "counters": dict(self.counters),
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+    def lines(self, depth: int = 0) -> Iterator[str]:
+        label = f"{'  ' * depth}{self.name}"
+        if self.calls > 1:
+            label += f" ×{self.calls}"
+        counters = ", ".join(f"{value} {name}" for name, value in self.counters.items())
+        yield f"{label:<48} {self.seconds:9.3f}s" + (
+            f"  [{counters}]" if counters else ""
+        )
+        for child in self.children.values():
+            yield from child.lines(depth + 1)
+
+
+class Profiler:
+    """Timing tree of a generation run.
+
+    Stages are entered with :func:`span` and counters added with :func:`count`;
+    a counter is added to every open stage, so parents show totals. Both are
+    no-ops unless a profiler is active (see :func:`profiling`). With
+    ``cprofile=True`` the run is also recorded by :mod:`cProfile`.
+    """
+
+    def __init__(self, name: str = "run", *, cprofile: bool = False) -> None:
+        self.root = Span(name)
+        self._stack = [self.root]
+        self._lock = threading.Lock()
+        self._cprofile: cProfile.Profile | None = None
+        if cprofile:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        with self._lock:
+            span = self._stack[-1].child(name)
+            span.calls += 1
+            self._stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                span.seconds += elapsed
+                self._stack.remove(span)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            for span in self._stack:
+                span.counters[name] = span.counters.get(name, 0) + value
+
+    def report(self) -> str:
+        return "\n".join(self.root.lines())
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.root.to_dict()
+
+    def write_json(self, path: Path) -> None:
+        Path(path).write_text(
+            json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8"
+        )
+
+    def dump_pstats(self, path: Path) -> None:
+        if self._cprofile is None:
+            raise RuntimeError("profiler was created without cprofile=True")
+        self._cprofile.dump_stats(str(path))
+
+
+_active_profiler: Profiler | None = None
+
+
+@contextmanager
+def profiling(profiler: Profiler) -> Iterator[Profiler]:
+    global _active_profiler
+    previous = _active_profiler
+    _active_profiler = profiler
+    started = time.perf_counter()
+    if profiler._cprofile is not None:
+        profiler._cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if profiler._cprofile is not None:
+            profiler._cprofile.disable()
+        profiler.root.seconds += time.perf_counter() - started
+        profiler.root.calls += 1
+        _active_profiler = previous
+
+
+def active_profiler() -> Profiler | None:
+    return _active_profiler
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a stage of the active profiler, if any."""
+    if _active_profiler is None:
+        yield
+        return
+    with _active_profiler.span(name):
+        yield
+
+
+def count(name: str, value: int = 1) -> None:
+    if _active_profiler is not None:
+        _active_profiler.count(name, value)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
+
+from e2efast.cache import SpecCache
+
+if TYPE_CHECKING:
+    # Annotations are strings here, so ``Self`` is not needed at runtime on
+    # Python 3.10.
+    from typing import Self
+
+    from restcodegen.generator.parser import Parser
+    from restcodegen.generator.spec import FetchSettings
+
+# httpx and restcodegen are imported where they are used: reading a local
+# spec for an up-to-date run should not pay for either.
+
+PARSED_NAMESPACE = "parsed"
+RESPONSES_NAMESPACE = "responses"
+# Where remote specs are kept for offline runs, as restcodegen always did.
+SCHEMAS_DIR = Path("clients") / "http" / "schemas"
+
+
+class SpecNotFoundError(FileNotFoundError):
+    """Raised when a spec path does not exist and no copy of the spec is kept."""
+
+
+@dataclass(frozen=True)
+class SpecSource:
+    """Raw bytes of an OpenAPI document and where they came from."""
+
+    location: str
+    content: bytes
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self.content).hexdigest()
+
+    def load(self) -> dict[str, Any]:
+        return json.loads(self.content)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ConditionalFetcher:
+    """Fetches remote specs over one pooled client, revalidating cached bodies.
+
+    Bodies are stored in the spec cache together with their ``ETag`` and
+    ``Last-Modified`` validators; the next fetch sends them back and a
+    ``304 Not Modified`` reuses the cached body without a transfer. When the
+    registry cannot be reached or answers with an error, a cached body is
+    used as well, with a warning.
+    """
+
+    def __init__(
+        self,
+        cache: SpecCache | None = None,
+        settings: FetchSettings | None = None,
+        max_connections: int = 8,
+    ) -> None:
+        import httpx
+        from restcodegen.generator.spec import FetchSettings
+
+        settings = settings or FetchSettings()
+        self.cache = cache
+        self.max_connections = max_connections
+        self._client = httpx.Client(
+            timeout=settings.timeout,
+            verify=settings.verify_ssl,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def fetch(self, url: str) -> SpecSource:
+        import httpx
+        from restcodegen.generator.spec import SpecFetchError
+
+        key = SpecCache.key(url) if self.cache is not None else ""
+        cached = self.cache.get(RESPONSES_NAMESPACE, key) if self.cache else None
+        headers = {}
+        if isinstance(cached, CachedResponse):
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        else:
+            cached = None
+
+        try:
+            response = self._client.get(url, headers=headers)
+            if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+                return SpecSource(location=url, content=cached.content)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            if cached:
+                from restcodegen.generator.log import LOGGER
+
+                LOGGER.warning(
+                    "OpenAPI spec not available by url %s (%s), using the cached copy",
+                    url,
+                    exc,
+                )
+                return SpecSource(location=url, content=cached.content)
+            raise SpecFetchError(f"Unable to fetch OpenAPI spec from {url!r}") from exc
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if self.cache is not None and (etag or last_modified):
+            self.cache.put(
+                RESPONSES_NAMESPACE,
+                key,
+                CachedResponse(
+                    content=response.content, etag=etag, last_modified=last_modified
+                ),
+            )
+        return SpecSource(location=url, content=response.content)
+
+    def fetch_many(self, urls: list[str]) -> dict[str, SpecSource | Exception]:
+        """Fetch ``urls`` concurrently; failures are returned, not raised."""
+        urls = list(dict.fromkeys(urls))
+        results: dict[str, SpecSource | Exception] = {}
+        if not urls:
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_connections, len(urls))
+        ) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in urls}
+            for future, url in futures.items():
+                try:
+                    results[url] = future.result()
+                except Exception as exc:  # noqa: BLE001 - reported per spec
+                    results[url] = exc
+        return results
+
+
+def read_spec(
+    location: str,
+    settings: FetchSettings | None = None,
+    cache: SpecCache | None = None,
+    service: str | None = None,
+) -> SpecSource:
+    """Read the spec at ``location``, a path or URL.
+
+    With ``service``, a remote spec is also kept in
+    ``clients/http/schemas/<service>.json`` and read from there when the URL
+    cannot be fetched and the spec cache holds no copy either, or when a path
+    does not exist.
+    """
+    if not is_url(location):
+        return _read_path(location, service)
+
+    from restcodegen.generator.spec import SpecFetchError
+
+    try:
+        with ConditionalFetcher(cache, settings, max_connections=1) as fetcher:
+            fetched: SpecSource | Exception = fetcher.fetch(location)
+    except SpecFetchError as exc:
+        fetched = exc
+    return settle_fetch(location, fetched, service)
+
+
+def settle_fetch(
+    url: str, fetched: SpecSource | Exception, service: str | None = None
+) -> SpecSource:
+    """The spec fetched from ``url``, or the kept copy when the fetch failed.
+
+    ``fetched`` is what :meth:`ConditionalFetcher.fetch` returned or raised.
+    With ``service``, a fetched spec is kept in the schemas copy and a failed
+    fetch falls back to that copy; other errors are raised as they are.
+    """
+    from restcodegen.generator.spec import SpecFetchError
+
+    copy = schema_copy_path(service) if service else None
+    if isinstance(fetched, SpecFetchError):
+        if copy is None or not copy.is_file():
+            raise fetched
+        from restcodegen.generator.log import LOGGER
+
+        LOGGER.warning("OpenAPI spec loaded from cache: %s", copy)
+        return SpecSource(location=url, content=copy.read_bytes())
+    if isinstance(fetched, Exception):
+        raise fetched
+
+    if copy is not None:
+        _keep_copy(copy, fetched.content)
+    return fetched
+
+
+def schema_copy_path(service: str) -> Path:
+    from restcodegen.generator.utils import name_to_snake
+
+    return SCHEMAS_DIR / f"{name_to_snake(service)}.json"
+
+
+def is_url(location: str) -> bool:
+    parsed = urlparse(location)
+    return bool(parsed.scheme) and bool(parsed.netloc)
+
+
+def build_parser(
+    source: SpecSource, service: str, cache: SpecCache | None = None
+) -> Parser:
+    """Parse ``source``, reusing a parser cached for identical spec bytes."""
+    from restcodegen.generator.parser import Parser
+
+    if cache is None:
+        return _parse(source, service)
+
+    key = cache.key(source.digest, service)
+    parser = cache.get(PARSED_NAMESPACE, key)
+    if isinstance(parser, Parser):
+        return parser
+    parser = _parse(source, service)
+    cache.put(PARSED_NAMESPACE, key, parser)
+    return parser
+
+
+def _read_path(location: str, service: str | None) -> SpecSource:
+    try:
+        return SpecSource(location=location, content=Path(location).read_bytes())
+    except FileNotFoundError:
+        copy = schema_copy_path(service) if service else None
+        if copy is None or not copy.is_file():
+            kept = f" and no copy is kept in {copy}" if copy is not None else ""
+            raise SpecNotFoundError(
+                f"OpenAPI spec not found at {location}{kept}"
+            ) from None
+
+    from restcodegen.generator.log import LOGGER
+
+    LOGGER.warning("OpenAPI spec loaded from cache: %s", copy)
+    return SpecSource(location=location, content=copy.read_bytes())
+
+
+def _keep_copy(path: Path, content: bytes) -> None:
+    try:
+        if path.is_file() and path.read_bytes() == content:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    except OSError as exc:
+        from restcodegen.generator.log import LOGGER
+
+        LOGGER.warning("Unable to write cache file %s: %s", path, exc)
+
+
+def _parse(source: SpecSource, service: str) -> Parser:
+    from restcodegen.generator.parser import Parser
+    from restcodegen.generator.spec import SpecNormalizer
+
+    return Parser(SpecNormalizer().normalize(source.load()), service)
@@ -1,28 +1,62 @@
-import importlib.metadata
+from __future__ import annotations
+
+import os
+import sys
 from functools import cache
-from jinja2 import Template
-from markupsafe import Markup
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+    from markupsafe import Markup
+
+# The manifest and cache modules import this one on every run, up to date or
+# not; importlib.metadata and markupsafe are imported where they are needed.
 
 
 @cache
-def get_dependencies() -> list[dict[str, str]]:
-    deps = [
-        {"path": dep.name, "version": dep.version}
-        for dep in importlib.metadata.distributions()
-    ]  # type: ignore[attr-defined]
+def package_version(distribution: str) -> str:
+    """Version of one installed distribution, without scanning the environment."""
+    version = _dist_info_version(distribution)
+    if version is not None:
+        return version
 
-    return sorted(deps, key=lambda x: x["path"].lower())
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version(distribution)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _dist_info_version(distribution: str) -> str | None:
+    # ``<name>-<version>.dist-info`` carries the version in its name, found in
+    # the same ``sys.path`` order importlib.metadata searches.
+    prefix = distribution.replace("-", "_").lower() + "-"
+    for entry in sys.path:
+        try:
+            names = os.listdir(entry or ".")
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(".dist-info") and name.lower().startswith(prefix):
+                return name[len(prefix) : -len(".dist-info")]
+    return None
 
 
-@cache
 def get_version() -> str:
-    deps = get_dependencies()
-    for dep in deps:
-        if dep["path"] == "e2efast":
-            return dep["version"]
-    return "unknown"
+    return package_version("e2efast")
 
 
+@cache
+def load_template(path: Path) -> Template:
+    """Compile a standalone template once per process."""
+    from jinja2 import Template
+
+    return Template(Path(path).read_text(encoding="utf-8"))
+
+
+@cache
 def render_header(
     template: Template,
     *,
@@ -33,7 +67,18 @@ def render_header(
     context = {"version": version, "can_edit": can_edit}
     if service_name is not None:
         context["service_name"] = service_name
+    from markupsafe import Markup
+
     rendered = template.render(**context)
     if not rendered.endswith("\n\n"):
         rendered = rendered.rstrip("\n") + "\n\n"
     return Markup(rendered)
+
+
+# Written by ``base_templates/header.jinja2`` into files users may edit.
+EDITABLE_MARKER = "You can manually edit this file."
+
+
+def is_editable(text: str) -> bool:
+    """Whether generated ``text`` carries the editable header."""
+    return EDITABLE_MARKER in text[:1024]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from e2efast.cache import SpecCache
+from e2efast.pipeline import GenerationOptions, GenerationReport, generate_service
+from e2efast.spec import ConditionalFetcher, SpecSource, is_url
+
+if TYPE_CHECKING:
+    from e2efast.generators.rendering import RenderSettings
+
+DEFAULT_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class WatchResult:
+    """Outcome of one regeneration triggered by a change.
+
+    ``recovered`` is set on the first result after the spec could not be read,
+    including one without a report when the spec came back unchanged.
+    """
+
+    report: GenerationReport | None = None
+    error: str | None = None
+    recovered: bool = False
+
+
+class Watcher:
+    """Regenerates a service whenever its spec or template overrides change.
+
+    Runs in-process, so restcodegen, the generators and the shared Jinja
+    environment are imported and compiled once. Each poll only stats the spec
+    file and the override templates (or sends a conditional request for a
+    remote spec); a change reruns :func:`generate_service`, whose manifest
+    limits the work to the tags whose operations or models changed.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        spec_url: str,
+        options: GenerationOptions | None = None,
+        *,
+        interval: float = DEFAULT_INTERVAL,
+        use_cache: bool = True,
+        template_dirs: Sequence[str | Path] = (),
+        render_settings: RenderSettings | None = None,
+    ) -> None:
+        self.service = service
+        self.spec_url = spec_url
+        self.options = options or GenerationOptions()
+        self.interval = interval
+        self.use_cache = use_cache
+        self.template_dirs = tuple(Path(path) for path in template_dirs)
+        self.render_settings = render_settings
+        self._stop = threading.Event()
+        self._fetcher: ConditionalFetcher | None = None
+        self._spec_state: object = None
+        self._templates_state: object = None
+        # The last error reading the spec, reported once until it changes.
+        self._read_error: str | None = None
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, on_result: Callable[[WatchResult], None]) -> None:
+        """Poll until :meth:`stop` is called, reporting every regeneration."""
+        cache = SpecCache() if self.use_cache else None
+        if is_url(self.spec_url):
+            self._fetcher = ConditionalFetcher(cache, max_connections=1)
+        try:
+            while not self._stop.is_set():
+                result = self.poll()
+                if result is not None:
+                    on_result(result)
+                self._stop.wait(self.interval)
+        finally:
+            if self._fetcher is not None:
+                self._fetcher.close()
+                self._fetcher = None
+
+    def poll(self) -> WatchResult | None:
+        """Regenerate if anything changed since the last poll."""
+        templates_state = self._templates_snapshot()
+        try:
+            spec_state, source = self._read_spec()
+        except Exception as exc:  # noqa: BLE001 - keep watching
+            error = f"{type(exc).__name__}: {exc}"
+            if error == self._read_error:
+                return None
+            self._read_error = error
+            return WatchResult(error=error)
+        recovered = self._read_error is not None
+        self._read_error = None
+        if (spec_state, templates_state) == (self._spec_state, self._templates_state):
+            return WatchResult(recovered=True) if recovered else None
+        # Remember the state even if generation fails, so a broken spec is
+        # reported once and retried on its next change rather than every poll.
+        self._spec_state, self._templates_state = spec_state, templates_state
+        if source is None:
+            source = SpecSource(
+                location=self.spec_url, content=Path(self.spec_url).read_bytes()
+            )
+        try:
+            report = generate_service(
+                self.service,
+                self.spec_url,
+                self.options,
+                use_cache=self.use_cache,
+                source=source,
+                render_settings=self.render_settings,
+                template_dirs=self.template_dirs,
+            )
+        except Exception as exc:  # noqa: BLE001 - keep watching
+            return WatchResult(
+                error=f"{type(exc).__name__}: {exc}", recovered=recovered
+            )
+        return WatchResult(report=report, recovered=recovered)
+
+    def _read_spec(self) -> tuple[object, SpecSource | None]:
+        if self._fetcher is not None:
+            source = self._fetcher.fetch(self.spec_url)
+            return source.digest, source
+        stat = Path(self.spec_url).stat()
+        return (stat.st_mtime_ns, stat.st_size), None
+
+    def _templates_snapshot(self) -> tuple[tuple[str, int, int], ...]:
+        entries = []
+        for root in self.template_dirs:
+            for path in sorted(root.rglob("*.jinja2")):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+import pytest
+
+SPEC: dict[str, Any] = {
+    "openapi": "3.0.0",
+    "info": {"title": "Customers", "version": "1.0.0"},
+    "paths": {
+        "/users/{id}": {
+            "get": {
+                "tags": ["users"],
+                "operationId": "getUser",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/User"}
+                            }
+                        },
+                    }
+                },
+            }
+        },
+        "/users": {
+            "post": {
+                "tags": ["users"],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/User"}
+                        }
+                    }
+                },
+                "responses": {
+                    "201": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/User"}
+                            }
+                        },
+                    }
+                },
+            }
+        },
+        "/orders": {
+            "get": {
+                "tags": ["orders"],
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Order"}
+                            }
+                        },
+                    }
+                },
+            }
+        },
+        "/health": {"get": {"responses": {"200": {"description": "ok"}}}},
+    },
+    "components": {
+        "schemas": {
+            "User": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "address": {"$ref": "#/components/schemas/Address"},
+                },
+            },
+            "Address": {
+                "type": "object",
+                "properties": {"city": {"type": "string"}},
+            },
+            "Order": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "user": {"$ref": "#/components/schemas/User"},
+                },
+            },
+        }
+    },
+}
+
+
+@pytest.fixture
+def openapi_spec() -> dict[str, Any]:
+    return copy.deepcopy(SPEC)
+
+
+@pytest.fixture
+def parser(openapi_spec: dict[str, Any]):
+    from restcodegen.generator.parser import Parser
+
+    return Parser(openapi_spec, "customers")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run generators inside an empty project directory."""
+    from restcodegen.generator.spec.loader import SpecLoader
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(SpecLoader, "BASE_PATH", tmp_path / "clients" / "http")
+    monkeypatch.setenv("E2EFAST_CACHE_DIR", str(tmp_path.parent / "e2efast-cache"))
+    return tmp_path
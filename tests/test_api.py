@@ -0,0 +1,76 @@
+import copy
+import json
+
+from e2efast.api import generate
+from e2efast.pipeline import GenerationOptions, generate_service
+
+USERS_API = "internal/clients/http/customers/apis/users_api.py"
+USERS_CLIENT = "framework/clients/http/customers/users_client.py"
+
+
+def test_generate_renders_into_memory_only(workdir, openapi_spec):
+    tree = generate(openapi_spec, "customers", GenerationOptions(with_tests=True))
+
+    assert list(workdir.iterdir()) == []
+    assert USERS_API in tree
+    assert "tests/http/customers/users/test_post_users.py" in tree
+    assert "class UsersApi" in tree.text(USERS_API)
+    assert tree.removed == []
+
+    diff = tree.diff(workdir)
+    assert diff.added == list(tree)
+    assert diff.unified().count("+++ b/") == len(tree)
+
+    assert tree.flush(workdir).written == len(tree)
+    assert (workdir / USERS_API).read_bytes() == tree[USERS_API]
+    assert not tree.diff(workdir).has_changes
+
+
+def test_generate_against_existing_project(workdir, openapi_spec):
+    options = GenerationOptions(with_tests=True, formatter="none")
+    generate(openapi_spec, "customers", options).flush(workdir)
+    (workdir / USERS_CLIENT).write_text("# edited\n", encoding="utf-8")
+    (workdir / "__init__.py").write_text("", encoding="utf-8")
+
+    openapi_spec["paths"]["/users"]["post"]["summary"] = "Create a user"
+    tree = generate(openapi_spec, "customers", options, root=workdir)
+    diff = tree.diff(workdir)
+
+    assert USERS_CLIENT not in tree
+    assert diff.changed == [USERS_API]
+    assert diff.removed == ["__init__.py"]
+    assert "+++ b/" + USERS_API in diff.unified()
+    assert diff.to_dict()["unchanged"] == len(tree) - 1
+    assert (workdir / "__init__.py").exists()
+
+
+def test_preview_matches_the_formatted_run(workdir, openapi_spec):
+    # isort groups ``framework`` as first-party only when ruff sees it in the
+    # project, and the new test file is the only ``framework`` import pending.
+    (workdir / "pyproject.toml").write_text(
+        '[tool.ruff.lint]\nselect = ["I"]\n', encoding="utf-8"
+    )
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    options = GenerationOptions(with_tests=True)
+    generate_service("customers", str(spec), options)
+
+    list_users = copy.deepcopy(openapi_spec["paths"]["/users"]["post"])
+    del list_users["requestBody"]
+    list_users["operationId"] = "list_users"
+    openapi_spec["paths"]["/users"]["get"] = list_users
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    before = {path: path.read_bytes() for path in workdir.rglob("*.py")}
+
+    tree = generate(str(spec), "customers", options, root=workdir)
+    diff = tree.diff(workdir)
+    assert {path: path.read_bytes() for path in workdir.rglob("*.py")} == before
+    generate_service("customers", str(spec), options)
+
+    changed = {
+        path.relative_to(workdir).as_posix(): path.read_bytes()
+        for path in workdir.rglob("*.py")
+        if before.get(path) != path.read_bytes()
+    }
+    assert sorted(diff.added + diff.changed) == sorted(changed)
+    assert {path: tree[path] for path in changed} == changed
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from e2efast.pipeline import GenerationOptions, generate_service
+
+
+def _write_spec(workdir, spec):
+    path = workdir / "spec.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    ("suite_version", "fixture_module", "session_fixture"),
+    [
+        ("v1", "customers.py", "customers_client"),
+        ("v2", "customers_service.py", "customers_service_client"),
+    ],
+)
+def test_async_suite(
+    workdir, openapi_spec, suite_version, fixture_module, session_fixture
+):
+    options = GenerationOptions(
+        with_tests=True, suite_version=suite_version, async_mode=True
+    )
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    api = workdir / "internal/clients/http/customers/apis/users_api.py"
+    assert "async def get_users_id(" in api.read_text(encoding="utf-8")
+
+    fixtures = (workdir / "framework/fixtures/http" / fixture_module).read_text(
+        encoding="utf-8"
+    )
+    assert f"async def {session_fixture}()" in fixtures
+    assert "client_pool.async_client(" in fixtures
+    assert "await client_pool.arelease(client)" in fixtures
+
+    test_dir = workdir / "tests/http/customers/users"
+    test = (test_dir / "test_get_users_id.py").read_text(encoding="utf-8")
+    assert '@pytest.mark.asyncio(loop_scope="session")' in test
+    assert "response = await " in test
+
+
+def test_async_service_keeps_an_existing_base(workdir, openapi_spec):
+    base = workdir / "framework/fixtures/http/base.py"
+    base.parent.mkdir(parents=True)
+    text = (
+        "from functools import partial\n\nimport httpx\n\n"
+        "ClientClass = partial(httpx.Client, verify=False)\n"
+    )
+    base.write_text(text, encoding="utf-8")
+    options = GenerationOptions(with_fixtures=True, async_mode=True)
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    assert base.read_text(encoding="utf-8") == text
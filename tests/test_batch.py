@@ -0,0 +1,119 @@
+import json
+import socket
+
+import pytest
+
+from e2efast.batch import BatchManifestError, load_manifest, run_batch
+from e2efast.pipeline import GenerationOptions
+
+
+def test_load_manifest_applies_defaults(tmp_path):
+    manifest = tmp_path / "services.yaml"
+    manifest.write_text(
+        "defaults:\n"
+        "  with_tests: true\n"
+        "services:\n"
+        "  - service: customers\n"
+        "    spec: specs/crm.json\n"
+        "  - service: billing\n"
+        "    spec: https://specs.example.test/billing.json\n"
+        "    suite_version: v1\n",
+        encoding="utf-8",
+    )
+
+    customers, billing = load_manifest(manifest)
+
+    assert customers.spec == str(tmp_path / "specs" / "crm.json")
+    assert customers.options == GenerationOptions(with_tests=True)
+    assert billing.spec == "https://specs.example.test/billing.json"
+    assert billing.options == GenerationOptions(with_tests=True, suite_version="v1")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "services: []",
+        "services:\n  - service: customers\n",
+        "services:\n  - {service: a, spec: a.json}\n  - {service: a, spec: b.json}\n",
+        "services:\n  - {service: a, spec: a.json, with_docs: true}\n",
+        "services:\n  - {service: a, spec: a.json, suite_version: v3}\n",
+        "services:\n  - {service: a, spec: a.json, suite_version: 2}\n",
+        "services:\n  - {service: a, spec: a.json, with_tests: 'yes'}\n",
+        "services:\n  - {service: a, spec: a.json, test_layout: flat}\n",
+        "defaults: {async: true}\nservices:\n  - {service: a, spec: a.json}\n",
+    ],
+)
+def test_load_manifest_rejects_invalid_entries(tmp_path, content):
+    manifest = tmp_path / "services.yaml"
+    manifest.write_text(content, encoding="utf-8")
+
+    with pytest.raises(BatchManifestError):
+        load_manifest(manifest)
+
+
+def test_load_manifest_errors_name_the_service(tmp_path):
+    manifest = tmp_path / "services.yaml"
+    manifest.write_text(
+        "services:\n"
+        "  - {service: customers, spec: a.json}\n"
+        "  - {service: billing, spec: b.json, suite_version: v3}\n",
+        encoding="utf-8",
+    )
+
+    with pytest.raises(BatchManifestError, match="service 'billing'.*'v3'"):
+        load_manifest(manifest)
+
+
+def test_run_batch_generates_every_service(workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    manifest = workdir / "services.yaml"
+    manifest.write_text(
+        "defaults:\n"
+        "  with_fixtures: true\n"
+        "services:\n"
+        "  - {service: customers, spec: spec.json}\n"
+        "  - {service: billing, spec: spec.json}\n"
+        "  - {service: missing, spec: nope.json}\n",
+        encoding="utf-8",
+    )
+
+    results = run_batch(load_manifest(manifest), workers=2)
+
+    assert [(r.service, r.ok) for r in results] == [
+        ("customers", True),
+        ("billing", True),
+        ("missing", False),
+    ]
+    settings = (workdir / "framework" / "settings" / "base_settings.py").read_text()
+    assert "customers: str | None" in settings
+    assert "billing: str | None" in settings
+    fixtures = workdir / "framework" / "fixtures" / "http"
+    assert (fixtures / "customers_service.py").is_file()
+    assert (fixtures / "billing_service.py").is_file()
+
+
+def test_run_batch_falls_back_to_the_schema_copy_offline(workdir, openapi_spec):
+    # A port nothing listens on: every fetch fails.
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{probe.getsockname()[1]}/crm.json"
+    copy = workdir / "clients" / "http" / "schemas" / "customers.json"
+    copy.parent.mkdir(parents=True)
+    copy.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    manifest = workdir / "services.yaml"
+    manifest.write_text(
+        "services:\n"
+        f"  - {{service: customers, spec: '{url}'}}\n"
+        f"  - {{service: billing, spec: '{url}'}}\n",
+        encoding="utf-8",
+    )
+
+    results = run_batch(load_manifest(manifest), workers=2, use_cache=False)
+
+    assert [(r.service, r.ok) for r in results] == [
+        ("customers", True),
+        ("billing", False),
+    ]
+    assert "SpecFetchError" in results[1].error
+    assert (workdir / "framework/clients/http/customers/users_client.py").is_file()
@@ -0,0 +1,47 @@
+import json
+import os
+
+from e2efast.cache import SpecCache
+from e2efast.spec import PARSED_NAMESPACE, SpecSource, build_parser
+
+
+def test_parsed_spec_is_reused_for_identical_content(tmp_path, openapi_spec):
+    cache = SpecCache(tmp_path)
+    source = SpecSource("spec.json", json.dumps(openapi_spec).encode("utf-8"))
+
+    first = build_parser(source, "customers", cache)
+    second = build_parser(source, "customers", cache)
+
+    assert second is not first
+    assert second.openapi_spec == first.openapi_spec
+    assert [op.raw_operation for op in second.operations] == [
+        op.raw_operation for op in first.operations
+    ]
+    assert len(list(tmp_path.glob(f"{PARSED_NAMESPACE}/*.bin"))) == 1
+    openapi_spec["info"]["version"] = "2.0.0"
+    changed = SpecSource("spec.json", json.dumps(openapi_spec).encode("utf-8"))
+    assert build_parser(changed, "customers", cache).version == "2.0.0"
+    assert len(list(tmp_path.glob(f"{PARSED_NAMESPACE}/*.bin"))) == 2
+
+
+def test_corrupt_entries_are_misses(tmp_path):
+    cache = SpecCache(tmp_path)
+    cache.put("parsed", "key", {"value": 1})
+    (tmp_path / "parsed" / "key.bin").write_bytes(b"garbage")
+
+    assert cache.get("parsed", "key") is None
+    assert not (tmp_path / "parsed" / "key.bin").exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = os.urandom(4096)
+    cache = SpecCache(tmp_path, max_bytes=3 * 4200)
+    for index, name in enumerate(("a", "b", "c")):
+        cache.put("parsed", name, payload)
+        os.utime(tmp_path / "parsed" / f"{name}.bin", (index, index))
+    assert cache.get("parsed", "a") == payload
+
+    cache.put("parsed", "d", payload)
+
+    assert cache.get("parsed", "b") is None
+    assert {path.stem for path in tmp_path.glob("parsed/*.bin")} == {"a", "c", "d"}
@@ -0,0 +1,126 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from e2efast.cli.main import main
+from e2efast.utils import get_version
+
+HEAVY_MODULES = (
+    "restcodegen.generator.parser",
+    "jinja2",
+    "httpx",
+    "datamodel_code_generator",
+)
+# Besides the generators, an up-to-date run needs neither restcodegen itself
+# nor the package metadata machinery.
+UP_TO_DATE_HEAVY_MODULES = (
+    *HEAVY_MODULES,
+    "restcodegen",
+    "importlib.metadata",
+    "markupsafe",
+)
+
+# Runs the CLI in a fresh interpreter and reports the modules it imported on
+# stderr.
+PROBE = """
+import sys
+from e2efast.cli.main import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+sys.stderr.write(",".join(sorted(sys.modules)))
+"""
+
+
+def _imported_heavy_modules(args, cwd, heavy=HEAVY_MODULES):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return ",".join(sorted(set(result.stderr.strip().split(",")) & set(heavy)))
+
+
+@pytest.mark.parametrize("args", [["--help"], ["--version"], ["batch", "--help"]])
+def test_cli_startup_skips_generator_imports(workdir, args):
+    assert _imported_heavy_modules(args, workdir) == ""
+
+
+def test_up_to_date_run_skips_generator_imports(workdir, openapi_spec):
+    (workdir / "spec.json").write_text(json.dumps(openapi_spec), encoding="utf-8")
+    args = ["customers", "--spec", "spec.json", "--formatter", "none"]
+    main(args, standalone_mode=False)
+
+    imported = _imported_heavy_modules(args, workdir, UP_TO_DATE_HEAVY_MODULES)
+    assert imported == ""
+
+
+def test_version_option(capsys):
+    with pytest.raises(SystemExit):
+        main(["--version"], prog_name="e2efast")
+
+    assert capsys.readouterr().out == f"e2efast {get_version()}\n"
+
+
+def test_dry_run_reports_changes_without_writing(workdir, openapi_spec, capsys):
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    args = ["customers", "--spec", "spec.json", "--formatter", "none"]
+    main(args, standalone_mode=False)
+    openapi_spec["paths"]["/orders"]["get"]["summary"] = "List orders"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    before = {path: path.read_bytes() for path in workdir.rglob("*.py")}
+    capsys.readouterr()
+
+    main([*args, "--dry-run"], standalone_mode=False)
+    summary = json.loads(capsys.readouterr().out)
+    main([*args, "--diff"], standalone_mode=False)
+    unified = capsys.readouterr().out
+
+    orders_api = "internal/clients/http/customers/apis/orders_api.py"
+    assert summary["changed"] == [orders_api]
+    assert summary["added"] == summary["removed"] == []
+    assert unified.startswith(f"--- a/{orders_api}\n+++ b/{orders_api}\n")
+    assert "+        List orders." in unified
+    assert {path: path.read_bytes() for path in workdir.rglob("*.py")} == before
+
+
+def test_missing_spec_path_is_reported_without_a_traceback(workdir, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["customers", "--spec", "missing.json", "--no-daemon"])
+
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().err == (
+        "Error: OpenAPI spec not found at missing.json and no copy is kept in "
+        "clients/http/schemas/customers.json\n"
+    )
+
+
+@pytest.mark.parametrize("name", ["batch", "watch", "impact"])
+def test_service_named_like_a_subcommand_needs_generate(workdir, capsys, name):
+    with pytest.raises(SystemExit) as exit_info:
+        main([name, "--spec", "spec.json"], prog_name="e2efast")
+
+    assert exit_info.value.code == 2
+    assert (
+        f"to generate a service named {name!r}, run: "
+        f"e2efast generate {name} --spec spec.json"
+    ) in capsys.readouterr().err
+
+
+def test_subcommand_options_before_arguments_still_parse(workdir, openapi_spec):
+    (workdir / "spec.json").write_text(json.dumps(openapi_spec), encoding="utf-8")
+    main(
+        ["customers", "--spec", "spec.json", "--formatter", "none"],
+        standalone_mode=False,
+    )
+
+    main(
+        ["impact", "--spec", "spec.json", "customers", "--output", "files"],
+        standalone_mode=False,
+    )
@@ -0,0 +1,109 @@
+import json
+import threading
+
+import pytest
+
+from e2efast.cli.main import main
+from e2efast.daemon import (
+    DEFAULT_SOCKET,
+    DaemonError,
+    GenerationServer,
+    diff_request,
+    generate_request,
+    send_request,
+)
+from e2efast.pipeline import GenerationOptions, GenerationReport
+
+
+@pytest.fixture
+def daemon(workdir):
+    server = GenerationServer(workdir / "daemon.sock", max_specs=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_generate_request_is_served_with_warm_caches(daemon, workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    request = generate_request(
+        "customers", str(spec_path), GenerationOptions(formatter="none"), force=True
+    )
+
+    first = send_request(request, daemon.socket_path)
+    second = send_request(request, daemon.socket_path)
+
+    assert first["ok"] and second["ok"]
+    report = GenerationReport.from_dict(second["report"])
+    assert report.files.written == 0 and report.files.unchanged > 0
+    assert daemon.cache.hits == 1
+    assert (workdir / "internal/clients/http/customers/apis/users_api.py").exists()
+
+
+def test_diff_request_compares_without_writing(daemon, workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    options = GenerationOptions(formatter="none")
+    send_request(
+        generate_request("customers", str(spec_path), options), daemon.socket_path
+    )
+    users_api = workdir / "internal/clients/http/customers/apis/users_api.py"
+    before = users_api.read_bytes()
+
+    openapi_spec["paths"]["/users"]["post"]["summary"] = "Create a user"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    request = diff_request("customers", str(spec_path), options, unified=True)
+    response = send_request(request, daemon.socket_path)
+
+    assert response["ok"]
+    assert response["diff"]["changed"] == [
+        "internal/clients/http/customers/apis/users_api.py"
+    ]
+    assert "+        Create a user." in response["unified"]
+    assert users_api.read_bytes() == before
+
+
+def test_parsed_specs_are_evicted_least_recently_used(daemon, workdir, openapi_spec):
+    for service in ("customers", "billing"):
+        spec_path = workdir / f"{service}.json"
+        spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+        request = generate_request(service, str(spec_path), GenerationOptions())
+        assert send_request(request, daemon.socket_path)["ok"]
+
+    assert len(daemon.cache) == 1
+
+
+def test_errors_and_missing_daemon(daemon, workdir):
+    response = send_request({"command": "bogus"}, daemon.socket_path)
+
+    assert response["ok"] is False
+    assert "bogus" in response["error"]
+    assert send_request({"command": "ping"}, workdir / "absent.sock") is None
+    with pytest.raises(DaemonError):
+        GenerationServer(daemon.socket_path)
+
+
+def test_cli_generates_in_process_when_the_daemon_fails(
+    workdir, tmp_path_factory, openapi_spec, capsys
+):
+    server = GenerationServer(workdir / DEFAULT_SOCKET)
+    server.root = str(tmp_path_factory.mktemp("elsewhere"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    (workdir / "spec.json").write_text(json.dumps(openapi_spec), encoding="utf-8")
+    try:
+        main(
+            ["customers", "--spec", "spec.json", "--formatter", "none"],
+            standalone_mode=False,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert server.requests == 1
+    assert f"daemon serves {server.root}" in capsys.readouterr().err
+    assert (workdir / "internal/clients/http/customers/apis/users_api.py").exists()
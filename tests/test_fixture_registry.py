@@ -0,0 +1,134 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from e2efast.fixture_registry import get_fixtures, register_fixture
+from e2efast.pipeline import GenerationOptions, generate_service
+
+FIXTURES = "framework.fixtures.http"
+
+
+RECORDER = """
+import sys
+
+
+def pytest_collection_finish(session):
+    for item in session.items:
+        print("ITEM", item.nodeid)
+    for name in sorted(sys.modules):
+        if name.startswith("framework.fixtures.http."):
+            print("LOADED", name)
+"""
+
+
+@pytest.fixture
+def project(workdir, openapi_spec):
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    options = GenerationOptions(with_tests=True, suite_version="v2")
+    for service in ("customers", "billing"):
+        generate_service(service, str(spec), options)
+
+    return workdir
+
+
+def _run(workdir, *args):
+    (workdir / "record_collection.py").write_text(RECORDER, encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", *args, "-q"]
+        + ["-p", "record_collection", "-p", "no:cacheprovider"],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(workdir)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    lines = [line.partition(" ") for line in result.stdout.splitlines()]
+    nodeids = [value for kind, _, value in lines if kind == "ITEM"]
+    loaded = [value for kind, _, value in lines if kind == "LOADED"]
+    return nodeids, loaded
+
+
+def test_only_the_selected_service_fixtures_are_imported(project):
+    init = project / "framework/fixtures/http/__init__.py"
+    assert "import" not in init.read_text(encoding="utf-8")
+
+    nodeids, loaded = _run(project, "tests/http/customers", "--collect-only")
+
+    assert nodeids
+    assert all(nodeid.startswith("tests/http/customers/") for nodeid in nodeids)
+    assert f"{FIXTURES}.customers_service" in loaded
+    assert f"{FIXTURES}.billing_service" not in loaded
+
+
+def test_fixture_names_select_modules_outside_service_directories(project):
+    custom = project / "tests/custom"
+    custom.mkdir()
+    (custom / "test_billing.py").write_text(
+        "def test_billing(billing_service):\n    assert billing_service.api_client\n",
+        encoding="utf-8",
+    )
+
+    nodeids, loaded = _run(project, "tests/custom")
+
+    assert nodeids == ["tests/custom/test_billing.py::test_billing"]
+    assert f"{FIXTURES}.billing_service" in loaded
+    assert f"{FIXTURES}.customers_service" not in loaded
+
+
+def test_regeneration_drops_eager_fixture_imports(workdir, openapi_spec):
+    package = workdir / "framework/fixtures/http"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text(
+        "from . import customers_service  # noqa: F401\nfrom . import mine\n",
+        encoding="utf-8",
+    )
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    generate_service("customers", str(spec), GenerationOptions(with_fixtures=True))
+
+    assert (package / "__init__.py").read_text(encoding="utf-8") == (
+        "from . import mine\n"
+    )
+
+
+def test_async_fixtures_without_pytest_asyncio_name_the_extra(workdir, openapi_spec):
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    options = GenerationOptions(with_tests=True, async_mode=True)
+    generate_service("customers", str(spec), options)
+    # Stands in for pytest-asyncio not being installed.
+    (workdir / "pytest_asyncio.py").write_text(
+        "raise ModuleNotFoundError('pytest_asyncio', name='pytest_asyncio')\n",
+        encoding="utf-8",
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "tests/http/customers", "-q"],
+        cwd=workdir,
+        env={
+            **os.environ,
+            "PYTHONPATH": str(workdir),
+            "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1",
+        },
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == pytest.ExitCode.INTERRUPTED, result.stdout
+    hint = "needs pytest-asyncio>=0.24: pip install 'e2efast[async]'"
+    assert hint in result.stdout
+    assert "ModuleNotFoundError" not in result.stdout
+
+
+def test_registry_keeps_registration_order(monkeypatch):
+    monkeypatch.setattr("e2efast.fixture_registry._PLUGINS", {})
+    for name in ("b.fixtures", "a.fixtures", "b.fixtures"):
+        register_fixture(name)
+
+    assert get_fixtures() == ["e2efast.fixture_registry", "b.fixtures", "a.fixtures"]
@@ -0,0 +1,141 @@
+import asyncio
+import ssl
+import threading
+import types
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from e2efast.http_pool import ClientPool, PoolSettings, shared_pool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_of_one_host_share_a_pool_until_released(server_url):
+    pool = ClientPool(PoolSettings(max_keepalive_connections=4))
+    users = pool.client(f"{server_url}/users")
+    orders = pool.client(f"{server_url}/orders")
+    assert users._transport.pooled is orders._transport.pooled
+
+    users.get("/1")
+    orders.get("/2")
+    (stats,) = pool.stats()
+    assert stats.key == server_url
+    assert (stats.clients, stats.requests) == (2, 2)
+    assert stats.connections == stats.idle_connections == 1
+
+    pool.release(users)
+    assert users.is_closed
+    assert pool.stats()[0].clients == 1
+    orders.get("/3")
+    pool.release(orders)
+    assert pool.stats() == []
+    assert orders._transport.pooled._pool.connections == []
+
+
+def test_client_class_tls_options_reach_the_pooled_transport():
+    pool = ClientPool(client_class=partial(httpx.Client, verify=False))
+    client = pool.client("https://a.test")
+    context = client._transport.pooled._pool._ssl_context
+
+    assert context.verify_mode == ssl.CERT_NONE
+    assert not context.check_hostname
+    pool.release(client)
+
+
+def test_proxies_are_applied_to_the_pooled_transport(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+    monkeypatch.setenv("NO_PROXY", "internal.test")
+    pool = ClientPool()
+    proxied = pool.client("https://a.test")
+    direct = pool.client("https://internal.test")
+    explicit = pool.client("https://b.test", proxy="http://other.test:8080")
+
+    assert proxied._transport.pooled._pool._proxy_url.host == b"proxy.test"
+    assert not hasattr(direct._transport.pooled._pool, "_proxy_url")
+    assert explicit._transport.pooled._pool._proxy_url.host == b"other.test"
+    assert explicit._mounts == {}
+    pool.close()
+
+
+@pytest.mark.parametrize(("share", "pools"), [("host", 2), ("all", 1), ("none", 3)])
+def test_sharing_modes(share, pools):
+    pool = ClientPool(PoolSettings(share=share))
+    for url in ("http://a.test", "http://a.test:80/v2", "https://a.test"):
+        pool.client(url)
+    assert len(pool.stats()) == pools
+    pool.close()
+    assert pool.stats() == []
+
+
+def test_async_clients_are_pooled_and_released(server_url):
+    pool = ClientPool()
+
+    async def run():
+        client = pool.async_client(server_url)
+        await asyncio.gather(*(client.get(f"/{index}") for index in range(5)))
+        (stats,) = pool.stats()
+        assert stats.asynchronous and stats.requests == 5
+        await pool.arelease(client)
+        assert client.is_closed
+
+    asyncio.run(run())
+    assert pool.stats() == []
+
+
+def test_settings_from_environment():
+    settings = PoolSettings().with_env(
+        {
+            "E2EFAST_POOL_MAX_CONNECTIONS": "400",
+            "E2EFAST_POOL_MAX_KEEPALIVE_CONNECTIONS": "none",
+            "E2EFAST_POOL_HTTP2": "true",
+            "E2EFAST_POOL_SHARE": "all",
+        }
+    )
+    assert settings == PoolSettings(
+        max_connections=400, max_keepalive_connections=None, http2=True, share="all"
+    )
+    with pytest.raises(ValueError):
+        PoolSettings(share="process")
+
+
+def test_shared_pool_of_a_base_without_one():
+    built = []
+
+    def client_class(**kwargs):
+        built.append(kwargs)
+        return httpx.Client(**kwargs)
+
+    base = types.ModuleType("old_base")
+    base.ClientClass = client_class
+    pool = shared_pool(base)
+    assert shared_pool(base) is pool
+    pool.release(pool.client("http://a.test"))
+    assert built[0]["base_url"] == "http://a.test"
+
+    base.client_pool = ClientPool()
+    assert shared_pool(base) is base.client_pool
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from e2efast.impact import ImpactError, analyze_impact
+from e2efast.pipeline import GenerationOptions, generate_service
+
+
+def _write_spec(workdir, spec, name="spec.json"):
+    path = workdir / name
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_nested_model_change_selects_dependent_tests(workdir, openapi_spec, use_cache):
+    options = GenerationOptions(with_tests=True, formatter="none")
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    openapi_spec["components"]["schemas"]["Order"]["properties"]["total"] = {
+        "type": "number"
+    }
+    report = analyze_impact(
+        "customers", _write_spec(workdir, openapi_spec), use_cache=use_cache
+    )
+
+    assert report.baseline == ("cache" if use_cache else "manifest")
+    assert report.changed_operations == ["GET /orders"]
+    assert report.changed_models == ["Order"]
+    assert report.affected_models == ["Order"]
+    assert report.node_ids == [
+        "tests/http/customers/orders/test_get_orders.py::test_get_orders"
+    ]
+
+
+def test_base_spec_comparison(workdir, openapi_spec):
+    base = _write_spec(workdir, openapi_spec, "base.json")
+    openapi_spec["components"]["schemas"]["Address"]["properties"]["zip"] = {
+        "type": "string"
+    }
+    openapi_spec["paths"]["/users/{id}"]["delete"] = {
+        "tags": ["users"],
+        "parameters": openapi_spec["paths"]["/users/{id}"]["get"]["parameters"],
+        "responses": {"204": {"description": "deleted"}},
+    }
+    del openapi_spec["paths"]["/health"]
+
+    report = analyze_impact(
+        "customers", _write_spec(workdir, openapi_spec), base_spec=base
+    )
+
+    assert report.baseline == "base spec"
+    assert report.added_operations == ["DELETE /users/{id}"]
+    assert report.removed_operations == ["GET /health"]
+    assert report.changed_operations == [
+        "GET /orders",
+        "GET /users/{id}",
+        "POST /users",
+    ]
+    assert report.affected_models == ["Address", "Order", "User"]
+    assert report.test_files == [
+        "tests/http/customers/orders/test_get_orders.py",
+        "tests/http/customers/users/test_delete_users_id.py",
+        "tests/http/customers/users/test_get_users_id.py",
+        "tests/http/customers/users/test_post_users.py",
+    ]
+
+
+def test_missing_baseline_is_an_error(workdir, openapi_spec):
+    with pytest.raises(ImpactError):
+        analyze_impact("customers", _write_spec(workdir, openapi_spec))
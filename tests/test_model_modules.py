@@ -0,0 +1,119 @@
+import importlib
+import json
+import sys
+
+import pytest
+
+from e2efast.generators.model_modules import FALLBACK_MODULE, split_models
+from e2efast.pipeline import GenerationOptions, generate_service
+
+MODELS = "internal.clients.http.customers.models"
+
+SOURCE = '''"""Header."""
+
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel, RootModel
+
+
+class Status(Enum):
+    ACTIVE = 'active'
+
+
+class User(BaseModel):
+    status: Status | None = None
+
+
+class Node(BaseModel):
+    children: list[Node] | None = None
+    owner: Team | None = None
+
+
+class Team(BaseModel):
+    lead: Node | None = None
+
+
+Ids = RootModel[list[int]]
+
+
+Node.model_rebuild()
+'''
+
+
+def test_split_puts_each_model_in_its_own_module(tmp_path, monkeypatch):
+    modules = {module.name: module for module in split_models(SOURCE)}
+
+    assert {name: module.models for name, module in modules.items()} == {
+        "status": ["Status"],
+        "user": ["User"],
+        "node": ["Node", "Team"],
+        "ids": ["Ids"],
+    }
+    user = modules["user"].source
+    assert user.startswith('"""Header."""\n\nfrom __future__ import annotations\n')
+    assert "from .status import Status\n" in user
+    assert "Enum" not in user
+    assert modules["node"].source.endswith("Node.model_rebuild()\n")
+    assert "from pydantic import RootModel\n" in modules["ids"].source
+
+    package = tmp_path / "split_models_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    for name, module in modules.items():
+        (package / f"{name}.py").write_text(module.source, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    user_module = importlib.import_module("split_models_pkg.user")
+    node_module = importlib.import_module("split_models_pkg.node")
+    assert user_module.User(status="active").status.value == "active"
+    assert node_module.Team(lead={"children": []}).lead.children == []
+    for name in list(sys.modules):
+        if name.startswith("split_models_pkg"):
+            del sys.modules[name]
+
+
+def test_unknown_statements_keep_the_models_together():
+    source = "import os\n\nVALUE = os.sep\nprint(VALUE)\n"
+
+    (module,) = split_models(source)
+
+    assert module.name == FALLBACK_MODULE
+    assert module.models == ["VALUE"]
+    assert module.source == source
+
+
+@pytest.fixture
+def project(workdir, openapi_spec, monkeypatch):
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    generate_service("customers", str(spec), GenerationOptions(with_tests=True))
+
+    monkeypatch.syspath_prepend(str(workdir))
+    yield workdir
+    for name in list(sys.modules):
+        if name.split(".")[0] in {"framework", "internal"}:
+            del sys.modules[name]
+
+
+def test_clients_import_only_the_models_they_use(project):
+    client = project / "framework/clients/http/customers/orders_client.py"
+    assert f"from {MODELS} import Order  # noqa: F401" in client.read_text(
+        encoding="utf-8"
+    )
+    test = project / "tests/http/customers/users/test_post_users.py"
+    assert f"from {MODELS} import User\n" in test.read_text(encoding="utf-8")
+
+    importlib.import_module("framework.clients.http.customers.orders_client")
+
+    loaded = {name for name in sys.modules if name.startswith(f"{MODELS}.")}
+    assert f"{MODELS}.order" in loaded
+    assert f"{MODELS}.user" in loaded
+    assert "internal.clients.http.customers.apis.users_api" not in sys.modules
+
+    models = importlib.import_module(MODELS)
+    api_models = importlib.import_module(f"{MODELS}.api_models")
+    assert api_models.User is models.User
+    assert sorted(models.__all__) == ["Address", "Order", "User"]
+    with pytest.raises(AttributeError):
+        models.Missing  # noqa: B018
@@ -0,0 +1,27 @@
+from e2efast.generators.operations import OperationIndex
+
+
+def test_operations_grouped_by_tag(parser):
+    index = OperationIndex(parser)
+
+    assert index.apis == ["orders", "users"]
+    by_api = index.operations_by_api()
+    assert list(by_api) == ["orders", "users", None]
+    for api_name in index.apis:
+        assert by_api[api_name] == parser.handlers_by_tag(api_name)
+    assert [op.path for op in index.untagged] == ["/health"]
+
+
+def test_contexts_and_method_names_are_memoized(parser):
+    index = OperationIndex(parser)
+    operation = index.handlers("users")[0]
+
+    assert index.context(operation) is index.context(operation)
+    assert index.method_name(operation) == "get_users_id"
+
+
+def test_models_match_parser(parser):
+    index = OperationIndex(parser)
+
+    for api_name in index.apis:
+        assert index.models(api_name) == parser.models_by_tag(api_name)
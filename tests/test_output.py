@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from e2efast.generators.output import (
+    FileRecord,
+    MemoryWriter,
+    OutputWriter,
+    content_hash,
+)
+
+
+def test_identical_content_is_not_rewritten(tmp_path):
+    target = tmp_path / "pkg" / "module.py"
+    writer = OutputWriter()
+
+    assert writer.write(target, "x = 1\n")
+    mtime = target.stat().st_mtime_ns
+    assert not writer.write(target, "x = 1\n")
+    assert target.stat().st_mtime_ns == mtime
+    assert writer.write(target, "x = 2\n")
+
+    assert target.read_text(encoding="utf-8") == "x = 2\n"
+    assert writer.stats.written == 1
+    assert list(tmp_path.joinpath("pkg").iterdir()) == [target]
+
+
+def test_formatted_copy_of_same_render_is_unchanged(tmp_path):
+    target = tmp_path / "module.py"
+    target.write_text("x = 1\n", encoding="utf-8")
+    previous = {
+        target.as_posix(): FileRecord(
+            rendered=content_hash("x=1"), disk=content_hash("x = 1\n")
+        )
+    }
+    writer = OutputWriter(previous)
+
+    assert not writer.write(target, "x=1")
+    target.write_text("x = 1  # edited\n", encoding="utf-8")
+    assert writer.write(target, "x=1")
+
+    assert target.read_text(encoding="utf-8") == "x=1"
+    writer.skip(tmp_path / "editable.py")
+    assert writer.stats.skipped == 1
+
+
+def test_memory_writer_reads_project_without_modifying_it(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "module.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "pkg" / "other.py").write_text("y = 1\n", encoding="utf-8")
+    writer = MemoryWriter(tmp_path)
+
+    assert writer.read_text(Path("pkg/module.py")) == "x = 1\n"
+    assert not writer.write(Path("pkg/module.py"), "x = 1\n")
+    assert writer.write(Path("pkg/new.py"), "z = 1\n")
+    writer.touch(Path("pkg/module.py"))
+    writer.touch(Path("pkg/__init__.py"))
+    writer.remove_tree(Path("pkg"))
+
+    assert not writer.exists(Path("pkg/other.py"))
+    assert writer.contents == {}
+    assert writer.removed == {
+        "pkg/module.py",
+        "pkg/other.py",
+        "pkg/new.py",
+        "pkg/__init__.py",
+    }
+    assert sorted(path.name for path in (tmp_path / "pkg").iterdir()) == [
+        "module.py",
+        "other.py",
+    ]
@@ -0,0 +1,163 @@
+import json
+
+import black
+
+from e2efast.manifest import MANIFEST_PATH, Manifest
+from e2efast.pipeline import GenerationOptions, generate_service
+
+
+def _write_spec(workdir, spec):
+    path = workdir / "spec.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def test_rerun_with_unchanged_inputs_is_skipped(workdir, openapi_spec):
+    spec_path = _write_spec(workdir, openapi_spec)
+    options = GenerationOptions(with_tests=True)
+
+    first = generate_service("customers", spec_path, options)
+    second = generate_service("customers", spec_path, options)
+
+    assert not first.up_to_date
+    assert second.up_to_date
+    record = Manifest.load(workdir / MANIFEST_PATH).get("customers")
+    assert "internal/clients/http/customers/apis/users_api.py" in record.files
+    assert set(record.apis) == {"orders", "users", "<untagged>"}
+
+
+def test_only_changed_apis_are_regenerated(workdir, openapi_spec):
+    options = GenerationOptions(with_tests=True)
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    openapi_spec["paths"]["/orders"]["get"]["summary"] = "List orders"
+    report = generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    assert report.regenerated_apis == ["orders"]
+
+
+def test_nested_model_change_marks_dependent_apis(workdir, openapi_spec):
+    options = GenerationOptions(with_tests=True)
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    address = openapi_spec["components"]["schemas"]["Address"]
+    address["properties"]["zip"] = {"type": "string"}
+    report = generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    assert report.regenerated_apis == ["orders", "users"]
+
+
+def test_missing_output_or_force_triggers_full_run(workdir, openapi_spec):
+    spec_path = _write_spec(workdir, openapi_spec)
+    options = GenerationOptions(with_tests=True)
+    generate_service("customers", spec_path, options)
+
+    assert (
+        generate_service("customers", spec_path, options, force=True).up_to_date
+        is False
+    )
+
+    (workdir / "internal/clients/http/customers/apis/users_api.py").unlink()
+    report = generate_service("customers", spec_path, options)
+
+    assert not report.up_to_date
+    assert report.regenerated_apis is None
+    assert (workdir / "internal/clients/http/customers/apis/users_api.py").exists()
+
+
+def test_forced_rerun_keeps_unchanged_files_untouched(workdir, openapi_spec):
+    spec_path = _write_spec(workdir, openapi_spec)
+    options = GenerationOptions(with_tests=True)
+    generate_service("customers", spec_path, options)
+    base_fixture = workdir / "framework/fixtures/http/base.py"
+    base_fixture.write_text("ClientClass = object\n", encoding="utf-8")
+    mtimes = {
+        path: path.stat().st_mtime_ns
+        for path in workdir.rglob("*.py")
+        if "__pycache__" not in path.parts
+    }
+
+    report = generate_service("customers", spec_path, options, force=True)
+
+    assert report.files.written == 0
+    assert report.files.unchanged > 0
+    assert report.files.skipped > 0
+    assert base_fixture.read_text(encoding="utf-8") == "ClientClass = object\n"
+    assert {path: path.stat().st_mtime_ns for path in mtimes} == mtimes
+
+
+def test_only_written_files_are_formatted(workdir, openapi_spec):
+    spec_path = _write_spec(workdir, openapi_spec)
+    options = GenerationOptions(with_tests=True, formatter="black")
+    generate_service("customers", spec_path, options)
+    edited = workdir / "tests/http/customers/users/test_post_users.py"
+    edited.write_text("x  =  1\n", encoding="utf-8")
+
+    report = generate_service("customers", spec_path, options, force=True)
+
+    assert report.pending_format == []
+    assert edited.read_text(encoding="utf-8") == "x  =  1\n"
+    client = workdir / "framework/clients/http/customers/users_client.py"
+    source = client.read_text(encoding="utf-8")
+    assert black.format_str(source, mode=black.Mode()) == source
+
+
+def test_prune_removes_files_no_longer_generated(workdir, openapi_spec):
+    options = GenerationOptions(with_tests=True, formatter="none")
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+    edited_test = workdir / "tests/http/customers/orders/test_get_orders.py"
+    edited_test.write_text(
+        edited_test.read_text(encoding="utf-8") + "# edited\n", encoding="utf-8"
+    )
+
+    del openapi_spec["paths"]["/orders"]
+    del openapi_spec["paths"]["/health"]
+    report = generate_service(
+        "customers", _write_spec(workdir, openapi_spec), options, prune=True
+    )
+
+    assert report.pruned == [
+        "framework/clients/http/customers/orders_client.py",
+        "internal/clients/http/customers/apis/orders_api.py",
+        "tests/http/customers/test_get_health.py",
+    ]
+    assert report.kept_edited == ["tests/http/customers/orders/test_get_orders.py"]
+    assert edited_test.exists()
+    assert (edited_test.parent / "__init__.py").exists()
+    assert (workdir / "framework/settings/base_settings.py").exists()
+    assert (workdir / "tests/http/customers/users/test_post_users.py").exists()
+    record = Manifest.load(workdir / MANIFEST_PATH).get("customers")
+    assert not set(report.pruned) & set(record.files)
+
+    again = generate_service(
+        "customers", _write_spec(workdir, openapi_spec), options, prune=True
+    )
+    assert again.pruned == []
+
+
+def test_prune_keeps_files_other_services_still_use(workdir, openapi_spec):
+    spec_path = _write_spec(workdir, openapi_spec)
+    options = GenerationOptions(with_tests=True, formatter="none")
+    generate_service("customers", spec_path, options)
+    generate_service("billing", spec_path, options)
+    fixtures = workdir / "framework/fixtures/http"
+    edited = fixtures / "customers_service.py"
+    edited.write_text(
+        edited.read_text(encoding="utf-8") + "# edited\n", encoding="utf-8"
+    )
+
+    report = generate_service(
+        "customers", spec_path, GenerationOptions(formatter="none"), prune=True
+    )
+
+    assert report.kept_edited == ["framework/fixtures/http/customers_service.py"]
+    assert "tests/http/customers/users/test_post_users.py" in report.pruned
+    for path in (
+        "framework/fixtures/http/base.py",
+        "framework/settings/base_settings.py",
+        "tests/conftest.py",
+        "README.md",
+    ):
+        assert path not in report.pruned
+        assert (workdir / path).is_file()
+    assert (fixtures / "billing_service.py").is_file()
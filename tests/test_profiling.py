@@ -0,0 +1,35 @@
+import json
+
+from e2efast import profiling
+from e2efast.pipeline import GenerationOptions, generate_service
+from e2efast.profiling import Profiler
+
+
+def test_profile_records_stages_and_counters(workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    profiler = Profiler("customers")
+
+    with profiling.profiling(profiler):
+        generate_service(
+            "customers",
+            str(spec_path),
+            GenerationOptions(with_tests=True, formatter="black"),
+        )
+
+    root = profiler.root
+    assert {"parse", "ClientGenerator", "ServiceTestGenerator"} <= set(root.children)
+    assert "render" in root.children["ServiceTestGenerator"].children
+    assert root.counters[profiling.OPERATIONS] == 4
+    assert root.counters[profiling.FILES_WRITTEN] > 0
+    assert root.counters[profiling.BYTES_WRITTEN] > 0
+    assert root.counters[profiling.FORMATTER_CALLS] == 1
+    assert root.seconds >= sum(child.seconds for child in root.children.values())
+    assert "ClientGenerator" in profiler.report()
+
+
+def test_spans_and_counters_are_noops_without_profiler():
+    with profiling.span("parse"):
+        profiling.count(profiling.FILES_WRITTEN)
+
+    assert profiling.active_profiler() is None
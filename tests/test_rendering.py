@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from e2efast.generators.rendering import RenderSettings
+from e2efast.pipeline import GenerationOptions, generate_service
+from e2efast.utils import load_template, render_header
+
+
+def _generate_tests(directory, monkeypatch, openapi_spec, settings):
+    directory.mkdir()
+    monkeypatch.chdir(directory)
+    spec_path = directory / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    generate_service(
+        "customers",
+        str(spec_path),
+        GenerationOptions(with_tests=True, formatter="none"),
+        render_settings=settings,
+    )
+    tests_root = directory / "tests" / "http"
+    return {
+        path.relative_to(tests_root).as_posix(): path.read_text(encoding="utf-8")
+        for path in sorted(tests_root.rglob("*.py"))
+    }
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        RenderSettings(workers=4, executor="thread"),
+        RenderSettings(workers=2, executor="process"),
+    ],
+)
+def test_output_does_not_depend_on_workers(
+    workdir, monkeypatch, openapi_spec, settings
+):
+    serial = _generate_tests(workdir / "serial", monkeypatch, openapi_spec, None)
+    parallel = _generate_tests(
+        workdir / "parallel", monkeypatch, openapi_spec, settings
+    )
+
+    assert "customers/users/test_get_users_id.py" in serial
+    assert parallel == serial
+
+
+def test_header_is_rendered_once_per_distinct_input(workdir, openapi_spec):
+    render_header.cache_clear()
+    load_template.cache_clear()
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+
+    for suite_version in ("v1", "v2"):
+        generate_service(
+            "customers",
+            str(spec_path),
+            GenerationOptions(with_tests=True, suite_version=suite_version),
+        )
+
+    assert load_template.cache_info().currsize == 1
+    assert render_header.cache_info().misses <= 4
+    assert render_header.cache_info().hits > 0
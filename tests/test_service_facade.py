@@ -0,0 +1,41 @@
+import importlib
+import json
+import sys
+
+import httpx
+import pytest
+
+from e2efast.pipeline import GenerationOptions, generate_service
+
+CLIENT_MODULE = "framework.clients.http.customers.users_client"
+
+
+@pytest.fixture
+def project(workdir, openapi_spec, monkeypatch):
+    spec = workdir / "spec.json"
+    spec.write_text(json.dumps(openapi_spec), encoding="utf-8")
+    generate_service("customers", str(spec), GenerationOptions(with_fixtures=True))
+
+    monkeypatch.syspath_prepend(str(workdir))
+    for name in list(sys.modules):
+        if name.split(".")[0] in {"framework", "internal"}:
+            monkeypatch.delitem(sys.modules, name)
+    yield workdir
+    for name in list(sys.modules):
+        if name.split(".")[0] in {"framework", "internal"}:
+            del sys.modules[name]
+
+
+def test_service_builds_tag_clients_on_first_use(project):
+    module = importlib.import_module("framework.fixtures.http.customers_service")
+    assert CLIENT_MODULE not in sys.modules
+
+    with httpx.Client(base_url="http://localhost") as api_client:
+        service = module.CustomersService(api_client=api_client)
+        assert "users" not in vars(service)
+
+        users = service.users
+        assert CLIENT_MODULE in sys.modules
+        assert "framework.clients.http.customers.orders_client" not in sys.modules
+        assert service.users is users
+        assert type(users).__name__ == "UsersClient"
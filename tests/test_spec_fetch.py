@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from restcodegen.generator.spec import SpecFetchError
+
+from e2efast.cache import SpecCache
+from e2efast.spec import ConditionalFetcher, SpecNotFoundError, read_spec
+
+
+class SpecRegistry:
+    def __init__(self):
+        self.documents = {}
+        self.requests = []
+
+    def publish(self, path, body):
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self.documents[path] = (body, etag)
+
+
+@pytest.fixture
+def registry():
+    registry = SpecRegistry()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            registry.requests.append((self.path, self.headers.get("If-None-Match")))
+            if self.path not in registry.documents:
+                self.send_error(404)
+                return
+            body, etag = registry.documents[self.path]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    registry.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield registry
+    server.shutdown()
+    server.server_close()
+
+
+def test_unchanged_spec_is_revalidated_not_downloaded(registry, tmp_path):
+    registry.publish("/users.json", b'{"openapi": "3.0.0"}')
+    url = f"{registry.url}/users.json"
+
+    with ConditionalFetcher(SpecCache(tmp_path)) as fetcher:
+        first = fetcher.fetch(url)
+    with ConditionalFetcher(SpecCache(tmp_path)) as fetcher:
+        second = fetcher.fetch(url)
+        registry.publish("/users.json", b'{"openapi": "3.1.0"}')
+        third = fetcher.fetch(url)
+
+    assert first.content == second.content == b'{"openapi": "3.0.0"}'
+    assert third.content == b'{"openapi": "3.1.0"}'
+    etags = [etag for _, etag in registry.requests]
+    assert etags[0] is None
+    assert etags[1] == etags[2] is not None
+
+
+def test_cached_spec_is_used_when_the_registry_fails(registry, tmp_path, caplog):
+    registry.publish("/users.json", b'{"openapi": "3.0.0"}')
+    url = f"{registry.url}/users.json"
+    with ConditionalFetcher(SpecCache(tmp_path)) as fetcher:
+        fetcher.fetch(url)
+
+    del registry.documents["/users.json"]
+    with ConditionalFetcher(SpecCache(tmp_path)) as fetcher:
+        source = fetcher.fetch(url)
+        with pytest.raises(SpecFetchError):
+            fetcher.fetch(f"{registry.url}/other.json")
+
+    assert source.content == b'{"openapi": "3.0.0"}'
+    assert "using the cached copy" in caplog.text
+
+
+def test_specs_are_fetched_concurrently_with_failures_reported(registry):
+    for name in ("a", "b", "c"):
+        registry.publish(f"/{name}.json", name.encode())
+    urls = [f"{registry.url}/{name}.json" for name in ("a", "b", "c", "missing")]
+
+    with ConditionalFetcher() as fetcher:
+        results = fetcher.fetch_many(urls)
+
+    assert [results[url].content for url in urls[:3]] == [b"a", b"b", b"c"]
+    assert isinstance(results[urls[3]], SpecFetchError)
+    assert all(etag is None for _, etag in registry.requests)
+
+
+def test_read_spec_falls_back_to_the_schema_copy_offline(registry, workdir):
+    registry.publish("/crm.json", b'{"openapi": "3.0.0"}')
+    url = f"{registry.url}/crm.json"
+
+    first = read_spec(url, service="customers")
+    copy = workdir / "clients" / "http" / "schemas" / "customers.json"
+    assert copy.read_bytes() == first.content
+
+    del registry.documents["/crm.json"]
+    offline = read_spec(url, service="customers")
+
+    assert offline.content == b'{"openapi": "3.0.0"}'
+    with pytest.raises(SpecFetchError):
+        read_spec(url, service="billing")
+
+
+def test_read_spec_falls_back_to_the_schema_copy_for_a_missing_path(workdir):
+    copy = workdir / "clients" / "http" / "schemas" / "customers.json"
+    copy.parent.mkdir(parents=True)
+    copy.write_bytes(b'{"openapi": "3.0.0"}')
+
+    assert read_spec("crm.json", service="customers").content == copy.read_bytes()
+    with pytest.raises(SpecNotFoundError, match="no copy is kept"):
+        read_spec("crm.json", service="billing")
@@ -0,0 +1,36 @@
+import json
+
+from e2efast.cache import default_cache_dir
+from e2efast.generators.templating import GENERATORS_DIR, TemplateNamespace
+from e2efast.pipeline import GenerationOptions, generate_service
+
+
+def test_builtin_templates_are_namespaced_by_generator():
+    v1 = TemplateNamespace(GENERATORS_DIR / "http" / "fixtures" / "templates")
+    v2 = TemplateNamespace(GENERATORS_DIR / "http" / "v2fixtures" / "templates")
+
+    assert (v1.name, v2.name) == ("fixtures", "v2fixtures")
+    v1_fixture = v1.get_template("fixture.jinja2")
+    v2_fixture = v2.get_template("fixture.jinja2")
+    assert v1_fixture.filename != v2_fixture.filename
+
+
+def test_override_dirs_take_precedence(workdir, openapi_spec, tmp_path_factory):
+    overrides = tmp_path_factory.mktemp("templates")
+    (overrides / "v2tests").mkdir()
+    (overrides / "v2tests" / "service_test.jinja2").write_text(
+        "# custom test for {{ method_name }}\n", encoding="utf-8"
+    )
+    spec_path = workdir / "spec.json"
+    spec_path.write_text(json.dumps(openapi_spec), encoding="utf-8")
+
+    generate_service(
+        "customers",
+        str(spec_path),
+        GenerationOptions(with_tests=True),
+        template_dirs=[overrides],
+    )
+
+    generated = workdir / "tests/http/customers/users/test_get_users_id.py"
+    assert generated.read_text(encoding="utf-8") == ("# custom test for get_users_id\n")
+    assert any((default_cache_dir() / "jinja").iterdir())
@@ -0,0 +1,107 @@
+import ast
+import json
+
+import pytest
+
+from e2efast.generators.test_layout import merge_test_module
+from e2efast.impact import analyze_impact
+from e2efast.pipeline import GenerationOptions, generate_service
+
+
+def _write_spec(workdir, spec):
+    path = workdir / "spec.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def _functions(path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+
+
+@pytest.mark.parametrize("suite_version", ["v1", "v2"])
+def test_per_service_layout_puts_all_tests_in_one_module(
+    workdir, openapi_spec, suite_version
+):
+    options = GenerationOptions(
+        with_tests=True, suite_version=suite_version, test_layout="per-service"
+    )
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    service_dir = workdir / "tests/http/customers"
+    assert sorted(path.name for path in service_dir.glob("test_*.py")) == [
+        "test_customers.py"
+    ]
+    assert not (service_dir / "users").exists()
+    module = service_dir / "test_customers.py"
+    assert _functions(module) == [
+        "test_get_orders",
+        "test_get_users_id",
+        "test_post_users",
+        "test_get_health",
+    ]
+    assert module.read_text(encoding="utf-8").count("import pytest") == 1
+
+
+def test_per_tag_layout_keeps_existing_functions(workdir, openapi_spec):
+    options = GenerationOptions(
+        with_tests=True, formatter="none", test_layout="per-tag"
+    )
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+    module = workdir / "tests/http/customers/test_users.py"
+    assert _functions(module) == ["test_get_users_id", "test_post_users"]
+    edited = module.read_text(encoding="utf-8").replace(
+        "assert response is not None", "assert response.name == 'edited'", 1
+    )
+    module.write_text(edited, encoding="utf-8")
+
+    openapi_spec["paths"]["/users/{id}"]["delete"] = {
+        "tags": ["users"],
+        "parameters": openapi_spec["paths"]["/users/{id}"]["get"]["parameters"],
+        "responses": {"204": {"description": "deleted"}},
+    }
+    report = generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    assert report.regenerated_apis == ["users"]
+    text = module.read_text(encoding="utf-8")
+    assert text.startswith(edited.rstrip("\n"))
+    assert _functions(module) == [
+        "test_get_users_id",
+        "test_post_users",
+        "test_delete_users_id",
+    ]
+
+    generate_service(
+        "customers", _write_spec(workdir, openapi_spec), options, force=True
+    )
+    assert module.read_text(encoding="utf-8") == text
+
+
+def test_merge_adds_missing_imports_after_the_last_import():
+    existing = '"""Header."""\n\nimport pytest\n\n\ndef test_a():\n    pass\n'
+    functions = {"test_a": "def test_a():\n    1\n", "test_b": "def test_b():\n    2\n"}
+
+    merged = merge_test_module(
+        existing, {"": ["pytest"], "models": ["User", "Order"]}, functions
+    )
+
+    assert merged == (
+        '"""Header."""\n\nimport pytest\nfrom models import User, Order\n\n\n'
+        "def test_a():\n    pass\n\n\ndef test_b():\n    2\n"
+    )
+    assert merge_test_module(existing, {}, {"test_a": "def test_a(): ..."}) is None
+    assert merge_test_module("def broken(:\n", {}, functions) is None
+
+
+def test_impact_follows_the_generated_layout(workdir, openapi_spec):
+    options = GenerationOptions(
+        with_tests=True, formatter="none", test_layout="per-tag"
+    )
+    generate_service("customers", _write_spec(workdir, openapi_spec), options)
+
+    openapi_spec["components"]["schemas"]["Order"]["properties"]["total"] = {
+        "type": "number"
+    }
+    report = analyze_impact("customers", _write_spec(workdir, openapi_spec))
+
+    assert report.node_ids == ["tests/http/customers/test_orders.py::test_get_orders"]
@@ -0,0 +1,84 @@
+import json
+import os
+
+from e2efast.pipeline import GenerationOptions
+from e2efast.watch import Watcher
+
+
+def _write_spec(path, spec):
+    path.write_text(json.dumps(spec), encoding="utf-8")
+
+
+def test_watcher_regenerates_only_on_change(workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    _write_spec(spec_path, openapi_spec)
+    watcher = Watcher("customers", str(spec_path), GenerationOptions(with_tests=True))
+
+    first = watcher.poll()
+    assert first.report is not None and not first.report.up_to_date
+    assert watcher.poll() is None
+
+    openapi_spec["paths"]["/orders"]["get"]["summary"] = "List orders"
+    _write_spec(spec_path, openapi_spec)
+    changed = watcher.poll()
+
+    assert changed.report.regenerated_apis == ["orders"]
+
+
+def test_watcher_reports_broken_spec_once(workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    _write_spec(spec_path, openapi_spec)
+    watcher = Watcher("customers", str(spec_path))
+    watcher.poll()
+
+    spec_path.write_text("{", encoding="utf-8")
+    broken = watcher.poll()
+
+    assert broken.error is not None
+    assert watcher.poll() is None
+
+
+def test_watcher_reports_a_missing_spec_once_and_its_return(workdir, openapi_spec):
+    spec_path = workdir / "spec.json"
+    _write_spec(spec_path, openapi_spec)
+    watcher = Watcher("customers", str(spec_path))
+    watcher.poll()
+    stat = spec_path.stat()
+
+    spec_path.unlink()
+    missing = watcher.poll()
+    assert missing.error.startswith("FileNotFoundError")
+    assert watcher.poll() is None
+
+    _write_spec(spec_path, openapi_spec)
+    os.utime(spec_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    back = watcher.poll()
+
+    assert back.recovered and back.report is None and back.error is None
+    assert watcher.poll() is None
+
+
+def test_template_override_change_triggers_regeneration(
+    workdir, openapi_spec, tmp_path_factory
+):
+    overrides = tmp_path_factory.mktemp("templates")
+    template = overrides / "v2tests" / "service_test.jinja2"
+    template.parent.mkdir()
+    template.write_text("# v1 {{ method_name }}\n", encoding="utf-8")
+    spec_path = workdir / "spec.json"
+    _write_spec(spec_path, openapi_spec)
+    watcher = Watcher(
+        "customers",
+        str(spec_path),
+        GenerationOptions(with_tests=True, formatter="none"),
+        template_dirs=[overrides],
+    )
+    watcher.poll()
+    generated = workdir / "tests/http/customers/users/test_get_users_id.py"
+    generated.unlink()
+
+    template.write_text("# v2 {{ method_name }}\n", encoding="utf-8")
+    result = watcher.poll()
+
+    assert not result.report.up_to_date
+    assert generated.read_text(encoding="utf-8").startswith("# v2 get_users_id")